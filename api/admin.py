@@ -1,6 +1,53 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Item, Bid, Question, Answer
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import BooleanField, ExpressionWrapper, QuerySet
+from django.http import HttpRequest
+from django.utils.functional import cached_property
+from . import caching, deletion, lifecycle
+from .models import User, Item, Bid, Question, Answer, ArchivedItem
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids ``COUNT(*)`` on unfiltered changelists.
+
+    On PostgreSQL the row count of an unfiltered table is read from the
+    planner statistics in ``pg_class``; filtered querysets (search, list
+    filters) and other databases still use an exact count.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = self._estimated_count(queryset)
+            if estimate is not None:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def _estimated_count(queryset: QuerySet) -> int | None:
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 (or 0) until the table has been analyzed
+        if not row or row[0] <= 0:
+            return None
+        return int(row[0])
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    """Changelist defaults for tables that grow to millions of rows."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(User)
@@ -25,34 +72,79 @@ class CustomUserAdmin(UserAdmin):
 
 
 @admin.register(Item)
-class ItemAdmin(admin.ModelAdmin):
+class ItemAdmin(ScalableModelAdmin):
     """Admin configuration for Item model."""
-    list_display = ('title', 'owner', 'starting_price', 'end_datetime', 'is_active', 'winner_notified')
-    list_filter = ('winner_notified', 'end_datetime', 'created_at')
+    list_display = ('title', 'owner', 'starting_price', 'end_datetime', 'status', 'is_active', 'views', 'winner_notified')
+    list_filter = ('status', 'winner_notified', 'end_datetime', 'created_at')
+    list_select_related = ('owner',)
     search_fields = ('title', 'description', 'owner__username')
     ordering = ('-created_at',)
-    readonly_fields = ('created_at',)
+    readonly_fields = ('status', 'created_at')
+    autocomplete_fields = ('owner',)
+    
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        # Compute the active flag in SQL instead of per row in Python
+        lifecycle.open_started()
+        return super().get_queryset(request).annotate(
+            active=ExpressionWrapper(
+                lifecycle.live_filter(), output_field=BooleanField()
+            )
+        )
     
     def is_active(self, obj: Item) -> bool:
-        return obj.is_active
+        return obj.active
     is_active.boolean = True
+    is_active.admin_order_field = 'active'
+    
+    def save_model(self, request: HttpRequest, obj: Item, form, change: bool) -> None:
+        super().save_model(request, obj, form, change)
+        # Moving the dates can open, close or reopen the auction right away,
+        # without waiting for the cron job
+        if {'start_datetime', 'end_datetime'} & set(form.changed_data):
+            lifecycle.reschedule(obj)
+        caching.invalidate_item(obj.id)
+    
+    # Deletion goes through api.deletion, and the confirmation page shows row
+    # counts instead of listing every related bid and answer
+    def get_deleted_objects(self, objs, request: HttpRequest) -> tuple[list, dict, set, list]:
+        counts = deletion.related_counts(obj.pk for obj in objs)
+        model_count = {}
+        perms_needed = set()
+        for model, count in counts.items():
+            if not count:
+                continue
+            opts = model._meta
+            model_count[opts.verbose_name_plural] = count
+            if not request.user.has_perm(f'{opts.app_label}.delete_{opts.model_name}'):
+                perms_needed.add(opts.verbose_name)
+        return [str(obj) for obj in objs], model_count, perms_needed, []
+    
+    def delete_model(self, request: HttpRequest, obj: Item) -> None:
+        deletion.delete_item(obj)
+    
+    def delete_queryset(self, request: HttpRequest, queryset: QuerySet) -> None:
+        deletion.delete_items(queryset.values_list('id', flat=True))
 
 
 @admin.register(Bid)
-class BidAdmin(admin.ModelAdmin):
+class BidAdmin(ScalableModelAdmin):
     """Admin configuration for Bid model."""
     list_display = ('item', 'bidder', 'amount', 'timestamp')
     list_filter = ('timestamp',)
+    list_select_related = ('item', 'bidder')
+    autocomplete_fields = ('item', 'bidder')
     search_fields = ('item__title', 'bidder__username')
     ordering = ('-timestamp',)
     readonly_fields = ('timestamp',)
 
 
 @admin.register(Question)
-class QuestionAdmin(admin.ModelAdmin):
+class QuestionAdmin(ScalableModelAdmin):
     """Admin configuration for Question model."""
     list_display = ('item', 'asker', 'text_preview', 'timestamp')
     list_filter = ('timestamp',)
+    list_select_related = ('item', 'asker')
+    autocomplete_fields = ('item', 'asker')
     search_fields = ('item__title', 'asker__username', 'text')
     ordering = ('-timestamp',)
     readonly_fields = ('timestamp',)
@@ -63,10 +155,13 @@ class QuestionAdmin(admin.ModelAdmin):
 
 
 @admin.register(Answer)
-class AnswerAdmin(admin.ModelAdmin):
+class AnswerAdmin(ScalableModelAdmin):
     """Admin configuration for Answer model."""
     list_display = ('question', 'responder', 'text_preview', 'timestamp')
     list_filter = ('timestamp',)
+    # Question.__str__ reads the asker and the item
+    list_select_related = ('question__asker', 'question__item', 'responder')
+    autocomplete_fields = ('question', 'responder')
     search_fields = ('question__text', 'responder__username', 'text')
     ordering = ('-timestamp',)
     readonly_fields = ('timestamp',)
@@ -74,3 +169,20 @@ class AnswerAdmin(admin.ModelAdmin):
     def text_preview(self, obj: Answer) -> str:
         return obj.text[:50] + '...' if len(obj.text) > 50 else obj.text
     text_preview.short_description = 'Answer'
+
+
+
+@admin.register(ArchivedItem)
+class ArchivedItemAdmin(ScalableModelAdmin):
+    """Read-only admin for archived auctions."""
+    list_display = ('id', 'title', 'owner', 'final_price', 'bid_count', 'end_datetime', 'archived_at')
+    list_select_related = ('owner',)
+    search_fields = ('title', 'owner__username')
+    ordering = ('-end_datetime',)
+    readonly_fields = ('id', 'title', 'owner', 'end_datetime', 'final_price', 'bid_count', 'archived_at', 'payload')
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj: ArchivedItem | None = None) -> bool:
+        return False
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self) -> None:
+        # Register the signal handlers that keep the suggestion index current
+        from . import suggest  # noqa: F401
+        from . import checks
+
+        # Gunicorn never runs the system checks, so refuse to start instead
+        if getattr(settings, 'PRODUCTION', False):
+            errors = checks.cache_errors() + checks.metrics_errors()
+            if errors:
+                raise ImproperlyConfigured(f'{errors[0].msg} {errors[0].hint}')
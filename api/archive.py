@@ -0,0 +1,151 @@
+"""
+Archival of settled auctions.
+
+Once an auction has been settled (winner notified) and ended more than
+``ARCHIVE_RETENTION_DAYS`` ago, its item, bids and Q&A are serialized into a
+single ``ArchivedItem`` row and removed from the hot tables by the batched
+deletes of ``api.deletion``. The work runs in
+batches with one transaction per batch, so each transaction stays short.
+The archive rows are committed before the deletion starts, which runs in
+its own short transactions; if it is interrupted, the item is already
+archived and ``deletion.finish_interrupted`` completes it.
+"""
+
+import time
+from datetime import timedelta
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from . import deletion
+from .models import ArchivedItem, Item, Bid, Question, Answer
+from .serializers import serialize_bid, serialize_item, serialize_question, serialize_user_minimal
+
+
+def archivable_items(retention_days: Optional[int] = None) -> QuerySet:
+    """Settled items whose auction ended before the retention cutoff."""
+    if retention_days is None:
+        retention_days = getattr(settings, 'ARCHIVE_RETENTION_DAYS', 90)
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    return Item.objects.filter(status=Item.Status.SETTLED, end_datetime__lt=cutoff)
+
+
+def snapshot_item(item: Item) -> dict[str, Any]:
+    """Build the archived payload: the detail view with every bid and question."""
+    # Details are added here rather than by include_details=True, which would
+    # load the latest bids a second time, with a query per bidder
+    payload = serialize_item(item)
+    payload['bids'] = [serialize_bid(b) for b in item.bids.select_related('bidder', 'item')]
+    payload['questions'] = [
+        serialize_question(q)
+        for q in item.questions.select_related('asker', 'item').prefetch_related('answers__responder', 'answers__question')
+    ]
+    payload['highest_bidder'] = serialize_user_minimal(item.leader) if item.leader_id else None
+    payload['is_active'] = False
+    payload['archived'] = True
+    return payload
+
+
+def archive_batch(item_ids: list[int]) -> int:
+    """Archive the given items in one transaction, then delete them; returns the number archived."""
+    with transaction.atomic():
+        items = list(
+            # of=('self',): PostgreSQL cannot lock the nullable side of the leader join
+            Item.objects.select_for_update(of=('self',))
+            .filter(id__in=item_ids, status=Item.Status.SETTLED)
+            .select_related('owner', 'leader')
+        )
+        archived = []
+        for item in items:
+            payload = snapshot_item(item)
+            archived.append(ArchivedItem(
+                id=item.id,
+                title=item.title,
+                owner=item.owner,
+                end_datetime=item.end_datetime,
+                final_price=payload['current_price'],
+                bid_count=payload['bid_count'],
+                payload=payload,
+            ))
+        ArchivedItem.objects.bulk_create(archived, ignore_conflicts=True)
+    deletion.delete_items([item.id for item in items])
+    return len(items)
+
+
+def archive_ended_auctions(
+    retention_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+    limit: Optional[int] = None,
+) -> int:
+    """Archive settled auctions batch by batch; returns the number archived."""
+    if batch_size is None:
+        batch_size = getattr(settings, 'ARCHIVE_BATCH_SIZE', 100)
+    if pause is None:
+        pause = getattr(settings, 'ARCHIVE_BATCH_PAUSE', 0.1)
+
+    total = 0
+    while limit is None or total < limit:
+        size = batch_size if limit is None else min(batch_size, limit - total)
+        ids = list(
+            archivable_items(retention_days).order_by('end_datetime').values_list('id', flat=True)[:size]
+        )
+        if not ids:
+            break
+        total += archive_batch(ids)
+        if pause:
+            # Give live traffic a chance at the tables between batches
+            time.sleep(pause)
+    return total
+
+
+def get_archived_payload(item_id: int) -> Optional[dict[str, Any]]:
+    """Return the archived payload of an item that is no longer in the hot tables."""
+    payload = ArchivedItem.objects.filter(id=item_id).values_list('payload', flat=True).first()
+    return payload
+
+
+# ============================================================================
+# Size reporting
+# ============================================================================
+
+HOT_MODELS = (Item, Bid, Question, Answer)
+COLD_MODELS = (ArchivedItem,)
+
+
+def table_size_bytes(table: str) -> Optional[int]:
+    """On-disk size of a table including indexes, where the backend exposes it."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+            return cursor.fetchone()[0]
+        if connection.vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    'SELECT SUM(pgsize) FROM dbstat WHERE name = %s OR name IN '
+                    '(SELECT name FROM sqlite_master WHERE type = %s AND tbl_name = %s)',
+                    [table, 'index', table],
+                )
+            except Exception:
+                # SQLite built without the dbstat virtual table
+                return None
+            return cursor.fetchone()[0]
+    return None
+
+
+def table_stats() -> list[dict[str, Any]]:
+    """Row counts and sizes of the hot and cold auction tables."""
+    stats = []
+    for tier, models in (('hot', HOT_MODELS), ('cold', COLD_MODELS)):
+        for model in models:
+            table = model._meta.db_table
+            stats.append({
+                'tier': tier,
+                'table': table,
+                'rows': model.objects.count(),
+                'bytes': table_size_bytes(table),
+            })
+    return stats
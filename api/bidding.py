@@ -0,0 +1,191 @@
+"""
+Bid placement and proxy bidding.
+
+All bids go through ``place_bid`` so that the denormalized ``current_price``
+and ``bid_count`` columns on ``Item``, the trending feed, the cached item
+detail and the metrics stay consistent with the ``Bid`` table. The item row
+is locked for the duration of the check-and-insert, so concurrent bidders
+are serialized per item and the check always sees the latest price.
+
+A bid is either a plain bid, placed at exactly the given amount, or a proxy
+bid: a hidden maximum up to which the system bids on the user's behalf, one
+``BID_INCREMENT`` above the competition. The item keeps the top two maxima
+(``leader_max`` and ``runner_up_max``), which is all ``resolve_bid`` needs to
+work out the outcome of a bidding war in one step. At most two bids are
+inserted per request: the outbid proxy's final bid and the new leading bid.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import DecimalValidator
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import caching, feeds, metrics
+from .models import User, Item, Bid
+from .tracing import traced
+
+
+class BidRejected(Exception):
+    """Raised when a bid is not allowed; the message is shown to the user."""
+
+
+def parse_amount(value: Any) -> Decimal:
+    """
+    Parse a bid amount or maximum from a request.
+
+    Raises ``BidRejected`` unless it is a positive, finite amount with at
+    most two decimal places that fits the ``Bid.amount`` column.
+    """
+    field = Bid._meta.get_field('amount')
+    try:
+        # str() so a JSON number is read as written, not as its binary float
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise BidRejected('Invalid amount')
+    try:
+        # Also rejects NaN and Infinity
+        DecimalValidator(field.max_digits, field.decimal_places)(amount)
+    except ValidationError:
+        raise BidRejected(
+            f'Amount must have at most {field.decimal_places} decimal places '
+            f'and {field.max_digits - field.decimal_places} digits before the point'
+        )
+    if amount <= 0:
+        raise BidRejected('Amount must be positive')
+    return amount
+
+
+@dataclass(frozen=True)
+class ProxyState:
+    """What bid resolution needs to know about an item."""
+    price: Decimal
+    leader_id: Optional[int] = None
+    leader_max: Optional[Decimal] = None
+    runner_up_max: Optional[Decimal] = None
+
+
+@dataclass(frozen=True)
+class Resolution:
+    """The item's state after a bid and the bids to record, in order."""
+    state: ProxyState
+    # (bidder_id, amount, auto)
+    bids: tuple[tuple[int, Decimal, bool], ...]
+
+
+@dataclass
+class BidResult:
+    """Outcome of ``place_bid`` as seen by the bidder."""
+    bids: list[Bid]
+    leading: bool
+    current_price: Decimal
+    max_amount: Optional[Decimal]
+
+
+def resolve_bid(
+    state: ProxyState,
+    bidder_id: int,
+    amount: Decimal,
+    proxy: bool,
+    increment: Decimal,
+) -> Resolution:
+    """
+    Apply one bid to the item state.
+
+    ``amount`` is the bid itself, or the bidder's maximum when ``proxy`` is
+    set. The leader is the bidder with the highest maximum, the earlier one
+    on ties. The price is the lowest amount that beats the runner-up maximum
+    by ``increment``, capped at the leader's maximum, and never below the
+    previous price or a plain bid. The leader's own bids do not reprice
+    against the runner-up: a plain bid sets the price to that amount and a
+    proxy bid only raises their maximum.
+    """
+    price = state.price
+    if amount <= price:
+        raise BidRejected(f'Bid must be higher than current price (£{price})')
+
+    if state.leader_id is None:
+        opening = min(amount, price + increment) if proxy else amount
+        return Resolution(ProxyState(opening, bidder_id, amount, None), ((bidder_id, opening, proxy),))
+
+    # Legacy rows may have a leader without a recorded maximum
+    leader_max = state.leader_max if state.leader_max is not None else price
+    runner_up = state.runner_up_max
+
+    if bidder_id == state.leader_id:
+        if proxy:
+            if amount <= leader_max:
+                raise BidRejected(f'Your maximum bid is already £{leader_max}')
+            return Resolution(ProxyState(price, bidder_id, amount, runner_up), ())
+        # A plain bid by the leader raises the price to exactly that amount
+        new_max = max(leader_max, amount)
+        return Resolution(ProxyState(amount, bidder_id, new_max, runner_up), ((bidder_id, amount, False),))
+
+    if amount > leader_max:
+        # The challenger takes the lead; the old leader's proxy bids its maximum
+        new_price = amount if not proxy else min(amount, leader_max + increment)
+        bids = []
+        if leader_max > price:
+            bids.append((state.leader_id, leader_max, True))
+        bids.append((bidder_id, new_price, proxy))
+        return Resolution(ProxyState(new_price, bidder_id, amount, leader_max), tuple(bids))
+
+    # The leader's maximum covers the challenger's: it answers with the increment
+    response = min(leader_max, amount + increment)
+    return Resolution(
+        ProxyState(response, state.leader_id, leader_max, amount),
+        ((bidder_id, amount, proxy), (state.leader_id, response, True)),
+    )
+
+
+@traced()
+def place_bid(item_id: int, bidder: User, amount: Decimal, proxy: bool = False) -> BidResult:
+    """Validate and record a plain or proxy bid, updating the item's price columns."""
+    increment = getattr(settings, 'BID_INCREMENT', Decimal('1.00'))
+    with transaction.atomic():
+        item = Item.objects.select_for_update().get(id=item_id)
+
+        if not item.is_active:
+            if item.status == Item.Status.DELETING:
+                raise BidRejected('This item is being deleted')
+            if item.status == Item.Status.SCHEDULED and timezone.now() < item.end_datetime:
+                raise BidRejected('This auction has not started yet')
+            raise BidRejected('This auction has ended')
+        if item.owner_id == bidder.id:
+            raise BidRejected('You cannot bid on your own item')
+
+        state = ProxyState(item.current_price, item.leader_id, item.leader_max, item.runner_up_max)
+        resolution = resolve_bid(state, bidder.id, amount, proxy, increment)
+        new = resolution.state
+
+        bids = Bid.objects.bulk_create([
+            Bid(item=item, bidder_id=bidder_id, amount=bid_amount, auto=auto)
+            for bidder_id, bid_amount, auto in resolution.bids
+        ])
+        Item.objects.filter(id=item.id).update(
+            current_price=new.price,
+            bid_count=F('bid_count') + len(bids),
+            leader_id=new.leader_id,
+            leader_max=new.leader_max,
+            runner_up_max=new.runner_up_max,
+        )
+        for bid in bids:
+            feeds.record_bid(item.id, bid.timestamp)
+        transaction.on_commit(lambda: caching.invalidate_item(item_id))
+
+    metrics.inc('auction_bids_placed_total')
+    auto_bids = sum(1 for bid in bids if bid.auto)
+    if auto_bids:
+        metrics.inc('auction_proxy_bids_total', auto_bids)
+    leading = new.leader_id == bidder.id
+    return BidResult(
+        bids=bids,
+        leading=leading,
+        current_price=new.price,
+        max_amount=new.leader_max if leading else None,
+    )
@@ -0,0 +1,353 @@
+"""
+Bulk item import from a CSV/JSONL manifest and a zip archive of images.
+
+Manifest rows carry ``title``, ``description``, ``starting_price``,
+``end_datetime`` and optionally ``start_datetime`` and ``image``, the name of
+a file in the archive.
+Rows are validated up front. Each batch's images are then decoded, resized
+and saved by a process pool. The batch's items are inserted with a single
+``bulk_create``. A bad row or a broken image is reported with its row number
+and skipped; it never aborts the rest of the import.
+
+Uploads through the API are not imported in the request: the files are
+stored in ``IMPORT_DIR`` and an ``ImportJob`` is queued, which the
+``run_import_jobs`` cron job picks up. Clients poll the job for progress.
+
+The pool uses the ``spawn`` start method because forking a multi-threaded
+gunicorn worker is unsafe; its task function lives in ``api.imaging``, which
+can be imported before Django is set up.
+"""
+
+import csv
+import io
+import json
+import multiprocessing
+import os
+import uuid
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import DatabaseError, transaction
+from django.http import HttpRequest, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods
+
+from . import caching, imaging, suggest
+from .lifecycle import parse_auction_datetime
+from .models import ImportJob, Item, User
+
+
+MAX_PRICE = Decimal('99999999.99')
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+
+# ============================================================================
+# Manifest
+# ============================================================================
+
+def read_manifest(lines: Iterable[str], fmt: str) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Yield ``(row number, row)``; CSV row numbers count the header as row 1."""
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(lines), start=2):
+            yield number, row
+    elif fmt == 'jsonl':
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            # Non-objects are reported by validate_row
+            yield number, row if isinstance(row, dict) else {'_invalid': line.strip()[:80]}
+    else:
+        raise ValueError(f'Unknown manifest format: {fmt}')
+
+
+def manifest_format(filename: str) -> str:
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def validate_row(row: dict[str, Any], archive_names: set[str]) -> dict[str, Any]:
+    """Return cleaned item fields, or raise ValueError with a message for the row."""
+    if '_invalid' in row:
+        raise ValueError('Not a JSON object')
+    for name in ('title', 'description', 'starting_price', 'end_datetime'):
+        if not str(row.get(name) or '').strip():
+            raise ValueError(f'Missing required field: {name}')
+
+    title = str(row['title']).strip()
+    if len(title) > 200:
+        raise ValueError('Title is longer than 200 characters')
+    try:
+        price = Decimal(str(row['starting_price']))
+    except InvalidOperation:
+        raise ValueError(f"Invalid starting_price: {row['starting_price']}")
+    if not price.is_finite() or price < 0 or price > MAX_PRICE:
+        raise ValueError(f'starting_price out of range: {price}')
+
+    image = str(row.get('image') or '').strip()
+    if image and image not in archive_names:
+        raise ValueError(f'Image not found in archive: {image}')
+
+    return {
+        'title': title,
+        'description': str(row['description']).strip(),
+        'starting_price': price.quantize(Decimal('0.01')),
+        'start_datetime': parse_auction_datetime(str(row['start_datetime'])) if row.get('start_datetime') else None,
+        'end_datetime': parse_auction_datetime(str(row['end_datetime'])),
+        'image': image,
+    }
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+def import_items(
+    rows: Iterable[tuple[int, dict[str, Any]]],
+    archive_path: Optional[str],
+    owner: User,
+    batch_size: int = 200,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, ImportResult], None]] = None,
+) -> ImportResult:
+    """Validate, process images for and insert the manifest rows in batches."""
+    result = ImportResult()
+    archive_names: set[str] = set()
+    if archive_path:
+        with zipfile.ZipFile(archive_path) as archive:
+            archive_names = {info.filename for info in archive.infolist() if not info.is_dir()}
+
+    valid: list[tuple[int, dict[str, Any]]] = []
+    for number, row in rows:
+        try:
+            valid.append((number, validate_row(row, archive_names)))
+        except ValueError as e:
+            result.errors.append((number, str(e)))
+
+    total = len(valid)
+    max_size = getattr(settings, 'IMPORT_IMAGE_MAX_SIZE', 1600)
+    workers = workers or getattr(settings, 'IMPORT_WORKERS', None) or os.cpu_count()
+    needs_images = any(fields['image'] for _, fields in valid)
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=imaging.init_worker,
+    ) if needs_images else None
+
+    try:
+        for start in range(0, total, batch_size):
+            batch = valid[start:start + batch_size]
+            futures: dict[int, Future] = {
+                number: executor.submit(imaging.process_archive_image, archive_path, fields['image'], max_size)
+                for number, fields in batch if fields['image']
+            }
+            items: list[Item] = []
+            stored: list[str] = []
+            for number, fields in batch:
+                image_name = ''
+                if number in futures:
+                    try:
+                        image_name = futures[number].result()
+                    except Exception as e:
+                        result.errors.append((number, f"Could not process image {fields['image']}: {e}"))
+                        continue
+                    stored.append(image_name)
+                item = Item(
+                    title=fields['title'],
+                    description=fields['description'],
+                    starting_price=fields['starting_price'],
+                    # bulk_create skips Item.save(), which normally sets these
+                    current_price=fields['starting_price'],
+                    start_datetime=fields['start_datetime'],
+                    end_datetime=fields['end_datetime'],
+                    image=image_name,
+                    owner=owner,
+                )
+                item.status = item.status_for_dates()
+                items.append(item)
+
+            try:
+                with transaction.atomic():
+                    created = Item.objects.bulk_create(items)
+            except DatabaseError as e:
+                for name in stored:
+                    default_storage.delete(name)
+                result.errors.extend((number, f'Database error: {e}') for number, _ in batch)
+            else:
+                suggest.add_items(created)
+                caching.invalidate_lists()
+                result.created += len(created)
+
+            if progress is not None:
+                progress(min(start + batch_size, total), total, result)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    result.errors.sort()
+    return result
+
+
+# ============================================================================
+# Jobs
+# ============================================================================
+
+def import_storage() -> FileSystemStorage:
+    """Where uploaded manifests and archives wait for their job."""
+    return FileSystemStorage(location=settings.IMPORT_DIR)
+
+
+def enqueue_import(manifest, images, owner: User) -> ImportJob:
+    """Store the uploaded files and queue a job that imports them."""
+    storage = import_storage()
+    directory = uuid.uuid4().hex
+    fmt = manifest_format(manifest.name)
+    job = ImportJob(
+        owner=owner,
+        manifest=storage.save(f'{directory}/manifest.{fmt}', manifest),
+        manifest_format=fmt,
+    )
+    if images is not None:
+        job.images = storage.save(f'{directory}/images.zip', images)
+    job.save()
+    return job
+
+
+def _discard_files(job: ImportJob) -> None:
+    storage = import_storage()
+    for name in (job.manifest, job.images):
+        if name:
+            storage.delete(name)
+    try:
+        os.rmdir(os.path.dirname(storage.path(job.manifest)))
+    except OSError:
+        pass
+
+
+def fail_stale_jobs() -> int:
+    """Fail jobs left running by a crashed run; retrying could import their rows twice."""
+    cutoff = timezone.now() - timedelta(minutes=getattr(settings, 'IMPORT_JOB_TIMEOUT_MINUTES', 60))
+    stale = list(ImportJob.objects.filter(status=ImportJob.Status.RUNNING, started_at__lt=cutoff))
+    for job in stale:
+        _discard_files(job)
+    return ImportJob.objects.filter(id__in=[job.id for job in stale]).update(
+        status=ImportJob.Status.FAILED, message='Import did not finish', finished_at=timezone.now()
+    )
+
+
+def run_import_job(job: ImportJob) -> bool:
+    """Run a queued job; returns False if another run claimed it first."""
+    claimed = ImportJob.objects.filter(id=job.id, status=ImportJob.Status.QUEUED).update(
+        status=ImportJob.Status.RUNNING, started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+
+    def progress(done: int, total: int, result: ImportResult) -> None:
+        ImportJob.objects.filter(id=job.id).update(
+            total_rows=total, processed_rows=done, created_items=result.created
+        )
+
+    storage = import_storage()
+    try:
+        with io.TextIOWrapper(storage.open(job.manifest, 'rb'), encoding='utf-8-sig', newline='') as lines:
+            result = import_items(
+                read_manifest(lines, job.manifest_format),
+                storage.path(job.images) if job.images else None,
+                job.owner,
+                progress=progress,
+            )
+    except Exception as e:
+        ImportJob.objects.filter(id=job.id).update(
+            status=ImportJob.Status.FAILED, message=str(e), finished_at=timezone.now()
+        )
+        return True
+    finally:
+        _discard_files(job)
+
+    failed = not result.created and not result.errors
+    ImportJob.objects.filter(id=job.id).update(
+        status=ImportJob.Status.FAILED if failed else ImportJob.Status.DONE,
+        message='Manifest has no rows' if failed else '',
+        created_items=result.created,
+        errors=[{'row': number, 'error': message} for number, message in result.errors],
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def run_pending_jobs() -> int:
+    """Run queued jobs oldest first; returns how many this run processed."""
+    fail_stale_jobs()
+    processed = 0
+    for job in ImportJob.objects.filter(status=ImportJob.Status.QUEUED).select_related('owner'):
+        if run_import_job(job):
+            processed += 1
+    return processed
+
+
+def serialize_import_job(job: ImportJob) -> dict[str, Any]:
+    return {
+        'id': job.id,
+        'status': job.status,
+        'total_rows': job.total_rows,
+        'processed_rows': job.processed_rows,
+        'created': job.created_items,
+        'errors': job.errors,
+        'message': job.message,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+# ============================================================================
+# API
+# ============================================================================
+
+@login_required
+@require_http_methods(["POST"])
+def api_items_import(request: HttpRequest) -> JsonResponse:
+    """Queue an import of the uploaded ``manifest`` (CSV/JSONL) and ``images`` (zip)."""
+    manifest = request.FILES.get('manifest')
+    if manifest is None:
+        return JsonResponse({'error': 'Missing manifest file'}, status=400)
+    images = request.FILES.get('images')
+    if images is not None and not zipfile.is_zipfile(images):
+        return JsonResponse({'error': 'Images must be a zip archive'}, status=400)
+
+    max_rows = getattr(settings, 'IMPORT_MAX_ROWS', 1000)
+    lines = sum(1 for _ in manifest)
+    if lines > max_rows + 1:
+        return JsonResponse(
+            {'error': f'Manifest has more than {max_rows} rows; use the import_items command'},
+            status=400,
+        )
+    manifest.seek(0)
+    if images is not None:
+        images.seek(0)
+
+    job = enqueue_import(manifest, images, request.user)
+    return JsonResponse(serialize_import_job(job), status=202)
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_import_job(request: HttpRequest, job_id: int) -> JsonResponse:
+    """Progress and result of one of the user's import jobs."""
+    job = get_object_or_404(ImportJob, id=job_id, owner=request.user)
+    return JsonResponse(serialize_import_job(job))
@@ -0,0 +1,211 @@
+"""
+Stampede-safe caching for hot read endpoints.
+
+``get_or_build`` wraps an expensive builder with three layers:
+
+1. Early probabilistic refresh (XFetch): the chance that a reader refreshes
+   an entry rises as the entry nears expiry. Refreshes therefore happen
+   before the entry expires instead of all at once when it does.
+2. Single-flight within the worker. Only one thread per key runs the
+   builder. Other threads serve the stale value, or wait for the result if
+   there is none.
+3. A cross-worker lock taken with ``cache.add``. Only one worker per key
+   rebuilds. The others serve the stale value, or poll briefly for the new
+   one.
+
+Entries outlive their TTL by ``CACHE_STALE_TTL`` seconds so that stale
+values are available while the refresh runs. A caller that read the old
+entry just before another one stored the new value serves that value
+instead of building again.
+
+Cached listings carry a list version that every item change bumps, and
+item details a per-item version. The version is not part of the key: an
+entry built before the current version is stale, so one caller rebuilds it
+while the others keep serving it, just like an entry near its expiry. Under
+a burst of bids readers therefore keep hitting the cache instead of all
+missing on a fresh key.
+"""
+
+import math
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+
+
+class _Flight:
+    """An in-progress build of one key within this worker."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.failed = False
+
+
+_flights: dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+
+# Early refreshes start at most this many build durations before expiry
+_MAX_EARLY_FACTOR = 3.0
+
+
+def _setting(name: str, default: float) -> float:
+    return getattr(settings, name, default)
+
+
+# A cache entry: (value, expires_at, build duration, version it was built at)
+Entry = tuple[Any, float, float, int]
+
+
+def _needs_refresh(entry: Entry, beta: float, version: int) -> bool:
+    _, expires_at, delta, built_version = entry
+    if built_version < version:
+        return True
+    # XFetch: refresh early with probability growing as expiry approaches,
+    # scaled by how long the value took to compute. The gap is capped so a
+    # very hot key does not start refreshing long before it expires.
+    gap = min(-math.log(1.0 - random.random()), _MAX_EARLY_FACTOR) * delta * beta
+    return time.time() + gap >= expires_at
+
+
+def _build_and_store(key: str, builder: Callable[[], Any], ttl: float, version: int) -> Any:
+    started = time.perf_counter()
+    value = builder()
+    delta = time.perf_counter() - started
+    stale_ttl = _setting('CACHE_STALE_TTL', 30)
+    cache.set(key, (value, time.time() + ttl, delta, version), ttl + stale_ttl)
+    return value
+
+
+def _newer_entry(key: str, seen: Optional[Entry], version: int) -> Optional[Entry]:
+    """The entry stored under ``key`` if it was built after ``seen`` was read, at ``version``."""
+    entry = cache.get(key)
+    if entry is not None and (seen is None or entry[1] > seen[1]) and entry[3] >= version:
+        return entry
+    return None
+
+
+def _build_across_workers(
+    key: str,
+    builder: Callable[[], Any],
+    ttl: float,
+    version: int,
+    stale: Optional[Entry],
+) -> Any:
+    """Build under the cross-worker lock, or fall back to stale/peer results."""
+    lock_key = f'{key}:lock'
+    lock_timeout = _setting('CACHE_LOCK_TIMEOUT', 10)
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            # Another worker may have finished a build since our read
+            newer = _newer_entry(key, stale, version)
+            if newer is not None:
+                return newer[0]
+            return _build_and_store(key, builder, ttl, version)
+        finally:
+            cache.delete(lock_key)
+
+    # Another worker is rebuilding this key
+    if stale is not None:
+        return stale[0]
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        if cache.get(lock_key) is None:
+            break
+    # The other worker gave up or died; build it ourselves
+    return _build_and_store(key, builder, ttl, version)
+
+
+def get_or_build(
+    key: str,
+    builder: Callable[[], Any],
+    ttl: float,
+    name: str = 'default',
+    beta: float = 1.0,
+    version: int = 0,
+) -> Any:
+    """
+    Return the cached value for ``key``, building it at most once per expiry.
+
+    An entry built before ``version`` is rebuilt like an expiring one, and
+    served stale meanwhile.
+    """
+    entry = cache.get(key)
+    if entry is not None and not _needs_refresh(entry, beta, version):
+        metrics.observe_cache(name, True)
+        return entry[0]
+    metrics.observe_cache(name, False)
+
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        # Someone in this worker is already building it
+        if entry is not None:
+            return entry[0]
+        flight.done.wait(_setting('CACHE_LOCK_TIMEOUT', 10))
+        if flight.done.is_set() and not flight.failed:
+            return flight.value
+        return builder()
+
+    try:
+        # Another thread may have stored a new value since our read
+        newer = _newer_entry(key, entry, version)
+        if newer is not None:
+            flight.value = newer[0]
+        else:
+            flight.value = _build_across_workers(key, builder, ttl, version, entry)
+        return flight.value
+    except Exception:
+        flight.failed = True
+        raise
+    finally:
+        flight.done.set()
+        with _flights_lock:
+            _flights.pop(key, None)
+
+
+# ============================================================================
+# Versions
+# ============================================================================
+
+def _bump(key: str) -> None:
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, 1, None)
+
+
+def item_version(item_id: int) -> int:
+    """Version counter of an item's cached representation."""
+    return cache.get(f'item-version:{item_id}', 0)
+
+
+def list_version() -> int:
+    """Version counter of the cached item listings."""
+    return cache.get('item-list-version', 0)
+
+
+def invalidate_lists() -> None:
+    """Bump the list version, e.g. after an item was created."""
+    _bump('item-list-version')
+
+
+def invalidate_item(item_id: int) -> None:
+    """Bump an item's version and the list version, so both are rebuilt on the next read."""
+    _bump(f'item-version:{item_id}')
+    invalidate_lists()
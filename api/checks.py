@@ -0,0 +1,53 @@
+"""
+System checks for settings the app cannot work correctly without.
+
+Gunicorn does not run system checks, so ``ApiConfig.ready`` also raises on
+these errors when ``PRODUCTION`` is set.
+"""
+
+from typing import Any
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Cache backends whose add() and incr() are a separate read and write
+NON_ATOMIC_CACHE_BACKENDS: tuple[str, ...] = (
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_errors() -> list[Error]:
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in NON_ATOMIC_CACHE_BACKENDS:
+        return []
+    if not getattr(settings, 'RATE_LIMIT_ENABLED', False):
+        return []
+    return [Error(
+        f'{backend} has no atomic add() or incr(), so rate limits undercount '
+        'and the cache rebuild locks do not exclude each other.',
+        hint='Set CACHE_BACKEND to redis or memcached (or locmem for a single process), '
+             'or disable RATE_LIMIT_ENABLED.',
+        id='api.E001',
+    )]
+
+
+@register(Tags.caches)
+def check_cache_backend(app_configs: Any, **kwargs: Any) -> list[Error]:
+    return cache_errors()
+
+
+def metrics_errors() -> list[Error]:
+    if not getattr(settings, 'PRODUCTION', False) or getattr(settings, 'METRICS_TOKEN', ''):
+        return []
+    return [Error(
+        'METRICS_TOKEN is empty, so anyone can scrape /metrics, and every '
+        'scrape makes the database count items and bids.',
+        hint='Set METRICS_TOKEN and give the scraper the same bearer token.',
+        id='api.E002',
+    )]
+
+
+@register(Tags.security)
+def check_metrics_token(app_configs: Any, **kwargs: Any) -> list[Error]:
+    return metrics_errors()
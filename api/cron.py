@@ -2,38 +2,50 @@
 Cron job for checking ended auctions and notifying winners.
 """
 
-from django.core.mail import send_mail
+import time
+
+from django.core import mail
 from django.conf import settings
-from django.utils import timezone
-from .models import Item, Bid
+from . import archive, bulk_import, feeds, lifecycle, maintenance, metrics, tracing
+from .profiling import profiled_job
+from .models import User
+
+# Each notification is a span of the cron trace, timing the SMTP round trip
+send_mail = tracing.traced('send_mail', tracing.KIND_CLIENT)(mail.send_mail)
 
 
+@profiled_job('check_ended_auctions')
+@tracing.traced_job('check_ended_auctions')
 def check_ended_auctions() -> None:
     """
     Check for auctions that have ended and notify the winners via email.
     
+    Also removes ended auctions from the trending feed.
+    
     This function is called by django-crontab every 5 minutes.
     """
-    # Find all items where auction has ended but winner hasn't been notified
-    ended_items = Item.objects.filter(
-        end_datetime__lte=timezone.now(),
-        winner_notified=False
-    ).select_related('owner')
+    started = time.perf_counter()
+    # Open scheduled auctions and close the ones past their end time
+    transitions = lifecycle.advance_statuses()
+    if transitions['opened'] or transitions['closed']:
+        print(f"[CRON] Opened {transitions['opened']} and closed {transitions['closed']} auctions")
+    
+    # Find all ended auctions whose winner hasn't been notified
+    ended_items = lifecycle.settlement_queue().select_related('owner', 'leader')
     
     for item in ended_items:
-        # Get the highest bid
-        highest_bid: Bid | None = item.bids.select_related('bidder').order_by('-amount').first()
+        # The leader is maintained by bid placement; ties go to the earlier maximum
+        winner: User | None = item.leader
         
-        if highest_bid:
+        if winner:
             # Send email to the winner
-            winner = highest_bid.bidder
             try:
                 send_mail(
                     subject=f'🎉 Congratulations! You won the auction for "{item.title}"',
                     message=f'''
 Dear {winner.username},
 
-Congratulations! You have won the auction for "{item.title}" with your bid of £{highest_bid.amount}.
+Congratulations! You have won the auction for "{item.title}" with your bid of £{item.current_price}.
 
 Please contact the seller ({item.owner.username}) to arrange payment and delivery.
 
@@ -48,8 +60,10 @@ The Auction Team
                     recipient_list=[winner.email],
                     fail_silently=False,
                 )
+                metrics.inc('auction_emails_sent_total', labels={'kind': 'winner', 'result': 'sent'})
                 print(f"[CRON] Sent winner notification to {winner.email} for item '{item.title}'")
             except Exception as e:
+                metrics.inc('auction_emails_sent_total', labels={'kind': 'winner', 'result': 'failed'})
                 print(f"[CRON] Failed to send email to {winner.email}: {e}")
                 continue  # Don't mark as notified if email failed
             
@@ -62,7 +76,7 @@ Dear {item.owner.username},
 
 Your auction for "{item.title}" has ended.
 
-The winning bid was £{highest_bid.amount} by {winner.username}.
+The winning bid was £{item.current_price} by {winner.username}.
 
 Winner's email: {winner.email}
 
@@ -77,12 +91,60 @@ The Auction Team
                     recipient_list=[item.owner.email],
                     fail_silently=False,
                 )
+                metrics.inc('auction_emails_sent_total', labels={'kind': 'seller', 'result': 'sent'})
                 print(f"[CRON] Sent seller notification to {item.owner.email} for item '{item.title}'")
             except Exception as e:
+                metrics.inc('auction_emails_sent_total', labels={'kind': 'seller', 'result': 'failed'})
                 print(f"[CRON] Failed to send seller email to {item.owner.email}: {e}")
         else:
             print(f"[CRON] No bids for item '{item.title}' - no winner to notify")
         
-        # Mark as notified (even if no bids, to avoid re-processing)
-        item.winner_notified = True
-        item.save()
+        # Mark as settled (even if no bids, to avoid re-processing)
+        lifecycle.settle(item)
+
+    # Ended auctions leave the trending feed
+    feeds.drop_ended()
+
+    metrics.inc('auction_cron_runs_total', labels={'job': 'check_ended_auctions'})
+    metrics.set_gauge('auction_cron_last_run_timestamp_seconds', time.time(), {'job': 'check_ended_auctions'})
+    metrics.set_gauge('auction_cron_last_duration_seconds', time.perf_counter() - started, {'job': 'check_ended_auctions'})
+    metrics.flush()
+
+
+@profiled_job('archive_settled_auctions')
+@tracing.traced_job('archive_settled_auctions')
+def archive_settled_auctions() -> None:
+    """
+    Move settled auctions past the retention period into the archive table.
+    
+    This function is called by django-crontab once a day.
+    """
+    archived = archive.archive_ended_auctions()
+    print(f"[CRON] Archived {archived} settled auctions")
+
+
+@profiled_job('cleanup_stale_data')
+@tracing.traced_job('cleanup_stale_data')
+def cleanup_stale_data() -> None:
+    """
+    Delete expired sessions and orphaned media files in small, throttled batches.
+    
+    This function is called by django-crontab once a day.
+    """
+    result = maintenance.cleanup()
+    print(f"[CRON] Deleted {result.sessions} expired sessions and {result.files} orphaned files")
+    if result.items:
+        print(f"[CRON] Finished deleting {result.items} items")
+
+
+@profiled_job('run_import_jobs')
+@tracing.traced_job('run_import_jobs')
+def run_import_jobs() -> None:
+    """
+    Run the bulk imports queued through the API.
+    
+    This function is called by django-crontab every minute.
+    """
+    processed = bulk_import.run_pending_jobs()
+    if processed:
+        print(f"[CRON] Ran {processed} import jobs")
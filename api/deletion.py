@@ -0,0 +1,125 @@
+"""
+Set-based deletion of items and their bid and Q&A history.
+
+``Item.delete()`` cascades through Django's collector, which loads every
+question into Python to reach its answers and deletes all of an item's bids
+in one statement and transaction, however many there are. Here the items
+are first marked ``deleting`` in one short transaction, which takes them
+out of bidding and the listings. The dependent tables are then cleared
+child first with plain ``DELETE`` statements, at most ``DELETE_BATCH_SIZE``
+rows and one transaction per batch, so memory and lock time stay bounded
+however long an item's history is. The items themselves are deleted last through the ORM, so the
+``post_delete`` receivers (the suggestion index) still run.
+
+Inside an outer transaction, such as the admin's delete view, the batches
+are savepoints of that transaction and its locks are held until it
+commits. Items left ``deleting`` by an interrupted run are finished by
+``finish_interrupted``, which the cleanup cron job calls.
+"""
+
+import time
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Model, QuerySet
+
+from . import caching, suggest
+from .models import Item, Bid, Question, Answer, TrendingScore
+
+
+def _dependents(item_ids: list[int]) -> list[tuple[type[Model], QuerySet]]:
+    """Rows hanging off the items, in a safe deletion order."""
+    return [
+        (Answer, Answer.objects.filter(question__item_id__in=item_ids)),
+        (Question, Question.objects.filter(item_id__in=item_ids)),
+        (Bid, Bid.objects.filter(item_id__in=item_ids)),
+        (TrendingScore, TrendingScore.objects.filter(item_id__in=item_ids)),
+    ]
+
+
+def delete_in_batches(queryset: QuerySet, batch_size: int, pause: float = 0.0) -> int:
+    """
+    Delete the queryset's rows ``batch_size`` at a time; returns the number deleted.
+
+    Each batch is one ``DELETE ... WHERE pk IN (SELECT pk ... LIMIT n)``
+    statement in its own transaction. No rows are loaded into Python and no
+    cascades or delete signals run, so rows referring to these must be
+    deleted first.
+    """
+    model = queryset.model
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    ids, params = queryset.order_by().values('pk')[:batch_size].query.sql_with_params()
+    sql = f'DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({ids})'
+    deleted = 0
+    while True:
+        with transaction.atomic(using=queryset.db), connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            count = cursor.rowcount
+        deleted += count
+        if count < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+def delete_items(
+    item_ids: Iterable[int],
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+) -> dict[str, int]:
+    """Delete items with their bids, Q&A and trending rows; returns rows deleted per model."""
+    if batch_size is None:
+        batch_size = getattr(settings, 'DELETE_BATCH_SIZE', 5000)
+    if pause is None:
+        pause = getattr(settings, 'DELETE_BATCH_PAUSE', 0.0)
+
+    item_ids = list(item_ids)
+    mark_deleting(item_ids)
+    counts: dict[str, int] = {}
+    for model, queryset in _dependents(item_ids):
+        # Children go first, so every model is a leaf by the time it is deleted
+        counts[model._meta.label] = delete_in_batches(queryset, batch_size, pause)
+    counts[Item._meta.label] = 0
+    for start in range(0, len(item_ids), batch_size):
+        batch = item_ids[start:start + batch_size]
+        _, per_model = Item.objects.filter(id__in=batch).delete()
+        for label, count in per_model.items():
+            counts[label] = counts.get(label, 0) + count
+        for item_id in batch:
+            transaction.on_commit(lambda item_id=item_id: caching.invalidate_item(item_id))
+    return counts
+
+
+def mark_deleting(item_ids: list[int]) -> None:
+    """Take the items out of bidding and the listings before their history is deleted."""
+    with transaction.atomic():
+        # Waits for bids in progress, which hold the item row lock
+        Item.objects.filter(id__in=item_ids).update(status=Item.Status.DELETING)
+        for item_id in item_ids:
+            transaction.on_commit(lambda item_id=item_id: caching.invalidate_item(item_id))
+        transaction.on_commit(lambda: suggest.remove_items(item_ids))
+
+
+def finish_interrupted() -> int:
+    """Delete items left ``deleting`` by a run that did not finish; returns the number deleted."""
+    item_ids = list(Item.objects.filter(status=Item.Status.DELETING).values_list('id', flat=True))
+    if item_ids:
+        delete_items(item_ids)
+    return len(item_ids)
+
+
+def delete_item(item: Item) -> dict[str, int]:
+    """Delete one item and its history; see ``delete_items``."""
+    return delete_items([item.id])
+
+
+def related_counts(item_ids: Iterable[int]) -> dict[type[Model], int]:
+    """Rows that ``delete_items`` would remove, per model."""
+    item_ids = list(item_ids)
+    counts = {Item: Item.objects.filter(id__in=item_ids).count()}
+    for model, queryset in _dependents(item_ids):
+        counts[model] = queryset.count()
+    return counts
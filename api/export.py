@@ -0,0 +1,138 @@
+"""
+Streaming exports of items, bids, questions and answers as CSV or JSONL.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` and encoded
+one at a time, so memory use stays flat however many rows are exported. On
+PostgreSQL ``iterator()`` uses a server-side cursor. The same generators back
+the staff-only ``/admin/export/<dataset>/`` endpoint and the ``export_data``
+management command.
+"""
+
+import csv
+import json
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Item, Bid, Question, Answer
+
+
+# dataset -> (queryset, columns, field used by the date-range filter)
+DATASETS: dict[str, tuple[QuerySet, tuple[str, ...], str]] = {
+    'items': (
+        Item.objects.order_by('id'),
+        ('id', 'title', 'owner__username', 'status', 'starting_price', 'current_price',
+         'bid_count', 'views', 'created_at', 'start_datetime', 'end_datetime'),
+        'created_at',
+    ),
+    'bids': (
+        Bid.objects.order_by('id'),
+        ('id', 'item_id', 'item__title', 'bidder__username', 'amount', 'auto', 'timestamp'),
+        'timestamp',
+    ),
+    'questions': (
+        Question.objects.order_by('id'),
+        ('id', 'item_id', 'asker__username', 'text', 'timestamp'),
+        'timestamp',
+    ),
+    'answers': (
+        Answer.objects.order_by('id'),
+        ('id', 'question_id', 'question__item_id', 'responder__username', 'text', 'timestamp'),
+        'timestamp',
+    ),
+}
+
+FORMATS: dict[str, str] = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def parse_bound(value: Optional[str]) -> Optional[datetime]:
+    """Parse a ``since``/``until`` bound given as an ISO date or datetime."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        parsed = datetime.combine(day, dt_time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def export_rows(
+    dataset: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> tuple[tuple[str, ...], Iterator[tuple]]:
+    """Column names and a lazy row iterator; ``since`` is inclusive, ``until`` exclusive."""
+    queryset, columns, date_field = DATASETS[dataset]
+    if since is not None:
+        queryset = queryset.filter(**{f'{date_field}__gte': since})
+    if until is not None:
+        queryset = queryset.filter(**{f'{date_field}__lt': until})
+    chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+    return columns, queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the line instead of storing it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def render_csv(columns: tuple[str, ...], rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_plain(v) for v in row])
+
+
+def render_jsonl(columns: tuple[str, ...], rows: Iterable[tuple]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps({c: _plain(v) for c, v in zip(columns, row)}) + '\n'
+
+
+RENDERERS = {
+    'csv': render_csv,
+    'jsonl': render_jsonl,
+}
+
+
+def export_view(request: HttpRequest, dataset: str) -> HttpResponse:
+    """Stream a dataset as ``?format=csv|jsonl&since=...&until=...`` (staff only)."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff access required'}, status=403)
+    fmt = request.GET.get('format', 'csv')
+    if dataset not in DATASETS:
+        return JsonResponse({'error': f'Unknown dataset: {dataset}'}, status=404)
+    if fmt not in FORMATS:
+        return JsonResponse({'error': f'Unknown format: {fmt}'}, status=400)
+    try:
+        since = parse_bound(request.GET.get('since'))
+        until = parse_bound(request.GET.get('until'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    columns, rows = export_rows(dataset, since, until)
+    response = StreamingHttpResponse(RENDERERS[fmt](columns, rows), content_type=FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{dataset}.{fmt}"'
+    return response
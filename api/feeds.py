@@ -0,0 +1,138 @@
+"""
+Incrementally maintained item feeds for the home page.
+
+- "Ending soon" reads live items in ``(end_datetime, id)`` order straight
+  from the ``api_item_ending_idx`` index.
+- "Trending" reads ``TrendingScore`` rows in score order. Each accepted bid
+  updates its item's row in O(1), and the settlement cron drops the rows of
+  ended auctions, so the index stays small.
+
+Both feeds use keyset (cursor) pagination, so reading a page costs the same
+however large the catalogue is. ``keyset_filter`` and ``keyset_cursor`` do
+the same for any ``(column, id)`` ordering of items, e.g. the item listing.
+"""
+
+import math
+from datetime import datetime, timezone as dt_timezone
+from typing import Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from . import lifecycle
+from .models import Item, TrendingScore
+
+
+# Reference time for trending scores; only differences between scores matter
+TREND_EPOCH = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _decay_rate() -> float:
+    half_life = getattr(settings, 'TRENDING_HALF_LIFE_SECONDS', 3600)
+    return math.log(2) / half_life
+
+
+def _log_weight(when: datetime) -> float:
+    return _decay_rate() * (when - TREND_EPOCH).total_seconds()
+
+
+def _logaddexp(a: float, b: float) -> float:
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def record_bid(item_id: int, when: Optional[datetime] = None) -> None:
+    """Fold one bid into the item's trending score."""
+    weight = _log_weight(when or timezone.now())
+    with transaction.atomic():
+        row, created = TrendingScore.objects.select_for_update().get_or_create(
+            item_id=item_id, defaults={'score': weight}
+        )
+        if not created:
+            row.score = _logaddexp(row.score, weight)
+            row.save(update_fields=['score', 'updated_at'])
+
+
+def drop_ended(now: Optional[datetime] = None) -> int:
+    """Remove trending rows of auctions that have ended."""
+    deleted, _ = TrendingScore.objects.filter(item__end_datetime__lte=now or timezone.now()).delete()
+    return deleted
+
+
+# ============================================================================
+# Feed pages
+# ============================================================================
+
+def _split_cursor(cursor: Optional[str]) -> Optional[tuple[str, int]]:
+    if not cursor or '|' not in cursor:
+        return None
+    value, _, item_id = cursor.rpartition('|')
+    try:
+        return value, int(item_id)
+    except ValueError:
+        return None
+
+
+def keyset_filter(items: QuerySet, ordering: tuple[str, ...], cursor: Optional[str]) -> QuerySet:
+    """
+    The items after ``cursor`` in ``ordering``, a ``(column, id)`` pair sorted
+    the same way, e.g. ``('-created_at', '-id')``. A malformed cursor is ignored.
+    """
+    position = _split_cursor(cursor)
+    if position is None:
+        return items
+    column = ordering[0].lstrip('-')
+    try:
+        value = Item._meta.get_field(column).to_python(position[0])
+    except ValidationError:
+        return items
+    if value is None:
+        return items
+    after = 'lt' if ordering[0].startswith('-') else 'gt'
+    id_after = 'lt' if ordering[1].startswith('-') else 'gt'
+    return items.filter(
+        Q(**{f'{column}__{after}': value}) | Q(**{column: value, f'id__{id_after}': position[1]})
+    )
+
+
+def keyset_cursor(value: object, item_id: int) -> str:
+    """Cursor of the page after the item with sort ``value`` and ``item_id``."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return f"{value}|{item_id}"
+
+
+def ending_soon_page(limit: int, cursor: Optional[str] = None) -> tuple[list[Item], Optional[str]]:
+    """Live items ending soonest, one page after ``cursor``."""
+    ordering = ('end_datetime', 'id')
+    items = keyset_filter(lifecycle.live_items(), ordering, cursor)
+    page = list(items.select_related('owner').order_by(*ordering)[:limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = keyset_cursor(page[-1].end_datetime, page[-1].id)
+    return page, next_cursor
+
+
+def trending_page(limit: int, cursor: Optional[str] = None) -> tuple[list[Item], Optional[str]]:
+    """Live items with the most recent bidding activity, one page after ``cursor``."""
+    lifecycle.open_started()
+    rows: QuerySet = TrendingScore.objects.filter(lifecycle.live_filter(prefix='item__'))
+    position = _split_cursor(cursor)
+    if position:
+        try:
+            score = float(position[0])
+        except ValueError:
+            score = None
+        if score is not None:
+            rows = rows.filter(Q(score__lt=score) | Q(score=score, item_id__gt=position[1]))
+    page = list(rows.select_related('item__owner').order_by('-score', 'item_id')[:limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = f"{page[-1].score!r}|{page[-1].item_id}"
+    return [row.item for row in page], next_cursor
+
@@ -0,0 +1,43 @@
+"""
+Image processing tasks for process pools.
+
+This module imports nothing that needs the app registry, so a ``spawn``-ed
+pool process can unpickle its functions before ``init_worker`` has set
+Django up.
+"""
+
+import io
+import uuid
+import zipfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+
+# Open archives, per pool process
+_archives: dict[str, zipfile.ZipFile] = {}
+
+
+def init_worker() -> None:
+    """Pool initializer: set Django up in the new process."""
+    import django
+    django.setup()
+
+
+def process_archive_image(archive_path: str, member: str, max_size: int) -> str:
+    """Decode, downscale and store one image from a zip; returns the storage name."""
+    archive = _archives.get(archive_path)
+    if archive is None:
+        archive = _archives[archive_path] = zipfile.ZipFile(archive_path)
+    with archive.open(member) as source, Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_size, max_size))
+        out = io.BytesIO()
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image.save(out, 'PNG', optimize=True)
+            extension = 'png'
+        else:
+            image.convert('RGB').save(out, 'JPEG', quality=85, optimize=True)
+            extension = 'jpg'
+    return default_storage.save(f'items/{uuid.uuid4().hex}.{extension}', ContentFile(out.getvalue()))
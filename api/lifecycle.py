@@ -0,0 +1,126 @@
+"""
+Auction status transitions.
+
+``Item.status`` moves scheduled -> live -> ended -> settled. The first two
+steps follow the clock and are applied in bulk by ``advance_statuses``;
+reads of live items also open started auctions first (``open_started``). An
+item is settled once the winner and seller have been notified. Every
+transition is a conditional ``UPDATE`` on the expected current status, so
+concurrent runs and stale model instances can never move an item backwards.
+"""
+
+from datetime import datetime
+from typing import Any, Optional
+
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import caching
+from .models import Item
+
+
+def parse_auction_datetime(value: Any) -> datetime:
+    """Parse an ISO start/end date, treating naive values as the current timezone."""
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise ValueError(f'Invalid datetime: {value}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def open_started(now: Optional[datetime] = None) -> int:
+    """
+    Open scheduled auctions whose start time has passed; returns how many.
+
+    Called before every read of live items, so those can filter on
+    ``status='live'`` alone. The check reads the small scheduled partial
+    index and only writes when there is something to open.
+    """
+    from . import suggest
+
+    now = now or timezone.now()
+    rows = list(
+        Item.objects.filter(status=Item.Status.SCHEDULED, start_datetime__lte=now)
+        .values_list('id', 'title', 'end_datetime')
+    )
+    if not rows:
+        return 0
+    opened = Item.objects.filter(
+        id__in=[item_id for item_id, _, _ in rows], status=Item.Status.SCHEDULED
+    ).update(status=Item.Status.LIVE)
+    if opened:
+        caching.invalidate_lists()
+        suggest.add_rows(rows)
+    return opened
+
+
+def advance_statuses(now: Optional[datetime] = None) -> dict[str, int]:
+    """Open scheduled auctions and close live ones whose time has come."""
+    now = now or timezone.now()
+    opened = open_started(now)
+    closed = Item.objects.filter(
+        status=Item.Status.LIVE, end_datetime__lte=now
+    ).update(status=Item.Status.ENDED)
+    if closed:
+        caching.invalidate_lists()
+    return {'opened': opened, 'closed': closed}
+
+
+def settlement_queue() -> QuerySet:
+    """Ended auctions whose winner and seller have not been notified yet."""
+    return Item.objects.filter(status=Item.Status.ENDED)
+
+
+def settle(item: Item) -> bool:
+    """Mark an ended auction as settled; returns False if it was not ended."""
+    settled = Item.objects.filter(id=item.id, status=Item.Status.ENDED).update(
+        status=Item.Status.SETTLED, winner_notified=True
+    )
+    if settled:
+        item.status = Item.Status.SETTLED
+        item.winner_notified = True
+    return bool(settled)
+
+
+def reschedule(item: Item) -> None:
+    """Re-derive the status of an unsettled item after its dates were edited."""
+    from . import suggest
+
+    status = item.status_for_dates()
+    Item.objects.filter(id=item.id).exclude(
+        status__in=(Item.Status.SETTLED, Item.Status.DELETING)
+    ).update(status=status)
+    if item.status not in (Item.Status.SETTLED, Item.Status.DELETING):
+        item.status = status
+    if item.status == Item.Status.LIVE:
+        suggest.add_rows([(item.id, item.title, item.end_datetime)])
+    else:
+        suggest.remove_items([item.id])
+
+
+def live_filter(now: Optional[datetime] = None, prefix: str = '') -> Q:
+    """
+    Items open for bidding, for ``Item`` or, with ``prefix='item__'``, a relation.
+
+    Only ``live`` items match, so the query reads the live partial indexes.
+    Call ``open_started`` first (``live_items`` does), or scheduled items whose
+    start time has passed are missed until the cron job opens them.
+    """
+    now = now or timezone.now()
+    return Q(**{f'{prefix}status': Item.Status.LIVE, f'{prefix}end_datetime__gt': now})
+
+
+def live_items() -> QuerySet:
+    """Items open for bidding, read from the live partial indexes."""
+    open_started()
+    return Item.objects.filter(live_filter())
+
+
+def settlement_backlog(now: Optional[datetime] = None) -> QuerySet:
+    """Auctions past their end that are not settled yet, including those not yet closed."""
+    now = now or timezone.now()
+    return Item.objects.filter(
+        Q(status=Item.Status.ENDED) | Q(status=Item.Status.LIVE, end_datetime__lte=now)
+    )
@@ -0,0 +1,147 @@
+"""
+Periodic cleanup of expired sessions and orphaned media files.
+
+Expired rows of ``django_session`` are deleted in small batches, one short
+transaction each, with a pause in between so the table stays available to
+the requests that read it. Uploaded images that no item, user or archived
+auction refers to any more are deleted from storage. Those are usually the
+old file after an image was replaced. Files younger than the grace period
+are kept, because an upload may be saved shortly before the row that refers
+to it. Items left marked ``deleting`` by an interrupted deletion are deleted.
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .deletion import delete_in_batches, finish_interrupted
+from .models import ArchivedItem, Item, User
+
+
+@dataclass
+class CleanupResult:
+    sessions: int = 0
+    # Items left half-deleted by an interrupted deletion
+    items: int = 0
+    files: int = 0
+    bytes: int = 0
+    # Names of the orphaned files (deleted unless this was a dry run)
+    orphans: list[str] = field(default_factory=list)
+
+
+def expired_sessions(now: Optional[datetime] = None):
+    return Session.objects.filter(expire_date__lt=now or timezone.now())
+
+
+def delete_expired_sessions(batch_size: Optional[int] = None, pause: Optional[float] = None) -> int:
+    """Delete expired sessions batch by batch; returns the number deleted."""
+    if batch_size is None:
+        batch_size = getattr(settings, 'CLEANUP_BATCH_SIZE', 1000)
+    if pause is None:
+        pause = getattr(settings, 'CLEANUP_BATCH_PAUSE', 0.1)
+    return delete_in_batches(expired_sessions(), batch_size, pause)
+
+
+# ============================================================================
+# Orphaned media
+# ============================================================================
+
+def media_directories() -> list[str]:
+    """Upload directories of the image fields, e.g. ``items`` and ``profiles``."""
+    return [
+        model._meta.get_field(name).upload_to.rstrip('/')
+        for model, name in ((Item, 'image'), (User, 'profile_image'))
+    ]
+
+
+def _name_from_url(url: Optional[str]) -> Optional[str]:
+    """Storage name of an image URL stored in an archived payload."""
+    if not url or settings.MEDIA_URL not in url:
+        return None
+    return unquote(url.split(settings.MEDIA_URL, 1)[1])
+
+
+def referenced_files() -> set[str]:
+    """Storage names of every image still in use."""
+    chunk_size = getattr(settings, 'CLEANUP_BATCH_SIZE', 1000)
+    names = set(
+        Item.objects.exclude(image='').values_list('image', flat=True).iterator(chunk_size=chunk_size)
+    )
+    names.update(
+        User.objects.exclude(profile_image='').exclude(profile_image__isnull=True)
+        .values_list('profile_image', flat=True).iterator(chunk_size=chunk_size)
+    )
+    # Archived auctions keep serving their item and owner images
+    for image, profile_image in (
+        ArchivedItem.objects.values_list('payload__image', 'payload__owner__profile_image')
+        .iterator(chunk_size=chunk_size)
+    ):
+        names.update(name for name in (_name_from_url(image), _name_from_url(profile_image)) if name)
+    return names
+
+
+def _stored_files(directory: str) -> Iterator[str]:
+    if not default_storage.exists(directory):
+        return
+    subdirectories, files = default_storage.listdir(directory)
+    for name in files:
+        yield f'{directory}/{name}'
+    for subdirectory in subdirectories:
+        yield from _stored_files(f'{directory}/{subdirectory}')
+
+
+def orphaned_files(grace: timedelta) -> Iterator[str]:
+    """Stored images that nothing refers to and that are older than ``grace``."""
+    referenced = referenced_files()
+    cutoff = timezone.now() - grace
+    for directory in media_directories():
+        for name in _stored_files(directory):
+            if name not in referenced and default_storage.get_modified_time(name) < cutoff:
+                yield name
+
+
+def delete_orphaned_files(
+    grace: Optional[timedelta] = None,
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+    dry_run: bool = False,
+) -> CleanupResult:
+    """Delete orphaned media files, pausing after every ``batch_size`` deletions."""
+    if grace is None:
+        grace = timedelta(hours=getattr(settings, 'MEDIA_CLEANUP_GRACE_HOURS', 24))
+    if batch_size is None:
+        batch_size = getattr(settings, 'CLEANUP_BATCH_SIZE', 1000)
+    if pause is None:
+        pause = getattr(settings, 'CLEANUP_BATCH_PAUSE', 0.1)
+
+    result = CleanupResult()
+    for name in orphaned_files(grace):
+        result.orphans.append(name)
+        result.bytes += default_storage.size(name)
+        if dry_run:
+            continue
+        default_storage.delete(name)
+        result.files += 1
+        if pause and result.files % batch_size == 0:
+            time.sleep(pause)
+    return result
+
+
+def cleanup(dry_run: bool = False, sessions: bool = True, media: bool = True) -> CleanupResult:
+    """Run the whole cleanup job with the configured batch sizes and pauses."""
+    result = CleanupResult()
+    if not dry_run:
+        result.items = finish_interrupted()
+    if sessions:
+        result.sessions = expired_sessions().count() if dry_run else delete_expired_sessions()
+    if media:
+        files = delete_orphaned_files(dry_run=dry_run)
+        result.files, result.bytes, result.orphans = files.files, files.bytes, files.orphans
+    return result
@@ -0,0 +1,38 @@
+"""
+Management command to move settled auctions into the archive table.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from api.archive import archivable_items, archive_ended_auctions
+
+
+class Command(BaseCommand):
+    help = 'Archives settled auctions older than the retention period'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--retention-days', type=int, default=settings.ARCHIVE_RETENTION_DAYS,
+                            help='Only archive auctions that ended more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE,
+                            help='Items archived per transaction')
+        parser.add_argument('--pause', type=float, default=settings.ARCHIVE_BATCH_PAUSE,
+                            help='Seconds to sleep between batches')
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Stop after archiving this many items')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many items would be archived')
+
+    def handle(self, *args, **options) -> None:
+        if options['dry_run']:
+            count = archivable_items(options['retention_days']).count()
+            self.stdout.write(f"{count} items would be archived")
+            return
+
+        archived = archive_ended_auctions(
+            retention_days=options['retention_days'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            limit=options['limit'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} items"))
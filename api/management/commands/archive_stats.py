@@ -0,0 +1,26 @@
+"""
+Management command to report the size of the hot and archived auction tables.
+"""
+
+from django.core.management.base import BaseCommand
+
+from api.archive import table_stats
+
+
+class Command(BaseCommand):
+    help = 'Reports row counts and sizes of hot vs archived auction tables'
+
+    def handle(self, *args, **options) -> None:
+        stats = table_stats()
+        self.stdout.write(f"{'Tier':<6}{'Table':<20}{'Rows':>12}{'Size':>14}")
+        self.stdout.write("=" * 52)
+        totals: dict[str, list[int]] = {}
+        for row in stats:
+            size = f"{row['bytes'] / 1e6:.1f} MB" if row['bytes'] is not None else 'n/a'
+            self.stdout.write(f"{row['tier']:<6}{row['table']:<20}{row['rows']:>12}{size:>14}")
+            tier = totals.setdefault(row['tier'], [0, 0])
+            tier[0] += row['rows']
+            tier[1] += row['bytes'] or 0
+        self.stdout.write("=" * 52)
+        for tier, (rows, size) in totals.items():
+            self.stdout.write(f"{tier:<6}{'total':<20}{rows:>12}{size / 1e6:>11.1f} MB")
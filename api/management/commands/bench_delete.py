@@ -0,0 +1,96 @@
+"""
+Compare deleting a heavily bid item with ``Item.delete()`` and ``api.deletion``.
+
+For each path an item with ``--bids`` bids and ``--questions`` answered
+questions is inserted, deleted and timed, with the tracemalloc peak and the
+number of queries. Everything runs inside a transaction that is rolled back
+at the end, so the batches of ``delete_items`` share it here; in production
+each batch commits on its own.
+"""
+
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api import deletion
+from api.models import Item, Bid, Question, Answer, User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks Item.delete() against the batched deletion service'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--bids', type=int, default=100_000,
+                            help='Bids on the deleted item')
+        parser.add_argument('--questions', type=int, default=1_000,
+                            help='Questions on the deleted item, each with one answer')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Rows per DELETE (default: DELETE_BATCH_SIZE)')
+
+    def handle(self, *args, **options) -> None:
+        self.stdout.write(f"{'Path':<18}{'Time (s)':>10}{'Peak (MB)':>12}{'Queries':>10}")
+        self.stdout.write('=' * 50)
+        try:
+            with transaction.atomic():
+                owner, bidders = self._users()
+                for label in ('Item.delete()', 'delete_items'):
+                    item = self._seed(owner, bidders, options)
+                    elapsed, peak, queries = self._measure(label, item, options)
+                    self.stdout.write(f'{label:<18}{elapsed:>10.2f}{peak / 1e6:>12.1f}{queries:>10}')
+                    if Bid.objects.filter(item_id=item.id).exists() or Item.objects.filter(id=item.id).exists():
+                        raise CommandError(f'{label} left rows behind')
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _users(self) -> tuple[User, list[User]]:
+        owner = User.objects.create(username='bench-delete-owner', email='bench-delete-owner@example.com')
+        bidders = [
+            User.objects.create(username=f'bench-delete-{n}', email=f'bench-delete-{n}@example.com')
+            for n in range(20)
+        ]
+        return owner, bidders
+
+    def _seed(self, owner: User, bidders: list[User], options: dict) -> Item:
+        item = Item.objects.create(
+            title='Bench deletion item', description='Synthetic benchmark item',
+            starting_price=Decimal('1.00'), image='items/bench.png',
+            end_datetime=timezone.now() + timedelta(days=1), owner=owner,
+        )
+        count = options['bids']
+        for start in range(0, count, 10_000):
+            Bid.objects.bulk_create([
+                Bid(item=item, bidder=bidders[i % len(bidders)], amount=Decimal(i + 2))
+                for i in range(start, min(start + 10_000, count))
+            ])
+        questions = Question.objects.bulk_create([
+            Question(item=item, asker=bidders[i % len(bidders)], text=f'Question {i}')
+            for i in range(options['questions'])
+        ])
+        Answer.objects.bulk_create([
+            Answer(question=question, responder=owner, text='Answer') for question in questions
+        ])
+        return item
+
+    def _measure(self, label: str, item: Item, options: dict) -> tuple[float, int, int]:
+        tracemalloc.start()
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            if label == 'Item.delete()':
+                item.delete()
+            else:
+                deletion.delete_items([item.id], batch_size=options['batch_size'], pause=0)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak, len(queries)
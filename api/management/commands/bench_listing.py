@@ -0,0 +1,98 @@
+"""
+Benchmark the item listing's sort orders and price filters on a large catalogue.
+
+Synthetic items are inserted inside a transaction that is rolled back at the
+end, so the command leaves the database unchanged.
+"""
+
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.utils import timezone
+
+from api import lifecycle
+from api.models import Item, User
+from api.views import ITEM_SORTS
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks item listing sorts and price filters on N synthetic items'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--items', type=int, default=1_000_000,
+                            help='Number of synthetic items to insert')
+        parser.add_argument('--page-size', type=int, default=50,
+                            help='Rows fetched per query')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Runs per query; the median is reported')
+        parser.add_argument('--explain', action='store_true',
+                            help='Print the query plan of each query')
+
+    def handle(self, *args, **options) -> None:
+        try:
+            with transaction.atomic():
+                self._seed(options['items'])
+                self._run(options)
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write('Rolled back synthetic data')
+
+    def _seed(self, count: int) -> None:
+        owner = User.objects.create(username='bench-listing-owner', email='bench-listing@example.com')
+        now = timezone.now()
+        rng = random.Random(42)
+        started = time.perf_counter()
+        batch: list[Item] = []
+        for i in range(count):
+            price = Decimal(rng.randint(100, 1_000_000)) / 100
+            bids = rng.randint(0, 50)
+            end = now + timedelta(seconds=rng.randint(-86400 * 30, 86400 * 30))
+            batch.append(Item(
+                title=f'Bench item {i}',
+                description='Synthetic benchmark item',
+                starting_price=price,
+                current_price=price + bids,
+                bid_count=bids,
+                image='items/bench.png',
+                end_datetime=end,
+                status=Item.Status.LIVE if end > now else Item.Status.SETTLED,
+                owner=owner,
+            ))
+            if len(batch) == 10_000:
+                Item.objects.bulk_create(batch)
+                batch = []
+        Item.objects.bulk_create(batch)
+        self.stdout.write(f'Inserted {count} items in {time.perf_counter() - started:.1f}s')
+
+    def _run(self, options: dict) -> None:
+        # The same filter as the listing, so the plans are the ones it gets
+        live = lifecycle.live_items()
+        queries = {
+            f'sort={name}': live.order_by(*ordering)
+            for name, ordering in ITEM_SORTS.items()
+        }
+        queries['min_price=100&max_price=200&sort=price_asc'] = live.filter(
+            current_price__gte=100, current_price__lte=200
+        ).order_by(*ITEM_SORTS['price_asc'])
+
+        self.stdout.write(f"{'Query':<48}{'First page (ms)':>18}")
+        self.stdout.write('=' * 66)
+        for label, queryset in queries.items():
+            page = queryset.values_list('id', 'current_price')[:options['page_size']]
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                list(page.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(f'{label:<48}{statistics.median(timings):>18.2f}')
+            if options['explain']:
+                self.stdout.write(page.explain())
@@ -0,0 +1,92 @@
+"""
+Measure peak memory of the item listing response, buffered vs streamed.
+
+For each size, synthetic items are inserted inside a transaction that is
+rolled back at the end. The listing view is called with ``my=true&all=true``,
+which bypasses the response cache, and the whole response body is consumed.
+The tracemalloc peak is reported for the buffered ``JsonResponse`` and the
+``?stream=true`` responses.
+"""
+
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import reset_queries, transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from api.models import Item, User
+from api.views import api_items
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Reports peak memory of buffered vs streamed item listings'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000],
+                            help='Listing sizes to measure')
+
+    def handle(self, *args, **options) -> None:
+        self.stdout.write(f"{'Items':>8}{'Mode':>10}{'Peak (MB)':>12}{'Time (s)':>10}{'Bytes':>14}")
+        self.stdout.write('=' * 54)
+        for size in options['sizes']:
+            try:
+                with transaction.atomic():
+                    owner = self._seed(size)
+                    for mode in ('buffered', 'stream'):
+                        peak, elapsed, length = self._measure(owner, stream=mode == 'stream')
+                        self.stdout.write(
+                            f'{size:>8}{mode:>10}{peak / 1e6:>12.1f}{elapsed:>10.2f}{length:>14}'
+                        )
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _seed(self, count: int) -> User:
+        owner = User.objects.create(username='bench-memory-owner', email='bench-memory@example.com')
+        end = timezone.now() + timedelta(days=7)
+        for start in range(0, count, 10_000):
+            Item.objects.bulk_create([
+                Item(
+                    title=f'Bench item {i}',
+                    description='Synthetic benchmark item',
+                    starting_price=Decimal('10.00'),
+                    current_price=Decimal('10.00'),
+                    image='items/bench.png',
+                    end_datetime=end,
+                    owner=owner,
+                )
+                for i in range(start, min(start + 10_000, count))
+            ])
+        return owner
+
+    def _measure(self, owner: User, stream: bool) -> tuple[int, float, int]:
+        query = {'my': 'true', 'all': 'true'}
+        if stream:
+            query['stream'] = 'true'
+        request = RequestFactory().get('/api/items/', query)
+        request.user = owner
+
+        reset_queries()
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = api_items(request)
+        # Consume the body the way the WSGI server would, without keeping it
+        length = 0
+        if stream:
+            for chunk in response.streaming_content:
+                length += len(chunk)
+        else:
+            length = len(response.content)
+        del response
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak, elapsed, length
@@ -0,0 +1,72 @@
+"""
+Measure the overhead of the rate limiter and check that it enforces limits.
+
+Times ``ratelimit.check`` against the configured cache backend, and a trivial
+view with and without the ``rate_limit`` decorator. It then sends a burst
+through the decorator and reports how many requests got a 429.
+"""
+
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandParser
+from django.http import HttpRequest, JsonResponse
+from django.test import RequestFactory, override_settings
+
+from api import ratelimit
+
+
+def _view(request: HttpRequest) -> JsonResponse:
+    return JsonResponse({'ok': True})
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the per-request cost of the rate limiter'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--calls', type=int, default=20_000,
+                            help='Calls timed per measurement')
+
+    def handle(self, *args, **options) -> None:
+        calls = options['calls']
+        factory = RequestFactory()
+        # A limit that is never reached, so every call takes the allowed path
+        limits = {'bench': {'ip': f'{calls * 10}/m'}}
+
+        with override_settings(RATE_LIMITS=limits, RATE_LIMIT_ENABLED=True):
+            request = factory.post('/bench/', REMOTE_ADDR='203.0.113.7')
+            request.user = AnonymousUser()
+            limited = ratelimit.rate_limit('bench')(_view)
+
+            plain_us = self._time(lambda: _view(request), calls)
+            limited_us = self._time(lambda: limited(request), calls)
+            check_us = self._time(lambda: ratelimit.check(request, 'bench'), calls)
+
+        self.stdout.write(f"Cache backend:        {settings.CACHES['default']['BACKEND']}")
+        self.stdout.write(f'check():              {check_us:8.2f} µs per call')
+        self.stdout.write(f'view without limiter: {plain_us:8.2f} µs per call')
+        self.stdout.write(f'view with limiter:    {limited_us:8.2f} µs per call')
+        self.stdout.write(f'overhead:             {limited_us - plain_us:8.2f} µs per call')
+
+        with override_settings(RATE_LIMITS={'burst': {'ip': '10/m'}}, RATE_LIMIT_ENABLED=True):
+            request = factory.post('/bench/', REMOTE_ADDR='203.0.113.8')
+            request.user = AnonymousUser()
+            limited = ratelimit.rate_limit('burst')(_view)
+            statuses = [limited(request).status_code for _ in range(25)]
+            retry_after = limited(request)['Retry-After']
+        self.stdout.write(
+            f'Burst of 25 at 10/m: {statuses.count(200)} allowed, '
+            f'{statuses.count(429)} rejected, Retry-After {retry_after}s'
+        )
+
+    def _time(self, func, calls: int) -> float:
+        """Median of five runs, in microseconds per call."""
+        runs = []
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(calls):
+                func()
+            runs.append((time.perf_counter() - started) / calls * 1e6)
+        return statistics.median(runs)
@@ -0,0 +1,95 @@
+"""
+Compare item list serialization throughput: model instances vs values() rows.
+
+Synthetic items are inserted inside a transaction that is rolled back at the
+end. Both paths are timed end to end (query plus serialization) and for the
+serialization step alone, and their outputs are checked to be identical.
+"""
+
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import Item, User
+from api.serializers import (
+    ITEM_LIST_FIELDS, serialize_item_rows, serialize_items_list, serialize_items_queryset,
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks model-based vs values()-based item list serialization'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--items', type=int, default=20_000,
+                            help='Number of synthetic items')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Runs per measurement; the median is reported')
+
+    def handle(self, *args, **options) -> None:
+        try:
+            with transaction.atomic():
+                self._seed(options['items'])
+                self._run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, count: int) -> None:
+        owner = User.objects.create(
+            username='bench-serializer-owner', email='bench-serializer@example.com',
+            profile_image='profiles/bench.png',
+        )
+        end = timezone.now() + timedelta(days=7)
+        for start in range(0, count, 10_000):
+            Item.objects.bulk_create([
+                Item(
+                    title=f'Bench item {i}',
+                    description='Synthetic benchmark item',
+                    starting_price=Decimal('10.00'),
+                    current_price=Decimal('12.50'),
+                    bid_count=3,
+                    image=f'items/bench {i}.png',
+                    end_datetime=end,
+                    owner=owner,
+                )
+                for i in range(start, min(start + 10_000, count))
+            ])
+
+    def _run(self, options: dict) -> None:
+        queryset = Item.objects.filter(owner__username='bench-serializer-owner').order_by('id')
+        count = queryset.count()
+
+        old = serialize_items_list(list(queryset.select_related('owner')))
+        new = serialize_items_queryset(queryset)
+        # is_active is computed against a different "now" but must agree here
+        if old != new:
+            raise CommandError('values()-based serializer output differs from serialize_item')
+
+        instances = list(queryset.select_related('owner'))
+        rows = list(queryset.values_list(*ITEM_LIST_FIELDS))
+        measurements = {
+            'models, query + serialize': lambda: serialize_items_list(list(queryset.select_related('owner'))),
+            'values, query + serialize': lambda: serialize_items_queryset(queryset),
+            'models, serialize only': lambda: serialize_items_list(instances),
+            'values, serialize only': lambda: list(serialize_item_rows(rows)),
+        }
+
+        self.stdout.write(f"{'Path':<30}{'Items/s':>14}{'ms':>10}")
+        self.stdout.write('=' * 54)
+        for label, func in measurements.items():
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - started)
+            elapsed = statistics.median(timings)
+            self.stdout.write(f'{label:<30}{count / elapsed:>14,.0f}{elapsed * 1000:>10.1f}')
@@ -0,0 +1,139 @@
+"""
+Multi-process bidding benchmark: default vs tuned SQLite settings.
+
+For each mode a fresh SQLite file is migrated and seeded with a few hot
+items. Then ``--processes`` worker processes mix item detail reads and
+``place_bid`` calls on those items for ``--duration`` seconds. Each worker is
+a separate Django process, like a gunicorn worker, with ``SQLITE_TUNED`` set
+for the mode. The report shows throughput, latency and how many operations
+failed with "database is locked".
+
+Models are only imported inside the worker functions: spawned processes
+unpickle them before Django is set up.
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand, CommandParser
+
+
+def _init_worker(environ: dict[str, str]) -> None:
+    os.environ.update(environ)
+    import django
+    django.setup()
+
+
+def _seed(items: int, bidders: int) -> list[int]:
+    from datetime import timedelta
+    from decimal import Decimal
+
+    from django.core.management import call_command
+    from django.utils import timezone
+
+    from api.models import Item, User
+
+    call_command('migrate', verbosity=0)
+    owner = User.objects.create(username='bench-sqlite-owner', email='bench-sqlite-owner@example.com')
+    for n in range(bidders):
+        User.objects.create(username=f'bench-sqlite-{n}', email=f'bench-sqlite-{n}@example.com')
+    return [
+        Item.objects.create(
+            title=f'Bench item {n}', description='Synthetic benchmark item',
+            starting_price=Decimal('1.00'), image='items/bench.png',
+            end_datetime=timezone.now() + timedelta(days=1), owner=owner,
+        ).id
+        for n in range(items)
+    ]
+
+
+def _work(worker: int, item_ids: list[int], duration: float, write_ratio: float) -> dict:
+    from decimal import Decimal
+
+    from django.db import OperationalError
+
+    from api.bidding import BidRejected, place_bid
+    from api.models import Item, User
+    from api.views import item_detail_payload
+
+    rng = random.Random(worker)
+    bidders = list(User.objects.filter(username__startswith='bench-sqlite-').exclude(username='bench-sqlite-owner'))
+    result = {'reads': 0, 'bids': 0, 'rejected': 0, 'locked': 0, 'latencies': []}
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        item_id = rng.choice(item_ids)
+        started = time.perf_counter()
+        try:
+            if rng.random() < write_ratio:
+                price = Item.objects.values_list('current_price', flat=True).get(id=item_id)
+                try:
+                    place_bid(item_id, rng.choice(bidders), price + Decimal('1.00'))
+                    result['bids'] += 1
+                except BidRejected:
+                    # Another process bid first; a normal outcome under contention
+                    result['rejected'] += 1
+            else:
+                item_detail_payload(item_id)
+                result['reads'] += 1
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            result['locked'] += 1
+        result['latencies'].append(time.perf_counter() - started)
+    return result
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks concurrent bidding on SQLite with default and tuned connection settings'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--processes', type=int, default=8, help='Concurrent worker processes')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load per mode')
+        parser.add_argument('--items', type=int, default=5, help='Hot items bid on')
+        parser.add_argument('--bidders', type=int, default=20, help='Distinct bidders')
+        parser.add_argument('--write-ratio', type=float, default=0.3,
+                            help='Share of operations that place a bid')
+
+    def handle(self, *args, **options) -> None:
+        self.stdout.write(
+            f"{'Mode':<9}{'Ops/s':>9}{'Bids':>8}{'Rejected':>10}{'Locked':>8}"
+            f"{'p50 (ms)':>10}{'p99 (ms)':>10}"
+        )
+        self.stdout.write('=' * 64)
+        for mode in ('default', 'tuned'):
+            with tempfile.TemporaryDirectory() as directory:
+                environ = {
+                    'DATABASE_NAME': os.path.join(directory, 'bench.sqlite3'),
+                    'SQLITE_TUNED': 'true' if mode == 'tuned' else 'false',
+                    'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'project.settings'),
+                }
+                self._run(mode, environ, options)
+
+    def _run(self, mode: str, environ: dict[str, str], options: dict) -> None:
+        context = get_context('spawn')
+        with ProcessPoolExecutor(1, mp_context=context, initializer=_init_worker, initargs=(environ,)) as pool:
+            item_ids = pool.submit(_seed, options['items'], options['bidders']).result()
+
+        processes = options['processes']
+        with ProcessPoolExecutor(processes, mp_context=context,
+                                 initializer=_init_worker, initargs=(environ,)) as pool:
+            futures = [
+                pool.submit(_work, worker, item_ids, options['duration'], options['write_ratio'])
+                for worker in range(processes)
+            ]
+            results = [future.result() for future in futures]
+
+        latencies = sorted(latency for result in results for latency in result['latencies'])
+        total = {key: sum(result[key] for result in results) for key in ('reads', 'bids', 'rejected', 'locked')}
+        ops = total['reads'] + total['bids'] + total['rejected']
+        p50 = statistics.median(latencies)
+        p99 = latencies[int(len(latencies) * 0.99)]
+        self.stdout.write(
+            f"{mode:<9}{ops / options['duration']:>9.0f}{total['bids']:>8}{total['rejected']:>10}"
+            f"{total['locked']:>8}{p50 * 1000:>10.1f}{p99 * 1000:>10.1f}"
+        )
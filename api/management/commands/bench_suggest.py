@@ -0,0 +1,72 @@
+"""
+Benchmark the search suggestion prefix index: memory footprint and lookup latency.
+
+The index is built from synthetic titles in memory; the database is not touched.
+"""
+
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from api.suggest import PrefixIndex
+
+
+WORDS = (
+    'vintage antique leather oak desk chair camera lens vinyl record rug persian '
+    'comic book watch swiss tea set china painting oil canvas console nintendo '
+    'telescope brass handbag designer lamp mirror clock radio guitar amp bike '
+    'table sofa jacket boots ring necklace coin stamp poster print sculpture vase'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Reports prefix index memory per N items and lookup latency'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--items', type=int, default=100_000,
+                            help='Number of synthetic titles to index')
+        parser.add_argument('--lookups', type=int, default=10_000,
+                            help='Number of random prefix lookups to time')
+        parser.add_argument('--limit', type=int, default=8,
+                            help='Suggestions returned per lookup')
+
+    def handle(self, *args, **options) -> None:
+        rng = random.Random(7)
+        end = timezone.now() + timedelta(days=7)
+        rows = [
+            (i, ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))) + f' #{i}', end)
+            for i in range(options['items'])
+        ]
+
+        index = PrefixIndex()
+        tracemalloc.start()
+        started = time.perf_counter()
+        index.build(rows)
+        build_seconds = time.perf_counter() - started
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(
+            f"Built index of {options['items']} items ({len(index)} entries) in {build_seconds:.2f}s"
+        )
+        self.stdout.write(
+            f"Memory: {size / 1e6:.1f} MB total, "
+            f"{size / 1e6 * 100_000 / max(1, options['items']):.1f} MB per 100k items"
+        )
+
+        prefixes = [rng.choice(WORDS)[:rng.randint(1, 4)] for _ in range(options['lookups'])]
+        timings = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            index.lookup(prefix, options['limit'])
+            timings.append((time.perf_counter() - started) * 1e6)
+        timings.sort()
+        self.stdout.write(
+            f"Lookup latency: median {statistics.median(timings):.1f} µs, "
+            f"p99 {timings[int(len(timings) * 0.99) - 1]:.1f} µs"
+        )
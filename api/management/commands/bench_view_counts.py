@@ -0,0 +1,96 @@
+"""
+Compare item detail throughput with write-behind view counting against an
+UPDATE per request.
+
+Several threads request the detail page of one hot item through the test
+client. In ``inline`` mode every request also runs
+``UPDATE api_item SET views = views + 1``, which is what the write-behind
+counter avoids. A temporary user and item are created and deleted again.
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from django.db.models import F
+from django.test import Client
+from django.utils import timezone
+
+from api import view_counts
+from api.models import Item, User
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks item detail throughput with write-behind vs per-request view counting'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Requests per client and mode')
+
+    def handle(self, *args, **options) -> None:
+        user = User.objects.create_user('bench-views', 'bench-views@example.com', 'bench-views')
+        item = Item.objects.create(
+            title='Bench views item',
+            description='Synthetic benchmark item',
+            starting_price=10,
+            image='items/bench.png',
+            end_datetime=timezone.now() + timedelta(days=1),
+            owner=user,
+        )
+        try:
+            started = time.perf_counter()
+            for _ in range(100_000):
+                view_counts.record_view(item.id)
+            per_call = (time.perf_counter() - started) / 100_000 * 1e6
+            view_counts.flush()
+            self.stdout.write(f'record_view(): {per_call:.2f} µs per call')
+
+            self.stdout.write(f"{'Mode':<16}{'Requests/s':>14}{'Errors':>10}")
+            self.stdout.write('=' * 40)
+            for mode in ('write-behind', 'inline'):
+                Item.objects.filter(id=item.id).update(views=0)
+                rate, errors = self._run(mode, item.id, user, options)
+                self.stdout.write(f'{mode:<16}{rate:>14.0f}{errors:>10}')
+                if mode == 'write-behind':
+                    view_counts.flush()
+                    views = Item.objects.get(id=item.id).views
+                    expected = options['threads'] * options['requests'] - errors
+                    self.stdout.write(f'  views written: {views} of {expected}')
+        finally:
+            user.delete()
+
+    def _run(self, mode: str, item_id: int, user: User, options: dict) -> tuple[float, int]:
+        errors = 0
+        errors_lock = threading.Lock()
+        barrier = threading.Barrier(options['threads'])
+
+        def client_thread() -> None:
+            nonlocal errors
+            client = Client()
+            client.force_login(user)
+            barrier.wait()
+            failed = 0
+            for _ in range(options['requests']):
+                try:
+                    if client.get(f'/api/items/{item_id}/').status_code != 200:
+                        failed += 1
+                    if mode == 'inline':
+                        Item.objects.filter(id=item_id).update(views=F('views') + 1)
+                except Exception:
+                    failed += 1
+            connection.close()
+            with errors_lock:
+                errors += failed
+
+        threads = [threading.Thread(target=client_thread) for _ in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return options['threads'] * options['requests'] / elapsed, errors
@@ -0,0 +1,53 @@
+"""
+Management command to delete expired sessions and orphaned media files.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from api.maintenance import delete_expired_sessions, delete_orphaned_files, expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired sessions and uploaded images nothing refers to any more'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=settings.CLEANUP_BATCH_SIZE,
+                            help='Sessions deleted per transaction, and files deleted between pauses')
+        parser.add_argument('--pause', type=float, default=settings.CLEANUP_BATCH_PAUSE,
+                            help='Seconds to sleep between batches')
+        parser.add_argument('--grace-hours', type=float, default=settings.MEDIA_CLEANUP_GRACE_HOURS,
+                            help='Keep unreferenced files modified less than this many hours ago')
+        parser.add_argument('--skip-sessions', action='store_true', help='Leave expired sessions alone')
+        parser.add_argument('--skip-media', action='store_true', help='Leave media files alone')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report what would be deleted')
+
+    def handle(self, *args, **options) -> None:
+        dry_run = options['dry_run']
+        if not options['skip_sessions']:
+            if dry_run:
+                self.stdout.write(f"{expired_sessions().count()} expired sessions would be deleted")
+            else:
+                deleted = delete_expired_sessions(options['batch_size'], options['pause'])
+                self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions"))
+
+        if not options['skip_media']:
+            result = delete_orphaned_files(
+                grace=timedelta(hours=options['grace_hours']),
+                batch_size=options['batch_size'],
+                pause=options['pause'],
+                dry_run=dry_run,
+            )
+            if dry_run:
+                for name in result.orphans:
+                    self.stdout.write(f"  {name}")
+                self.stdout.write(
+                    f"{len(result.orphans)} orphaned files ({result.bytes / 1024:.0f} KB) would be deleted"
+                )
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Deleted {result.files} orphaned files ({result.bytes / 1024:.0f} KB)"
+                ))
@@ -10,7 +10,8 @@ from decimal import Decimal
 import random
 from typing import List
 
-from api.models import User, Item, Bid, Question, Answer
+from api.bidding import BidRejected, place_bid
+from api.models import User, Item, Question, Answer
 
 
 class Command(BaseCommand):
@@ -150,16 +151,16 @@ class Command(BaseCommand):
         for item in created_items[:6]:  # Add bids to first 6 items
             bidders = [u for u in test_users if u != item.owner]
             num_bids = random.randint(1, 4)
-            current_price = item.starting_price
+            current_price = item.current_price
             
             for _ in range(num_bids):
                 bidder = random.choice(bidders)
                 bid_amount = current_price + Decimal(random.randint(5, 50))
-                Bid.objects.get_or_create(
-                    item=item,
-                    bidder=bidder,
-                    amount=bid_amount,
-                )
+                try:
+                    place_bid(item.id, bidder, bid_amount)
+                except BidRejected:
+                    # Item already has higher bids from a previous run
+                    break
                 current_price = bid_amount
 
         # Create some questions and answers
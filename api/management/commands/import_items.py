@@ -0,0 +1,56 @@
+"""
+Bulk-import items from a CSV/JSONL manifest and a zip archive of images.
+
+Progress is printed after every batch, and rejected rows are listed at the
+end with their row numbers.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from api.bulk_import import ImportResult, import_items, manifest_format, read_manifest
+from api.models import User
+
+
+class Command(BaseCommand):
+    help = 'Imports items from a CSV/JSONL manifest with images from a zip archive'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('manifest', help='CSV or JSONL manifest file')
+        parser.add_argument('--images', help='Zip archive with the images named in the manifest')
+        parser.add_argument('--owner', required=True, help='Username that will own the items')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Items per bulk_create')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Image processes (default: IMPORT_WORKERS or one per CPU)')
+
+    def handle(self, *args, **options) -> None:
+        owner = User.objects.filter(username=options['owner']).first()
+        if owner is None:
+            raise CommandError(f"No user named {options['owner']}")
+
+        started = time.perf_counter()
+
+        def progress(done: int, total: int, result: ImportResult) -> None:
+            rate = done / (time.perf_counter() - started)
+            self.stdout.write(
+                f'{done}/{total} rows processed, {result.created} created, '
+                f'{len(result.errors)} errors ({rate:.0f} rows/s)'
+            )
+
+        with open(options['manifest'], encoding='utf-8-sig', newline='') as manifest:
+            rows = read_manifest(manifest, manifest_format(options['manifest']))
+            result = import_items(
+                rows, options['images'], owner,
+                batch_size=options['batch_size'],
+                workers=options['workers'],
+                progress=progress,
+            )
+
+        for number, message in result.errors:
+            self.stderr.write(f'Row {number}: {message}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.created} items in {time.perf_counter() - started:.1f}s '
+            f'({len(result.errors)} rows rejected)'
+        ))
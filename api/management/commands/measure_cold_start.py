@@ -0,0 +1,107 @@
+"""
+Measure cold-start-to-first-request time of the production gunicorn setup.
+
+For each mode gunicorn is started with ``gunicorn.conf.py`` on a free local
+port, with ``WARMUP_ENABLED`` on or off. ``/health`` is polled from the
+moment the process is spawned until a worker answers. Then ``--path`` is
+requested once (the first real request) and ten more times. The report
+shows time to first response, the first request's latency and the median
+latency after it.
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _get(url: str) -> float:
+    """Latency of one GET in seconds; raises OSError until the server answers."""
+    started = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=30) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = 'Reports cold-start-to-first-request time of gunicorn with and without warm-up'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Path requested after start (repeatable; default /login/ and /ready)')
+        parser.add_argument('--workers', type=int, default=1, help='Gunicorn workers')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Starts per mode; the median is reported')
+        parser.add_argument('--timeout', type=float, default=60.0,
+                            help='Seconds to wait for the first response')
+
+    def handle(self, *args, **options) -> None:
+        paths = options['paths'] or ['/login/', '/ready']
+        self.stdout.write(f"{'Mode':<10}{'Path':<12}{'Ready (s)':>12}"
+                          f"{'First (ms)':>12}{'Then (ms)':>11}")
+        self.stdout.write('=' * 57)
+        for mode in ('cold', 'warm'):
+            for path in paths:
+                runs = [self._run(mode == 'warm', path, options) for _ in range(options['repeat'])]
+                ready, first, then = (statistics.median(values) for values in zip(*runs))
+                self.stdout.write(f'{mode:<10}{path:<12}{ready:>12.2f}{first * 1000:>12.1f}{then * 1000:>11.1f}')
+
+    def _run(self, warmup: bool, path: str, options: dict) -> tuple[float, float, float]:
+        port = _free_port()
+        env = {
+            **os.environ,
+            'WARMUP_ENABLED': 'true' if warmup else 'false',
+            'GUNICORN_WORKERS': str(options['workers']),
+            'GUNICORN_ACCESS_LOG': '',
+            # The production profile expects Redis; a per-process cache is
+            # enough to time startup
+            'CACHE_BACKEND': os.environ.get('CACHE_BACKEND', 'locmem'),
+            # The production profile refuses to start without a metrics token
+            'METRICS_TOKEN': os.environ.get('METRICS_TOKEN') or 'measure-cold-start',
+        }
+        command = [
+            sys.executable, '-m', 'gunicorn',
+            '-c', os.path.join(settings.BASE_DIR, 'gunicorn.conf.py'),
+            '--bind', f'127.0.0.1:{port}',
+        ]
+        base = f'http://127.0.0.1:{port}'
+
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            command, cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                if process.poll() is not None:
+                    raise CommandError(f'gunicorn exited with status {process.returncode}')
+                if time.perf_counter() - started > options['timeout']:
+                    raise CommandError(f'No response from {base} within {options["timeout"]}s')
+                try:
+                    _get(f'{base}/health')
+                    break
+                except OSError:
+                    time.sleep(0.01)
+            ready = time.perf_counter() - started
+            try:
+                first = _get(base + path)
+                then = statistics.median(_get(base + path) for _ in range(10))
+            except urllib.error.HTTPError as e:
+                raise CommandError(f'{path} returned {e.code}')
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        return ready, first, then
@@ -0,0 +1,77 @@
+"""
+Management command that replays the listing and detail endpoints in-process
+and fails if the worker's resident memory keeps growing.
+"""
+
+import gc
+import time
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.test import Client
+
+from api.memory import current_rss_bytes
+from api.models import Item, User
+
+
+class Command(BaseCommand):
+    help = 'Replays /api/items/ and item detail requests and asserts RSS stays flat'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--iterations', type=int, default=2000,
+                            help='Number of listing + detail request pairs to replay')
+        parser.add_argument('--warmup', type=int, default=200,
+                            help='Iterations to run before taking the RSS baseline')
+        parser.add_argument('--max-growth-mb', type=float, default=10.0,
+                            help='Fail if RSS grows by more than this after warm-up')
+        parser.add_argument('--username', default=None,
+                            help='User to authenticate as (defaults to the first non-staff user)')
+
+    def handle(self, *args, **options) -> None:
+        if options['username']:
+            user = User.objects.filter(username=options['username']).first()
+        else:
+            user = User.objects.filter(is_staff=False).order_by('id').first()
+        if user is None:
+            raise CommandError('No user to authenticate as; run create_test_data first')
+
+        item_ids = list(Item.objects.values_list('id', flat=True)[:50])
+        if not item_ids:
+            raise CommandError('No items to request; run create_test_data first')
+
+        client = Client()
+        client.force_login(user)
+
+        def replay(iteration: int) -> None:
+            response = client.get('/api/items/')
+            if response.status_code != 200:
+                raise CommandError(f'/api/items/ returned {response.status_code}')
+            item_id = item_ids[iteration % len(item_ids)]
+            response = client.get(f'/api/items/{item_id}/')
+            if response.status_code != 200:
+                raise CommandError(f'/api/items/{item_id}/ returned {response.status_code}')
+
+        for i in range(options['warmup']):
+            replay(i)
+        gc.collect()
+        baseline = current_rss_bytes()
+        self.stdout.write(f"Baseline RSS after {options['warmup']} warm-up iterations: {baseline / 1e6:.1f} MB")
+
+        started = time.perf_counter()
+        checkpoint = max(1, options['iterations'] // 10)
+        for i in range(options['iterations']):
+            replay(i)
+            if (i + 1) % checkpoint == 0:
+                self.stdout.write(f"  {i + 1:>7} iterations: RSS {current_rss_bytes() / 1e6:.1f} MB")
+        elapsed = time.perf_counter() - started
+
+        gc.collect()
+        growth_mb = (current_rss_bytes() - baseline) / 1e6
+        self.stdout.write(
+            f"{options['iterations'] * 2} requests in {elapsed:.1f}s "
+            f"({options['iterations'] * 2 / elapsed:.0f} req/s), RSS growth {growth_mb:+.1f} MB"
+        )
+        if growth_mb > options['max_growth_mb']:
+            raise CommandError(
+                f"RSS grew by {growth_mb:.1f} MB (limit {options['max_growth_mb']} MB)"
+            )
+        self.stdout.write(self.style.SUCCESS('RSS stayed flat'))
@@ -0,0 +1,180 @@
+"""
+Worker memory introspection with tracemalloc.
+
+An admin starts a session from ``/admin/memory/``. The worker that serves the
+request starts tracemalloc and takes a baseline snapshot. After the next N
+requests handled by that worker, it takes a second snapshot and writes the
+top allocation sites of the difference to ``MEMORY_REPORT_DIR``. Then it
+stops tracing. Reports from every worker are listed on the same admin page.
+
+When no session is running, the middleware checks one module-level flag.
+"""
+
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import redirect, render
+
+
+# Stack frames kept per traced allocation; each frame adds to tracemalloc's
+# own memory use and to the cost of every allocation
+MAX_FRAMES = 100
+
+_lock = threading.Lock()
+_active: bool = False
+_session: dict[str, Any] = {}
+
+
+def _report_dir() -> str:
+    return getattr(
+        settings, 'MEMORY_REPORT_DIR',
+        os.path.join(tempfile.gettempdir(), 'auction-memory'),
+    )
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process, in bytes."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Not Linux: fall back to the peak RSS, which only ever grows
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def start_session(requests: int, frames: int = 10, top: int = 25) -> None:
+    """Start tracing and take the baseline snapshot for this worker."""
+    global _active
+    with _lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(min(max(frames, 1), MAX_FRAMES))
+        _session.clear()
+        _session.update({
+            'baseline': tracemalloc.take_snapshot(),
+            'target': max(1, requests),
+            'seen': 0,
+            'top': top,
+            'started_at': time.time(),
+            'rss_start': current_rss_bytes(),
+        })
+        _active = True
+
+
+def stop_session() -> None:
+    """Stop tracing without writing a report."""
+    global _active
+    with _lock:
+        _active = False
+        _session.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def session_status() -> Optional[dict[str, Any]]:
+    """Progress of the running session in this worker, if any."""
+    if not _active:
+        return None
+    return {'seen': _session.get('seen', 0), 'target': _session.get('target', 0)}
+
+
+def _finish_session() -> None:
+    """Diff against the baseline, write the report and stop tracing."""
+    global _active
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ))
+    stats = snapshot.compare_to(_session['baseline'], 'lineno')
+    rss_end = current_rss_bytes()
+
+    lines = [
+        f"pid {os.getpid()}: {_session['seen']} requests since "
+        f"{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(_session['started_at']))} UTC",
+        f"RSS {_session['rss_start'] / 1e6:.1f} MB -> {rss_end / 1e6:.1f} MB",
+        f"Traced total: {sum(s.size for s in snapshot.statistics('filename')) / 1e6:.1f} MB",
+        '',
+        f"Top {_session['top']} allocation sites by growth:",
+    ]
+    lines.extend(str(stat) for stat in stats[:_session['top']])
+
+    directory = _report_dir()
+    os.makedirs(directory, exist_ok=True)
+    name = '{}-{}.txt'.format(time.strftime('%Y%m%dT%H%M%S', time.gmtime()), os.getpid())
+    with open(os.path.join(directory, name), 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+    _active = False
+    _session.clear()
+    tracemalloc.stop()
+
+
+def list_reports(limit: int = 20) -> list[dict[str, str]]:
+    """Return the newest reports from all workers."""
+    directory = _report_dir()
+    try:
+        names = sorted((f for f in os.listdir(directory) if f.endswith('.txt')), reverse=True)
+    except OSError:
+        return []
+    reports = []
+    for name in names[:limit]:
+        try:
+            with open(os.path.join(directory, name)) as f:
+                reports.append({'name': name, 'text': f.read()})
+        except OSError:
+            continue
+    return reports
+
+
+class MemoryProfilingMiddleware:
+    """Count requests for the running tracemalloc session of this worker."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        if _active:
+            with _lock:
+                if _active:
+                    _session['seen'] += 1
+                    if _session['seen'] >= _session['target']:
+                        _finish_session()
+        return response
+
+
+def memory_view(request: HttpRequest) -> HttpResponse:
+    """Admin page to start/stop a session and read reports (superusers only)."""
+    if not request.user.is_superuser:
+        return HttpResponse('Superuser access required', status=403)
+
+    if request.method == 'POST':
+        if request.POST.get('action') == 'start':
+            try:
+                requests = int(request.POST.get('requests', '100'))
+                frames = int(request.POST.get('frames', '10'))
+            except ValueError:
+                return HttpResponse('Requests and frames must be whole numbers', status=400)
+            if not 1 <= frames <= MAX_FRAMES:
+                return HttpResponse(f'Frames must be between 1 and {MAX_FRAMES}', status=400)
+            start_session(requests, frames)
+        elif request.POST.get('action') == 'stop':
+            stop_session()
+        return redirect('admin_memory')
+
+    return render(request, 'admin/api/memory.html', {
+        'title': 'Worker memory',
+        'pid': os.getpid(),
+        'rss_mb': current_rss_bytes() / 1e6,
+        'status': session_status(),
+        'reports': list_reports(),
+        'max_frames': MAX_FRAMES,
+    })
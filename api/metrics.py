@@ -0,0 +1,520 @@
+"""
+Prometheus-style metrics for the auction application.
+
+Each process (gunicorn worker, cron run, management command) keeps its
+counters and histograms in plain dictionaries and periodically dumps them to
+its own file in ``METRICS_DIR``. The ``/metrics`` view merges every file it
+finds, so the numbers add up across workers without any shared lock on the
+hot path. The files of processes that have exited (recycled workers, cron
+runs) are folded into ``dead.json`` at scrape time, under a file lock: their
+counters and histograms keep counting, and their gauges are dropped.
+
+Gauges that describe database state (settlement backlog, email outbox) are
+computed at scrape time instead of being tracked incrementally, at most once
+per ``METRICS_DB_GAUGES_TTL`` seconds, and shared through the cache.
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.http import HttpRequest, HttpResponse, JsonResponse
+
+
+try:
+    import fcntl
+except ImportError:  # Windows: exited processes' files are left in place
+    fcntl = None
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _metrics_dir() -> str:
+    return getattr(
+        settings, 'METRICS_DIR',
+        os.path.join(tempfile.gettempdir(), 'auction-metrics'),
+    )
+
+
+def _flush_interval() -> float:
+    return getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+
+
+# ============================================================================
+# Per-process registry
+# ============================================================================
+
+class _Registry:
+    """In-memory metric values for the current process."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # name -> {label_key: value}
+        self.counters: dict[str, dict[str, float]] = {}
+        self.gauges: dict[str, dict[str, float]] = {}
+        # name -> {label_key: [bucket counts..., +Inf count, sum]}
+        self.histograms: dict[str, dict[str, list[float]]] = {}
+        self.last_flush: float = 0.0
+        self.pid: int = os.getpid()
+
+    def reset_if_forked(self) -> None:
+        """Drop values inherited from a parent process (gunicorn preload)."""
+        if self.pid != os.getpid():
+            with self.lock:
+                self.counters.clear()
+                self.gauges.clear()
+                self.histograms.clear()
+                self.last_flush = 0.0
+                self.pid = os.getpid()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                'counters': {k: dict(v) for k, v in self.counters.items()},
+                'gauges': {k: dict(v) for k, v in self.gauges.items()},
+                'histograms': {
+                    k: {lk: list(lv) for lk, lv in v.items()}
+                    for k, v in self.histograms.items()
+                },
+            }
+
+
+_registry = _Registry()
+
+
+def _label_key(labels: Optional[dict[str, str]]) -> str:
+    if not labels:
+        return ''
+    return ','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+        for k, v in sorted(labels.items())
+    )
+
+
+def inc(name: str, value: float = 1.0, labels: Optional[dict[str, str]] = None) -> None:
+    """Increment a counter."""
+    _registry.reset_if_forked()
+    key = _label_key(labels)
+    with _registry.lock:
+        series = _registry.counters.setdefault(name, {})
+        series[key] = series.get(key, 0.0) + value
+    maybe_flush()
+
+
+def set_gauge(name: str, value: float, labels: Optional[dict[str, str]] = None) -> None:
+    """Set a gauge owned by this process (last writer wins across processes)."""
+    _registry.reset_if_forked()
+    key = _label_key(labels)
+    with _registry.lock:
+        _registry.gauges.setdefault(name, {})[key] = value
+    maybe_flush()
+
+
+def observe(name: str, value: float, labels: Optional[dict[str, str]] = None) -> None:
+    """Record an observation in a latency histogram."""
+    _registry.reset_if_forked()
+    key = _label_key(labels)
+    with _registry.lock:
+        series = _registry.histograms.setdefault(name, {})
+        row = series.get(key)
+        if row is None:
+            row = series[key] = [0.0] * (len(LATENCY_BUCKETS) + 2)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                row[i] += 1
+                break
+        else:
+            row[len(LATENCY_BUCKETS)] += 1
+        row[-1] += value
+    maybe_flush()
+
+
+def observe_cache(cache_name: str, hit: bool) -> None:
+    """Count a cache lookup; used by the application's cache helpers."""
+    inc('auction_cache_requests_total', labels={
+        'cache': cache_name,
+        'result': 'hit' if hit else 'miss',
+    })
+
+
+# ============================================================================
+# File-based multiprocess collection
+# ============================================================================
+
+def flush() -> None:
+    """Write this process's metrics to its file in ``METRICS_DIR``."""
+    directory = _metrics_dir()
+    data = _registry.snapshot()
+    if not any(data.values()):
+        return
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Metrics must never break a request
+        pass
+    _registry.last_flush = time.monotonic()
+
+
+def maybe_flush() -> None:
+    """Flush if the last flush is older than ``METRICS_FLUSH_INTERVAL``."""
+    if time.monotonic() - _registry.last_flush >= _flush_interval():
+        flush()
+
+
+atexit.register(flush)
+
+
+# Counters and histograms of processes that have exited
+DEAD_FILE = 'dead.json'
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name != 'posix':
+        # os.kill() would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # e.g. EPERM: the process exists but belongs to someone else
+        return True
+    return True
+
+
+def _file_pid(filename: str) -> Optional[int]:
+    stem = filename[:-len('.json')]
+    return int(stem) if stem.isdigit() else None
+
+
+def _merge(merged: dict[str, Any], data: dict[str, Any], gauges: bool = True) -> None:
+    for name, series in data.get('counters', {}).items():
+        target = merged['counters'].setdefault(name, {})
+        for key, value in series.items():
+            target[key] = target.get(key, 0.0) + value
+    if gauges:
+        for name, series in data.get('gauges', {}).items():
+            merged['gauges'].setdefault(name, {}).update(series)
+    for name, series in data.get('histograms', {}).items():
+        target = merged['histograms'].setdefault(name, {})
+        for key, row in series.items():
+            if key in target:
+                target[key] = [a + b for a, b in zip(target[key], row)]
+            else:
+                target[key] = list(row)
+
+
+def _read(path: str) -> Optional[dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _metric_files(directory: str) -> list[str]:
+    try:
+        return [f for f in os.listdir(directory) if f.endswith('.json')]
+    except OSError:
+        return []
+
+
+@contextlib.contextmanager
+def _scrape_lock(directory: str) -> Iterator[bool]:
+    """Serialize scrapes, so none reads a file that another is folding; yields False without locking."""
+    if fcntl is None:
+        yield False
+        return
+    try:
+        lock = open(os.path.join(directory, '.lock'), 'a')
+    except OSError:
+        yield False
+        return
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _prune_dead_processes(directory: str) -> int:
+    """Fold the files of exited processes into ``DEAD_FILE``; returns how many."""
+    dead = [
+        filename for filename in _metric_files(directory)
+        if (pid := _file_pid(filename)) is not None and not _pid_alive(pid)
+    ]
+    if not dead:
+        return 0
+    path = os.path.join(directory, DEAD_FILE)
+    merged: dict[str, Any] = {'counters': {}, 'gauges': {}, 'histograms': {}}
+    _merge(merged, _read(path) or {}, gauges=False)
+    for filename in dead:
+        _merge(merged, _read(os.path.join(directory, filename)) or {}, gauges=False)
+    try:
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(merged, f)
+        os.replace(f'{path}.tmp', path)
+        for filename in dead:
+            os.unlink(os.path.join(directory, filename))
+    except OSError:
+        return 0
+    return len(dead)
+
+
+def _collect() -> dict[str, Any]:
+    """Merge the metric files of every process that has written one."""
+    flush()
+    merged: dict[str, Any] = {'counters': {}, 'gauges': {}, 'histograms': {}}
+    directory = _metrics_dir()
+    with _scrape_lock(directory) as locked:
+        if locked:
+            _prune_dead_processes(directory)
+        for filename in _metric_files(directory):
+            data = _read(os.path.join(directory, filename))
+            if data is None:
+                continue
+            # A gauge is only meaningful while its process is running
+            pid = _file_pid(filename)
+            _merge(merged, data, gauges=pid is not None and _pid_alive(pid))
+    return merged
+
+
+# ============================================================================
+# Scrape-time gauges
+# ============================================================================
+
+DB_GAUGES_CACHE_KEY = 'metrics:db-gauges'
+
+
+def _database_gauges() -> dict[str, float]:
+    """Gauges computed from the database when /metrics is scraped."""
+    from . import lifecycle
+
+    backlog = lifecycle.settlement_backlog()
+    gauges = {
+        'auction_settlement_backlog': backlog.count(),
+        # Each settled item with a winner sends two emails (winner and seller)
+        'auction_email_outbox_depth': 2 * backlog.filter(bids__isnull=False).distinct().count(),
+        'auction_live_items': lifecycle.live_items().count(),
+    }
+    if connection.vendor == 'postgresql':
+        gauges.update(_postgres_connection_gauges())
+    return gauges
+
+
+def _cached_database_gauges() -> dict[str, float]:
+    """
+    ``_database_gauges``, computed at most once per ``METRICS_DB_GAUGES_TTL``.
+
+    The result is shared by every worker through the cache, so frequent or
+    repeated scrapes do not repeat the COUNT queries.
+    """
+    ttl = getattr(settings, 'METRICS_DB_GAUGES_TTL', 15)
+    gauges = cache.get(DB_GAUGES_CACHE_KEY) if ttl else None
+    if gauges is None:
+        gauges = _database_gauges()
+        if ttl:
+            cache.set(DB_GAUGES_CACHE_KEY, gauges, ttl)
+    return gauges
+
+
+def _postgres_connection_gauges() -> dict[str, float]:
+    """Server connections to this database, from every worker and the cron job."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*), count(*) FILTER (WHERE state = 'active') "
+            "FROM pg_stat_activity WHERE datname = current_database()"
+        )
+        total, active = cursor.fetchone()
+        cursor.execute('SHOW max_connections')
+        max_connections = int(cursor.fetchone()[0])
+    return {
+        'auction_db_connections': float(total),
+        'auction_db_connections_active': float(active),
+        'auction_db_max_connections': float(max_connections),
+    }
+
+
+def _db_connection_gauges() -> dict[str, float]:
+    """
+    The scraping worker's own connection and the configured lifetime.
+
+    SQLite has no server to ask for the connections of the other processes,
+    so this is all there is there; on PostgreSQL ``_postgres_connection_gauges``
+    reports the real usage.
+    """
+    max_age = connection.settings_dict.get('CONN_MAX_AGE') or 0
+    return {
+        'auction_db_connection_open': 1.0 if connection.connection is not None else 0.0,
+        'auction_db_conn_max_age_seconds': float(max_age if max_age is not None else -1),
+    }
+
+
+# ============================================================================
+# Exposition
+# ============================================================================
+
+_HELP: dict[str, tuple[str, str]] = {
+    'auction_http_request_duration_seconds': ('histogram', 'Request latency per view.'),
+    'auction_http_requests_total': ('counter', 'Requests served per view and status code.'),
+    'auction_bids_placed_total': ('counter', 'Bids accepted by the API.'),
+    'auction_cache_requests_total': ('counter', 'Cache lookups by cache and result.'),
+    'auction_emails_sent_total': ('counter', 'Notification emails sent by the cron job.'),
+    'auction_cron_runs_total': ('counter', 'Completed cron job runs.'),
+    'auction_cron_last_run_timestamp_seconds': ('gauge', 'Unix time of the last cron run.'),
+    'auction_cron_last_duration_seconds': ('gauge', 'Duration of the last cron run.'),
+    'auction_settlement_backlog': ('gauge', 'Ended auctions whose winner has not been notified.'),
+    'auction_email_outbox_depth': ('gauge', 'Notification emails waiting for the next cron run.'),
+    'auction_live_items': ('gauge', 'Auctions that have not ended yet.'),
+    'auction_db_connections': ('gauge', 'Server connections to the database (PostgreSQL only).'),
+    'auction_db_connections_active': ('gauge', 'Server connections running a query (PostgreSQL only).'),
+    'auction_db_max_connections': ('gauge', 'The server connection limit (PostgreSQL only).'),
+    'auction_db_connection_open': ('gauge', 'Whether the scraping worker holds an open DB connection.'),
+    'auction_db_conn_max_age_seconds': ('gauge', 'Configured persistent connection lifetime.'),
+    'auction_db_ping_seconds': ('gauge', 'Round-trip time of a trivial database query.'),
+    'auction_db_up': ('gauge', 'Whether the database answered the scrape-time queries.'),
+}
+
+
+def _header(lines: list[str], name: str) -> None:
+    kind, text = _HELP.get(name, ('untyped', name))
+    lines.append(f'# HELP {name} {text}')
+    lines.append(f'# TYPE {name} {kind}')
+
+
+def _series(name: str, key: str, value: float) -> str:
+    return f'{name}{{{key}}} {value:g}' if key else f'{name} {value:g}'
+
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    data = _collect()
+    lines: list[str] = []
+
+    for name, series in sorted(data['counters'].items()):
+        _header(lines, name)
+        for key, value in sorted(series.items()):
+            lines.append(_series(name, key, value))
+
+    gauges = data['gauges']
+    latency = ping_database()
+    try:
+        database_gauges = _cached_database_gauges()
+    except DatabaseError:
+        # Still serve the process metrics while the database is down
+        database_gauges = {}
+    up = latency is not None and bool(database_gauges)
+    for name, value in {**database_gauges, **_db_connection_gauges()}.items():
+        gauges[name] = {'': value}
+    gauges['auction_db_up'] = {'': 1.0 if up else 0.0}
+    if latency is not None:
+        gauges['auction_db_ping_seconds'] = {'': latency}
+    for name, series in sorted(gauges.items()):
+        _header(lines, name)
+        for key, value in sorted(series.items()):
+            lines.append(_series(name, key, value))
+
+    for name, series in sorted(data['histograms'].items()):
+        _header(lines, name)
+        for key, row in sorted(series.items()):
+            prefix = f'{key},' if key else ''
+            cumulative = 0.0
+            for bound, count in zip(LATENCY_BUCKETS, row):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{prefix}le="{bound:g}"}} {cumulative:g}')
+            cumulative += row[len(LATENCY_BUCKETS)]
+            lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {cumulative:g}')
+            lines.append(_series(f'{name}_sum', key, row[-1]))
+            lines.append(_series(f'{name}_count', key, cumulative))
+
+    return '\n'.join(lines) + '\n'
+
+
+def ping_database() -> Optional[float]:
+    """Time a ``SELECT 1`` round trip; None if the database is unreachable."""
+    try:
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        return time.perf_counter() - start
+    except Exception:
+        return None
+
+
+# ============================================================================
+# Views and middleware
+# ============================================================================
+
+def _metrics_allowed(request: HttpRequest) -> bool:
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        return request.headers.get('Authorization', '') == f'Bearer {token}'
+    return True
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Expose metrics for Prometheus."""
+    if not _metrics_allowed(request):
+        return HttpResponse('Forbidden', status=403)
+    return HttpResponse(
+        render_metrics(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+def readiness_view(request: HttpRequest) -> JsonResponse:
+    """Readiness probe: OK only if the database answers within the threshold."""
+    latency = ping_database()
+    threshold = getattr(settings, 'READINESS_DB_LATENCY_THRESHOLD', 1.0)
+    if latency is None:
+        return JsonResponse({'status': 'unavailable', 'database': 'unreachable'}, status=503)
+    ready = latency <= threshold
+    return JsonResponse(
+        {
+            'status': 'ok' if ready else 'degraded',
+            'db_latency_ms': round(latency * 1000, 3),
+        },
+        status=200 if ready else 503,
+    )
+
+
+class MetricsMiddleware:
+    """Record request latency and status per resolved view."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match._func_path) if match else 'unresolved'
+        if view in ('metrics', 'ready'):
+            return response
+        observe('auction_http_request_duration_seconds', elapsed, {'view': view})
+        inc('auction_http_requests_total', labels={
+            'view': view,
+            'method': request.method or '',
+            'status': str(response.status_code),
+        })
+        return response
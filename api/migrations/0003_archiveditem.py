@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_admin_changelist_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('end_datetime', models.DateTimeField()),
+                ('final_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('bid_count', models.PositiveIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.JSONField(help_text='Serialized item detail with all bids and questions')),
+                ('owner', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived item',
+                'verbose_name_plural': 'Archived items',
+                'ordering': ['-end_datetime'],
+            },
+        ),
+    ]
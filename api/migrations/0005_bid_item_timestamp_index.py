@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_feeds'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['item', 'timestamp'], name='api_bid_item_timestamp_idx'),
+        ),
+    ]
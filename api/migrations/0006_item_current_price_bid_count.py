@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:05
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_prices(apps, schema_editor):
+    """Populate current_price and bid_count from existing bids in batches."""
+    Item = apps.get_model('api', 'Item')
+    Bid = apps.get_model('api', 'Bid')
+    batch_size = 1000
+    last_id = 0
+    while True:
+        items = list(Item.objects.filter(id__gt=last_id).order_by('id')[:batch_size])
+        if not items:
+            break
+        stats = {
+            row['item_id']: row
+            for row in Bid.objects.filter(item_id__in=[i.id for i in items])
+            .values('item_id').annotate(highest=Max('amount'), count=Count('id'))
+        }
+        for item in items:
+            row = stats.get(item.id)
+            item.current_price = row['highest'] if row else item.starting_price
+            item.bid_count = row['count'] if row else 0
+        Item.objects.bulk_update(items, ['current_price', 'bid_count'])
+        last_id = items[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_bid_item_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='bid_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of bids, maintained when bids are placed'),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='current_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Highest bid or starting price, maintained when bids are placed', max_digits=10),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_prices, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['current_price', 'id'], name='api_item_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['bid_count', 'id'], name='api_item_bid_count_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_item_current_price_bid_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='views',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of detail page views, flushed in batches'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['views', 'id'], name='api_item_views_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:16
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_status(apps, schema_editor):
+    """Derive the status of existing rows; every row starts out as 'live'."""
+    Item = apps.get_model('api', 'Item')
+    Item.objects.filter(winner_notified=True).update(status='settled')
+    Item.objects.filter(winner_notified=False, end_datetime__lte=timezone.now()).update(status='ended')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_item_views'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='start_datetime',
+            field=models.DateTimeField(blank=True, help_text='Date and time when bidding opens; empty to open on creation', null=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='status',
+            field=models.CharField(choices=[('scheduled', 'Scheduled'), ('live', 'Live'), ('ended', 'Ended'), ('settled', 'Settled')], default='live', editable=False, help_text='Advanced by the settlement cron job (api.lifecycle)', max_length=10),
+        ),
+        migrations.RunPython(backfill_status, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('status', 'scheduled')), fields=['start_datetime'], name='api_item_scheduled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('status', 'live')), fields=['end_datetime', 'id'], name='api_item_live_ending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('status', 'live')), fields=['created_at'], name='api_item_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('status', 'ended')), fields=['end_datetime', 'id'], name='api_item_ended_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('status', 'settled')), fields=['end_datetime', 'id'], name='api_item_settled_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Max, OuterRef, Subquery
+
+
+def backfill_leaders(apps, schema_editor):
+    """Existing bids are plain bids: the leader's maximum is the current price."""
+    Item = apps.get_model('api', 'Item')
+    Bid = apps.get_model('api', 'Bid')
+    highest = Bid.objects.filter(item=OuterRef('pk')).order_by('-amount', 'timestamp', 'id')
+    Item.objects.filter(bid_count__gt=0).update(
+        leader_id=Subquery(highest.values('bidder_id')[:1]),
+        leader_max=F('current_price'),
+    )
+    runner_up = (
+        Bid.objects.filter(item=OuterRef('pk')).exclude(bidder_id=OuterRef('leader_id'))
+        .values('item').annotate(highest=Max('amount')).values('highest')
+    )
+    Item.objects.filter(leader__isnull=False).update(runner_up_max=Subquery(runner_up))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_item_status'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='bid',
+            options={'ordering': ['-amount', '-id'], 'verbose_name': 'Bid', 'verbose_name_plural': 'Bids'},
+        ),
+        migrations.AddField(
+            model_name='bid',
+            name='auto',
+            field=models.BooleanField(default=False, help_text="Placed by the proxy bidding engine on the bidder's behalf"),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='leader',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Current highest bidder, maintained when bids are placed', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='leader_max',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text="The leader's maximum bid; never shown to other users", max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='runner_up_max',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text='Highest maximum bid among the other bidders', max_digits=10, null=True),
+        ),
+        migrations.RunPython(backfill_leaders, migrations.RunPython.noop),
+    ]
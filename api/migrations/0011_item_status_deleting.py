@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_importjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='item',
+            name='status',
+            field=models.CharField(choices=[('scheduled', 'Scheduled'), ('live', 'Live'), ('ended', 'Ended'), ('settled', 'Settled'), ('deleting', 'Deleting')], default='live', editable=False, help_text='Advanced by the settlement cron job (api.lifecycle)', max_length=10),
+        ),
+    ]
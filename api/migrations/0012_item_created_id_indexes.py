@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_item_status_deleting'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='item',
+            name='api_item_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='item',
+            name='api_item_live_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['created_at', 'id'], name='api_item_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('status', 'live')), fields=['created_at', 'id'], name='api_item_live_created_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_item_created_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('status', 'live')), fields=['current_price', 'id'], name='api_item_live_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('status', 'live')), fields=['bid_count', 'id'], name='api_item_live_bid_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('status', 'live')), fields=['views', 'id'], name='api_item_live_views_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
+from datetime import datetime
 from typing import Optional
 
 
@@ -32,6 +33,14 @@ class User(AbstractUser):
 class Item(models.Model):
     """Auction item that can be bid on."""
     
+    class Status(models.TextChoices):
+        """Auction lifecycle: scheduled -> live -> ended -> settled; deleting from any."""
+        SCHEDULED = 'scheduled', 'Scheduled'
+        LIVE = 'live', 'Live'
+        ENDED = 'ended', 'Ended'
+        SETTLED = 'settled', 'Settled'
+        DELETING = 'deleting', 'Deleting'
+    
     title: models.CharField = models.CharField(max_length=200)
     description: models.TextField = models.TextField()
     starting_price: models.DecimalField = models.DecimalField(
@@ -43,9 +52,21 @@ class Item(models.Model):
         upload_to='items/',
         help_text="Image of the item"
     )
+    start_datetime: models.DateTimeField = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Date and time when bidding opens; empty to open on creation"
+    )
     end_datetime: models.DateTimeField = models.DateTimeField(
         help_text="Date and time when the auction ends"
     )
+    status: models.CharField = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.LIVE,
+        editable=False,
+        help_text="Advanced by the settlement cron job (api.lifecycle)"
+    )
     owner: models.ForeignKey = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -57,35 +78,155 @@ class Item(models.Model):
         default=False,
         help_text="Whether the winner has been notified via email"
     )
+    current_price: models.DecimalField = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        editable=False,
+        help_text="Highest bid or starting price, maintained when bids are placed"
+    )
+    bid_count: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of bids, maintained when bids are placed"
+    )
+    views: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of detail page views, flushed in batches"
+    )
+    # Proxy bidding state (api.bidding): the top two maxima are enough to
+    # resolve any incoming bid without replaying the bid history
+    leader: models.ForeignKey = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        help_text="Current highest bidder, maintained when bids are placed"
+    )
+    leader_max: models.DecimalField = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="The leader's maximum bid; never shown to other users"
+    )
+    runner_up_max: models.DecimalField = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Highest maximum bid among the other bidders"
+    )
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='api_item_created_idx'),
+            models.Index(fields=['end_datetime', 'id'], name='api_item_ending_idx'),
+            models.Index(fields=['current_price', 'id'], name='api_item_price_idx'),
+            models.Index(fields=['bid_count', 'id'], name='api_item_bid_count_idx'),
+            models.Index(fields=['views', 'id'], name='api_item_views_idx'),
+            # Partial indexes: each status query reads only its own rows
+            models.Index(
+                fields=['start_datetime'], name='api_item_scheduled_idx',
+                condition=models.Q(status='scheduled'),
+            ),
+            models.Index(
+                fields=['end_datetime', 'id'], name='api_item_live_ending_idx',
+                condition=models.Q(status='live'),
+            ),
+            models.Index(
+                fields=['created_at', 'id'], name='api_item_live_created_idx',
+                condition=models.Q(status='live'),
+            ),
+            models.Index(
+                fields=['current_price', 'id'], name='api_item_live_price_idx',
+                condition=models.Q(status='live'),
+            ),
+            models.Index(
+                fields=['bid_count', 'id'], name='api_item_live_bid_count_idx',
+                condition=models.Q(status='live'),
+            ),
+            models.Index(
+                fields=['views', 'id'], name='api_item_live_views_idx',
+                condition=models.Q(status='live'),
+            ),
+            models.Index(
+                fields=['end_datetime', 'id'], name='api_item_ended_idx',
+                condition=models.Q(status='ended'),
+            ),
+            models.Index(
+                fields=['end_datetime', 'id'], name='api_item_settled_idx',
+                condition=models.Q(status='settled'),
+            ),
+        ]
         verbose_name = 'Item'
         verbose_name_plural = 'Items'
 
+    # Columns that Item.save() leaves alone unless named in update_fields
+    MAINTAINED_FIELDS: tuple[str, ...] = (
+        'current_price', 'bid_count', 'views', 'status', 'leader', 'leader_max', 'runner_up_max',
+    )
+
     def __str__(self) -> str:
         return self.title
 
+    def save(self, *args, **kwargs) -> None:
+        if self._state.adding:
+            if self.current_price is None:
+                self.current_price = self.starting_price
+            self.status = self.status_for_dates()
+            super().save(*args, **kwargs)
+            return
+        
+        # The price and proxy columns are maintained by bid placement, views by
+        # the view counter and status by api.lifecycle; never write back
+        # possibly stale copies of them
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        
+        # Without bids the current price follows the starting price
+        if update_fields is None or 'starting_price' in update_fields:
+            Item.objects.filter(pk=self.pk, bid_count=0).update(current_price=models.F('starting_price'))
+            if not self.bid_count:
+                self.current_price = self.starting_price
+
+    def status_for_dates(self, now: Optional[datetime] = None) -> str:
+        """The unsettled status implied by the start and end dates."""
+        now = now or timezone.now()
+        if self.start_datetime and now < self.start_datetime:
+            return self.Status.SCHEDULED
+        if now < self.end_datetime:
+            return self.Status.LIVE
+        return self.Status.ENDED
+
     @property
     def is_active(self) -> bool:
         """Check if the auction is still active."""
-        return timezone.now() < self.end_datetime
-
-    @property
-    def current_price(self) -> models.DecimalField:
-        """Get the current highest bid or starting price."""
-        highest_bid = self.bids.order_by('-amount').first()
-        if highest_bid:
-            return highest_bid.amount
-        return self.starting_price
+        # The cron job opens scheduled items and closes ended ones every few
+        # minutes; the start and end time checks cover the gap
+        now = timezone.now()
+        if now >= self.end_datetime:
+            return False
+        if self.status == self.Status.SCHEDULED:
+            return self.start_datetime is not None and self.start_datetime <= now
+        return self.status == self.Status.LIVE
 
     @property
     def highest_bidder(self) -> Optional['User']:
-        """Get the user with the highest bid."""
-        highest_bid = self.bids.order_by('-amount').first()
-        if highest_bid:
-            return highest_bid.bidder
-        return None
+        """Get the user currently winning the auction."""
+        # Ties on amount go to the earlier maximum, so this is tracked on the
+        # item rather than derived from the bids
+        return self.leader
 
 
 class Bid(models.Model):
@@ -105,10 +246,19 @@ class Bid(models.Model):
         max_digits=10,
         decimal_places=2
     )
+    auto: models.BooleanField = models.BooleanField(
+        default=False,
+        help_text="Placed by the proxy bidding engine on the bidder's behalf"
+    )
     timestamp: models.DateTimeField = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ['-amount']
+        # Equal amounts: the proxy answer is placed after the bid it matches
+        ordering = ['-amount', '-id']
+        indexes = [
+            models.Index(fields=['timestamp'], name='api_bid_timestamp_idx'),
+            models.Index(fields=['item', 'timestamp'], name='api_bid_item_timestamp_idx'),
+        ]
         verbose_name = 'Bid'
         verbose_name_plural = 'Bids'
 
@@ -134,6 +284,9 @@ class Question(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['timestamp'], name='api_question_timestamp_idx'),
+        ]
         verbose_name = 'Question'
         verbose_name_plural = 'Questions'
 
@@ -159,8 +312,122 @@ class Answer(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['timestamp'], name='api_answer_timestamp_idx'),
+        ]
         verbose_name = 'Answer'
         verbose_name_plural = 'Answers'
 
     def __str__(self) -> str:
         return f"Answer by {self.responder.username}"
+
+
+class TrendingScore(models.Model):
+    """
+    Rollup row ranking live items by recent bidding activity.
+
+    ``score`` is the log of the sum of ``exp(rate * t)`` over bid times
+    ``t``, so ordering by it equals ordering by an exponentially decayed
+    bid count at any moment without rewriting rows as time passes.
+    """
+
+    item: models.OneToOneField = models.OneToOneField(
+        Item,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending'
+    )
+    score: models.FloatField = models.FloatField()
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score', 'item'], name='api_trending_score_idx'),
+        ]
+        verbose_name = 'Trending score'
+        verbose_name_plural = 'Trending scores'
+
+    def __str__(self) -> str:
+        return f"Trending score {self.score:.3f} for item {self.item_id}"
+
+
+class ArchivedItem(models.Model):
+    """
+    Settled auction moved out of the hot tables by the archival job.
+
+    The primary key is the original item id. ``payload`` holds the item's
+    detail representation, including every bid and question.
+    """
+
+    id: models.BigIntegerField = models.BigIntegerField(primary_key=True)
+    title: models.CharField = models.CharField(max_length=200)
+    owner: models.ForeignKey = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='archived_items'
+    )
+    end_datetime: models.DateTimeField = models.DateTimeField()
+    final_price: models.DecimalField = models.DecimalField(
+        max_digits=10,
+        decimal_places=2
+    )
+    bid_count: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    archived_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    payload: models.JSONField = models.JSONField(help_text="Serialized item detail with all bids and questions")
+
+    class Meta:
+        ordering = ['-end_datetime']
+        verbose_name = 'Archived item'
+        verbose_name_plural = 'Archived items'
+
+    def __str__(self) -> str:
+        return self.title
+
+
+class ImportJob(models.Model):
+    """
+    Bulk item import uploaded through the API and run by the cron job.
+
+    The uploaded manifest and image archive are kept in ``IMPORT_DIR`` under
+    ``manifest`` and ``images`` until the job has finished.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    owner: models.ForeignKey = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='import_jobs'
+    )
+    status: models.CharField = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED
+    )
+    manifest: models.CharField = models.CharField(max_length=255)
+    manifest_format: models.CharField = models.CharField(max_length=5)
+    images: models.CharField = models.CharField(max_length=255, blank=True)
+    total_rows: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    processed_rows: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    created_items: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    errors: models.JSONField = models.JSONField(default=list, help_text="Rejected rows as {row, error}")
+    message: models.TextField = models.TextField(blank=True, help_text="Why the job failed")
+    created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    started_at: models.DateTimeField = models.DateTimeField(null=True, blank=True)
+    finished_at: models.DateTimeField = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='api_importjob_queue_idx'),
+        ]
+        verbose_name = 'Import job'
+        verbose_name_plural = 'Import jobs'
+
+    def __str__(self) -> str:
+        return f"Import job {self.id} ({self.status})"
@@ -0,0 +1,127 @@
+"""
+Downsampled price history for charting an item's bid curve.
+
+The bid curve is split into ``points`` equal-width time buckets between the
+item's creation and the last bid (or the auction end, if it is over). Each
+bucket reports the price at its close, which is the highest bid so far or
+the starting price, plus the number of bids placed in it. The database
+groups the bids by bucket index and returns one ``(bucket, highest bid,
+bids)`` row per non-empty bucket, so the work in Python is bounded by
+``points`` however many bids there are. The result is cached under the
+item's latest bid id, so a new bid invalidates it implicitly. While the
+auction runs the time axis ends at the current time, so those entries are
+only kept for ``PRICE_HISTORY_LIVE_CACHE_TTL`` seconds.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, FloatField, Func, IntegerField, Max, Value
+from django.db.models.functions import Floor, Greatest, Least
+from django.utils import timezone
+
+from . import metrics
+from .models import Item
+
+
+MAX_POINTS = 1000
+
+
+class EpochSeconds(Func):
+    """Seconds since the Unix epoch of a datetime column, as a float."""
+
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)'
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Julian day of 1970-01-01T00:00:00
+        return self.as_sql(
+            compiler, connection,
+            template='((julianday(%(expressions)s) - 2440587.5) * 86400.0)', **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='UNIX_TIMESTAMP(%(expressions)s)', **extra_context)
+
+
+def _version(item: Item) -> int:
+    """Latest bid id of the item (0 without bids); changes with every new bid."""
+    return item.bids.aggregate(latest=Max('id'))['latest'] or 0
+
+
+def _time_axis(item: Item, last_bid: datetime | None) -> tuple[datetime, datetime]:
+    end = min(timezone.now(), item.end_datetime)
+    if last_bid is not None:
+        end = max(last_bid, end)
+    return item.created_at, end
+
+
+def compute_price_history(item: Item, points: int) -> dict[str, Any]:
+    """Bucket the item's bids into ``points`` buckets with one grouped query."""
+    summary = item.bids.aggregate(last=Max('timestamp'), count=Count('id'))
+    start, end = _time_axis(item, summary['last'])
+    span = max((end - start).total_seconds(), 1e-6)
+    width = span / points
+
+    # Bids at or after the end of the axis land in the last bucket
+    bucket = Least(
+        Greatest(
+            Floor((EpochSeconds('timestamp') - Value(start.timestamp())) / Value(width)),
+            Value(0),
+        ),
+        Value(points - 1),
+        output_field=IntegerField(),
+    )
+    rows = (
+        item.bids.order_by().annotate(bucket=bucket)
+        .values('bucket').annotate(high=Max('amount'), bids=Count('id'))
+        .values_list('bucket', 'high', 'bids')
+    )
+
+    highs: dict[int, Decimal] = {}
+    counts: list[int] = [0] * points
+    for index, high, bids in rows:
+        index = int(index)
+        # SQLite returns aggregates of decimal columns without their scale
+        highs[index] = Decimal(high).quantize(Decimal('0.01'))
+        counts[index] = bids
+    closes: list[Decimal] = []
+    price: Decimal = item.starting_price
+    for index in range(points):
+        if index in highs and highs[index] > price:
+            price = highs[index]
+        closes.append(price)
+
+    return {
+        'item_id': item.id,
+        'starting_price': str(item.starting_price),
+        'bid_count': summary['count'],
+        'bucket_seconds': width,
+        'points': [
+            {
+                'timestamp': (start + (end - start) * ((i + 1) / points)).isoformat(),
+                'price': str(closes[i]),
+                'bids': counts[i],
+            }
+            for i in range(points)
+        ],
+    }
+
+
+def get_price_history(item: Item, points: int) -> dict[str, Any]:
+    """Cached price history for the item's current set of bids."""
+    points = max(1, min(points, MAX_POINTS))
+    key = f'price-history:{item.id}:{_version(item)}:{points}'
+    data = cache.get(key)
+    metrics.observe_cache('price_history', data is not None)
+    if data is None:
+        data = compute_price_history(item, points)
+        if timezone.now() < item.end_datetime:
+            ttl = getattr(settings, 'PRICE_HISTORY_LIVE_CACHE_TTL', 30)
+        else:
+            ttl = getattr(settings, 'PRICE_HISTORY_CACHE_TTL', 3600)
+        cache.set(key, data, ttl)
+    return data
@@ -0,0 +1,185 @@
+"""
+Opt-in CPU profiling for staff users and cron jobs.
+
+A staff user can profile a single request by sending the ``X-Profile: 1``
+header or adding ``?__profile=1`` to the URL. The request then runs under
+cProfile and the pstats dump is written to ``PROFILE_DIR``, which acts as a
+ring buffer holding at most ``PROFILE_MAX_FILES`` dumps. Cron jobs are
+profiled when ``PROFILE_CRON`` is enabled. Dumps are listed and downloadable
+from the admin at ``/admin/profiles/``.
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+import tempfile
+import time
+from typing import Any, Callable, Optional, TypeVar
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse
+from django.shortcuts import render
+
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+PROFILE_QUERY_PARAM = '__profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+# Header and query values that turn profiling on
+_TRUTHY = frozenset({'1', 'true', 'yes', 'on'})
+_SAFE_NAME = re.compile(r'^[\w.-]+\.prof$')
+
+
+def _profile_dir() -> str:
+    return getattr(
+        settings, 'PROFILE_DIR',
+        os.path.join(tempfile.gettempdir(), 'auction-profiles'),
+    )
+
+
+def _slug(label: str) -> str:
+    return re.sub(r'[^\w-]+', '_', label).strip('_')[:80] or 'root'
+
+
+def save_profile(profiler: cProfile.Profile, label: str) -> str:
+    """Write a pstats dump to the ring buffer and return its file name."""
+    directory = _profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    now = time.time()
+    name = '{}-{:03d}-{}-{}.prof'.format(
+        time.strftime('%Y%m%dT%H%M%S', time.gmtime(now)),
+        int(now * 1000) % 1000,
+        os.getpid(),
+        _slug(label),
+    )
+    profiler.dump_stats(os.path.join(directory, name))
+    _prune(directory)
+    return name
+
+
+def _prune(directory: str) -> None:
+    """Delete the oldest dumps beyond ``PROFILE_MAX_FILES``."""
+    limit = getattr(settings, 'PROFILE_MAX_FILES', 50)
+    dumps = sorted(f for f in os.listdir(directory) if f.endswith('.prof'))
+    for name in dumps[:max(0, len(dumps) - limit)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            # Another worker pruned it first
+            pass
+
+
+def list_profiles() -> list[dict[str, Any]]:
+    """Return the saved dumps, newest first."""
+    directory = _profile_dir()
+    try:
+        names = sorted((f for f in os.listdir(directory) if f.endswith('.prof')), reverse=True)
+    except OSError:
+        return []
+    profiles = []
+    for name in names:
+        try:
+            size = os.path.getsize(os.path.join(directory, name))
+        except OSError:
+            continue
+        profiles.append({'name': name, 'size': size})
+    return profiles
+
+
+def profile_summary(name: str, limit: int = 40) -> str:
+    """Render a dump as pstats text sorted by cumulative time."""
+    out = io.StringIO()
+    stats = pstats.Stats(_profile_path(name), stream=out)
+    stats.sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
+
+
+def _profile_path(name: str) -> str:
+    if not _SAFE_NAME.match(name):
+        raise Http404('Unknown profile')
+    path = os.path.join(_profile_dir(), name)
+    if not os.path.isfile(path):
+        raise Http404('Unknown profile')
+    return path
+
+
+# ============================================================================
+# Request and cron hooks
+# ============================================================================
+
+def _is_truthy(value: Optional[str]) -> bool:
+    return value is not None and value.strip().lower() in _TRUTHY
+
+
+def _wants_profile(request: HttpRequest) -> bool:
+    # ``X-Profile: 0`` or ``?__profile=false`` do not profile, and neither
+    # does a parameter that only contains the name, e.g. ``?x__profile=1``
+    if not (_is_truthy(request.META.get(PROFILE_HEADER))
+            or _is_truthy(request.GET.get(PROFILE_QUERY_PARAM))):
+        return False
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_authenticated and user.is_staff)
+
+
+class ProfilingMiddleware:
+    """Run the request under cProfile when a staff user asks for it."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not _wants_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        label = f'{request.method}-{request.path}'
+        response['X-Profile-Id'] = save_profile(profiler, label)
+        return response
+
+
+def profiled_job(name: str) -> Callable[[F], F]:
+    """Profile a cron job when ``PROFILE_CRON`` is enabled."""
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not getattr(settings, 'PROFILE_CRON', False):
+                return func(*args, **kwargs)
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                print(f"[CRON] Saved profile {save_profile(profiler, f'cron-{name}')}")
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+# ============================================================================
+# Admin views
+# ============================================================================
+
+def profile_list_view(request: HttpRequest) -> HttpResponse:
+    """List saved profiles (wrapped with ``admin.site.admin_view``)."""
+    selected: Optional[str] = request.GET.get('show')
+    summary = profile_summary(selected) if selected else None
+    return render(request, 'admin/api/profiles.html', {
+        'title': 'CPU profiles',
+        'profiles': list_profiles(),
+        'selected': selected,
+        'summary': summary,
+        'max_files': getattr(settings, 'PROFILE_MAX_FILES', 50),
+    })
+
+
+def profile_download_view(request: HttpRequest, name: str) -> FileResponse:
+    """Download a raw pstats dump (open with ``python -m pstats`` or snakeviz)."""
+    return FileResponse(open(_profile_path(name), 'rb'), as_attachment=True, filename=name)
@@ -0,0 +1,122 @@
+"""
+Per-user and per-IP rate limits held in the cache backend.
+
+Each limit is a bucket of ``N`` requests per period, configured per scope in
+``settings.RATE_LIMITS``. Django's cache API has ``add``/``incr`` but no
+compare-and-set, so the bucket is approximated with a sliding window:
+a counter per fixed window, with the previous window's count weighted by how
+much of it still overlaps the sliding period. That refills smoothly like a
+token bucket, costs one or two cache round trips per request, and never
+touches the database.
+
+``add`` and ``incr`` are atomic on Redis, memcached and the (per-process)
+local-memory cache, but not on the file-based cache: there they are a read
+followed by a write, and concurrent requests lose increments. api/checks.py
+therefore rejects the file-based cache while rate limiting is enabled. Use a
+shared cache (Redis or memcached) in production so the limits apply across
+workers.
+"""
+
+import functools
+import math
+import time
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, JsonResponse
+
+from . import metrics
+
+
+_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """Parse ``'30/m'`` into ``(30, 60)``: requests per period in seconds."""
+    count, _, period = rate.partition('/')
+    return int(count), _PERIODS[period.strip()[0]]
+
+
+def client_ip(request: HttpRequest) -> str:
+    """Client address, taken from X-Forwarded-For when the proxy is trusted."""
+    if getattr(settings, 'RATE_LIMIT_TRUST_X_FORWARDED_FOR', False):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def hit(key: str, limit: int, period: int, now: Optional[float] = None) -> float:
+    """
+    Count one request against a bucket.
+
+    Returns 0 if the request is allowed, otherwise the number of seconds to
+    wait before the bucket has room again.
+    """
+    now = time.time() if now is None else now
+    window, elapsed = divmod(now, period)
+    current_key = f'rl:{key}:{int(window)}'
+    # add() creates the counter atomically; incr() is atomic on shared backends
+    if cache.add(current_key, 1, period * 2):
+        current = 1
+    else:
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(current_key, 1, period * 2)
+            current = 1
+    previous = cache.get(f'rl:{key}:{int(window) - 1}', 0)
+
+    overlap = 1.0 - elapsed / period
+    if previous * overlap + current <= limit:
+        return 0.0
+    if current > limit or not previous:
+        # Full even without the previous window
+        return period - elapsed
+    # Wait until enough of the previous window has slid out
+    return max(period * (1.0 - (limit - current) / previous) - elapsed, 1.0)
+
+
+def check(request: HttpRequest, scope: str) -> float:
+    """Count the request against the scope's user and IP buckets; returns the wait, if any."""
+    limits = getattr(settings, 'RATE_LIMITS', {}).get(scope, {})
+    if not getattr(settings, 'RATE_LIMIT_ENABLED', True) or not limits:
+        return 0.0
+
+    wait = 0.0
+    if 'user' in limits and request.user.is_authenticated:
+        limit, period = parse_rate(limits['user'])
+        wait = max(wait, hit(f'{scope}:u:{request.user.pk}', limit, period))
+    if 'ip' in limits:
+        limit, period = parse_rate(limits['ip'])
+        wait = max(wait, hit(f'{scope}:ip:{client_ip(request)}', limit, period))
+    return wait
+
+
+def rate_limit(
+    scope: str,
+    methods: tuple[str, ...] = ('POST',),
+    when: Optional[Callable[[HttpRequest], bool]] = None,
+) -> Callable:
+    """
+    Limit a view with the ``RATE_LIMITS[scope]`` buckets.
+
+    Only requests with one of ``methods`` (and, if given, for which ``when``
+    returns true) are counted. Over-limit requests get a 429 with
+    ``Retry-After``.
+    """
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def wrapper(request: HttpRequest, *args, **kwargs):
+            if request.method in methods and (when is None or when(request)):
+                wait = check(request, scope)
+                if wait:
+                    metrics.inc('auction_rate_limited_total', labels={'scope': scope})
+                    response = JsonResponse({'error': 'Too many requests, please slow down'}, status=429)
+                    response['Retry-After'] = str(max(1, math.ceil(wait)))
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
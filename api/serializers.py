@@ -2,12 +2,19 @@
 Serialization helpers for converting Django models to JSON-compatible dictionaries.
 """
 
-from typing import Any, Optional
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Optional
 from decimal import Decimal
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.encoding import filepath_to_uri
 from .models import User, Item, Bid, Question, Answer
+from .tracing import traced
 
 
+@traced()
 def get_image_url(image_field) -> Optional[str]:
     """Helper to get absolute URL for image fields."""
     if not image_field:
@@ -22,6 +29,7 @@ def get_image_url(image_field) -> Optional[str]:
         return None
 
 
+@traced()
 def serialize_user(user: User) -> dict[str, Any]:
     """Serialize a User model instance to a dictionary."""
     return {
@@ -33,6 +41,7 @@ def serialize_user(user: User) -> dict[str, Any]:
     }
 
 
+@traced()
 def serialize_user_minimal(user: User) -> dict[str, Any]:
     """Serialize minimal user info for embedding in other objects."""
     return {
@@ -42,6 +51,7 @@ def serialize_user_minimal(user: User) -> dict[str, Any]:
     }
 
 
+@traced()
 def serialize_bid(bid: Bid) -> dict[str, Any]:
     """Serialize a Bid model instance to a dictionary."""
     return {
@@ -49,10 +59,12 @@ def serialize_bid(bid: Bid) -> dict[str, Any]:
         'item_id': bid.item.id,
         'bidder': serialize_user_minimal(bid.bidder),
         'amount': str(bid.amount),
+        'auto': bid.auto,
         'timestamp': bid.timestamp.isoformat(),
     }
 
 
+@traced()
 def serialize_answer(answer: Answer) -> dict[str, Any]:
     """Serialize an Answer model instance to a dictionary."""
     return {
@@ -64,6 +76,7 @@ def serialize_answer(answer: Answer) -> dict[str, Any]:
     }
 
 
+@traced()
 def serialize_question(question: Question, include_answers: bool = True) -> dict[str, Any]:
     """Serialize a Question model instance to a dictionary."""
     data: dict[str, Any] = {
@@ -78,6 +91,7 @@ def serialize_question(question: Question, include_answers: bool = True) -> dict
     return data
 
 
+@traced()
 def serialize_item(item: Item, include_details: bool = False) -> dict[str, Any]:
     """
     Serialize an Item model instance to a dictionary.
@@ -86,18 +100,19 @@ def serialize_item(item: Item, include_details: bool = False) -> dict[str, Any]:
         item: The Item instance to serialize
         include_details: If True, include bids and questions (for detail view)
     """
-    highest_bid = item.bids.order_by('-amount').first()
-    
     data: dict[str, Any] = {
         'id': item.id,
         'title': item.title,
         'description': item.description,
         'starting_price': str(item.starting_price),
-        'current_price': str(highest_bid.amount if highest_bid else item.starting_price),
+        'current_price': str(item.current_price),
         'image': get_image_url(item.image),
+        'start_datetime': item.start_datetime.isoformat() if item.start_datetime else None,
         'end_datetime': item.end_datetime.isoformat(),
+        'status': item.status,
         'owner': serialize_user_minimal(item.owner),
-        'bid_count': item.bids.count(),
+        'bid_count': item.bid_count,
+        'views': item.views,
         'is_active': item.is_active,
         'created_at': item.created_at.isoformat(),
     }
@@ -105,11 +120,119 @@ def serialize_item(item: Item, include_details: bool = False) -> dict[str, Any]:
     if include_details:
         data['bids'] = [serialize_bid(b) for b in item.bids.all()[:10]]  # Latest 10 bids
         data['questions'] = [serialize_question(q) for q in item.questions.all()]
-        data['highest_bidder'] = serialize_user_minimal(highest_bid.bidder) if highest_bid else None
+        data['highest_bidder'] = serialize_user_minimal(item.leader) if item.leader_id else None
     
     return data
 
 
+@traced()
 def serialize_items_list(items: list[Item]) -> list[dict[str, Any]]:
     """Serialize a list of Item instances."""
     return [serialize_item(item) for item in items]
+
+
+# ============================================================================
+# Fast list serialization
+# ============================================================================
+
+# Columns read by serialize_item_rows, owner columns joined in the same query
+ITEM_LIST_FIELDS: tuple[str, ...] = (
+    'id', 'title', 'description', 'starting_price', 'current_price', 'image',
+    'start_datetime', 'end_datetime', 'status', 'owner_id', 'owner__username',
+    'owner__profile_image', 'bid_count', 'views', 'created_at',
+)
+
+
+def _is_active(status: str, start: Optional[datetime], end: datetime, now: datetime) -> bool:
+    # Item.is_active for values that are not on a model instance
+    if now >= end:
+        return False
+    if status == Item.Status.SCHEDULED:
+        return start is not None and start <= now
+    return status == Item.Status.LIVE
+
+
+def refresh_active(payloads: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Recompute ``is_active`` of cached item payloads.
+
+    A cached payload keeps the flag from when it was built, which goes stale
+    as soon as the auction starts or ends.
+    """
+    now = timezone.now()
+    return [
+        {**payload, 'is_active': _is_active(
+            payload['status'],
+            datetime.fromisoformat(payload['start_datetime']) if payload['start_datetime'] else None,
+            datetime.fromisoformat(payload['end_datetime']),
+            now,
+        )}
+        for payload in payloads
+    ]
+
+
+def serialize_item_rows(rows: Iterable[tuple]) -> Iterator[dict[str, Any]]:
+    """
+    Build list payloads from ``values_list(*ITEM_LIST_FIELDS)`` rows.
+
+    Produces the same dicts as ``serialize_item`` without instantiating models.
+    The media URL prefix and ``now`` are computed once for all rows.
+    """
+    media_prefix = f"http://localhost:8000{settings.MEDIA_URL}"
+    now = timezone.now()
+    for (item_id, title, description, starting_price, current_price, image,
+         start_datetime, end_datetime, status, owner_id, owner_username,
+         owner_image, bid_count, views, created_at) in rows:
+        yield {
+            'id': item_id,
+            'title': title,
+            'description': description,
+            'starting_price': str(starting_price),
+            'current_price': str(current_price),
+            'image': media_prefix + filepath_to_uri(image) if image else None,
+            'start_datetime': start_datetime.isoformat() if start_datetime else None,
+            'end_datetime': end_datetime.isoformat(),
+            'status': status,
+            'owner': {
+                'id': owner_id,
+                'username': owner_username,
+                'profile_image': media_prefix + filepath_to_uri(owner_image) if owner_image else None,
+            },
+            'bid_count': bid_count,
+            'views': views,
+            'is_active': _is_active(status, start_datetime, end_datetime, now),
+            'created_at': created_at.isoformat(),
+        }
+
+
+@traced()
+def serialize_items_queryset(items: QuerySet) -> list[dict[str, Any]]:
+    """Serialize an Item queryset for list endpoints via ``serialize_item_rows``."""
+    return list(serialize_item_rows(items.values_list(*ITEM_LIST_FIELDS)))
+
+
+def stream_items_json(items: QuerySet, chunk_size: int = 500) -> Iterator[str]:
+    """
+    Encode ``{"items": [...], "count": n}`` incrementally.
+
+    The queryset is read with ``iterator()`` and each chunk of items is encoded
+    and yielded before the next is fetched, so memory use does not grow with
+    the size of the listing.
+    """
+    encoder = DjangoJSONEncoder()
+    yield '{"items": ['
+    count = 0
+    separator = ''
+    buffer: list[str] = []
+    rows = items.values_list(*ITEM_LIST_FIELDS).iterator(chunk_size=chunk_size)
+    for payload in serialize_item_rows(rows):
+        buffer.append(encoder.encode(payload))
+        if len(buffer) == chunk_size:
+            yield separator + ', '.join(buffer)
+            separator = ', '
+            count += len(buffer)
+            buffer = []
+    if buffer:
+        yield separator + ', '.join(buffer)
+        count += len(buffer)
+    yield f'], "count": {count}}}'
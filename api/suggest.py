@@ -0,0 +1,215 @@
+"""
+In-memory prefix index of live item titles for search-bar suggestions.
+
+Every title token is stored in one sorted list next to its item id, so a
+prefix lookup is a binary search followed by a short forward scan. The index
+is built from the database on first use, and kept current in this worker
+through the Item ``post_save``/``post_delete`` signals. Status changes made
+with ``QuerySet.update()`` send no signals, so ``lifecycle`` and
+``deletion`` call ``add_rows`` and ``remove_items`` themselves; auctions
+that end drop out on their own, because lookups skip items past their end
+time. The index is rebuilt when older than ``SUGGEST_INDEX_MAX_AGE``
+seconds, which picks up changes made by other workers.
+"""
+
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from sys import intern
+from typing import Any, Iterable, Optional
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import lifecycle
+from .models import Item
+
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased word tokens of a title, without duplicates."""
+    return list(dict.fromkeys(_TOKEN.findall(text.lower())))
+
+
+class PrefixIndex:
+    """
+    Sorted title tokens with parallel item ids; removed items are skipped lazily.
+
+    Tokens are interned and ids kept in an ``array``, so each entry costs two
+    machine words on top of the shared token strings.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.tokens: list[str] = []
+        self.ids: array = array('q')
+        # item id -> (title, end timestamp); ids missing here are deleted
+        self.items: dict[int, tuple[str, float]] = {}
+        self.stale_entries = 0
+        self.built_at: Optional[float] = None
+
+    def build(self, rows: Iterable[tuple[int, str, Any]]) -> None:
+        """Replace the index contents with ``(id, title, end_datetime)`` rows."""
+        entries: list[tuple[str, int]] = []
+        items: dict[int, tuple[str, float]] = {}
+        for item_id, title, end in rows:
+            items[item_id] = (title, end.timestamp())
+            entries.extend((intern(token), item_id) for token in tokenize(title))
+        entries.sort()
+        tokens = [token for token, _ in entries]
+        ids = array('q', (item_id for _, item_id in entries))
+        with self.lock:
+            self.tokens, self.ids = tokens, ids
+            self.items = items
+            self.stale_entries = 0
+            self.built_at = time.monotonic()
+
+    def add(self, item_id: int, title: str, end_timestamp: float) -> None:
+        with self.lock:
+            if item_id in self.items:
+                self.remove(item_id)
+            self.items[item_id] = (title, end_timestamp)
+            for token in tokenize(title):
+                position = bisect_right(self.tokens, token)
+                self.tokens.insert(position, intern(token))
+                self.ids.insert(position, item_id)
+
+    def remove(self, item_id: int) -> None:
+        with self.lock:
+            old = self.items.pop(item_id, None)
+            if old is None:
+                return
+            # Entries are left in place and skipped on lookup until compaction
+            self.stale_entries += len(tokenize(old[0]))
+            if self.stale_entries > len(self.tokens) // 4:
+                self._compact()
+
+    def _compact(self) -> None:
+        live = sorted({
+            (token, item_id) for token, item_id in zip(self.tokens, self.ids)
+            if item_id in self.items and token in tokenize(self.items[item_id][0])
+        })
+        self.tokens = [token for token, _ in live]
+        self.ids = array('q', (item_id for _, item_id in live))
+        self.stale_entries = 0
+
+    def lookup(self, query: str, limit: int, now: Optional[float] = None) -> list[dict[str, Any]]:
+        """Top ``limit`` live items whose title has a word starting with the last query word."""
+        words = tokenize(query)
+        if not words:
+            return []
+        prefix, required = words[-1], words[:-1]
+        now = time.time() if now is None else now
+
+        results: list[dict[str, Any]] = []
+        seen: set[int] = set()
+        with self.lock:
+            tokens, ids = self.tokens, self.ids
+            position = bisect_left(tokens, prefix)
+            while position < len(tokens) and len(results) < limit:
+                token, item_id = tokens[position], ids[position]
+                position += 1
+                if not token.startswith(prefix):
+                    break
+                if item_id in seen:
+                    continue
+                item = self.items.get(item_id)
+                if item is None or item[1] <= now:
+                    continue
+                title_tokens = tokenize(item[0])
+                if token not in title_tokens:
+                    # Entry left over from an earlier title of this item
+                    continue
+                if required and not all(any(t.startswith(w) for t in title_tokens) for w in required):
+                    continue
+                seen.add(item_id)
+                results.append({'id': item_id, 'title': item[0]})
+        return results
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+
+_index = PrefixIndex()
+
+
+def _max_age() -> float:
+    return getattr(settings, 'SUGGEST_INDEX_MAX_AGE', 300)
+
+
+def rebuild() -> None:
+    """Rebuild this worker's index from the live items in the database."""
+    _index.build(
+        lifecycle.live_items()
+        .values_list('id', 'title', 'end_datetime')
+        .iterator(chunk_size=5000)
+    )
+
+
+_rebuild_lock = threading.Lock()
+
+
+def _ensure_fresh() -> None:
+    if _index.built_at is None:
+        # First use in this worker: everyone waits for the initial build
+        with _rebuild_lock:
+            if _index.built_at is None:
+                rebuild()
+    elif time.monotonic() - _index.built_at > _max_age():
+        # One thread rebuilds; the others keep answering from the old index
+        if _rebuild_lock.acquire(blocking=False):
+            try:
+                rebuild()
+            finally:
+                _rebuild_lock.release()
+
+
+def suggest(query: str, limit: int = 8) -> list[dict[str, Any]]:
+    """Suggestions for a search-bar prefix, rebuilding the index if it is stale."""
+    _ensure_fresh()
+    return _index.lookup(query, limit)
+
+
+@receiver(post_save, sender=Item, dispatch_uid='suggest_item_saved')
+def _item_saved(sender: type, instance: Item, **kwargs: Any) -> None:
+    if _index.built_at is None:
+        return
+    if instance.status == Item.Status.LIVE:
+        _index.add(instance.id, instance.title, instance.end_datetime.timestamp())
+    else:
+        _index.remove(instance.id)
+
+
+@receiver(post_delete, sender=Item, dispatch_uid='suggest_item_deleted')
+def _item_deleted(sender: type, instance: Item, **kwargs: Any) -> None:
+    if _index.built_at is not None:
+        _index.remove(instance.id)
+
+
+def add_items(items: Iterable[Item]) -> None:
+    """Index items inserted without signals (``bulk_create``)."""
+    add_rows(
+        (item.id, item.title, item.end_datetime)
+        for item in items if item.status == Item.Status.LIVE
+    )
+
+
+def add_rows(rows: Iterable[tuple[int, str, Any]]) -> None:
+    """Index ``(id, title, end_datetime)`` rows of items that were made live without signals."""
+    if _index.built_at is None:
+        return
+    for item_id, title, end in rows:
+        _index.add(item_id, title, end.timestamp())
+
+
+def remove_items(item_ids: Iterable[int]) -> None:
+    """Drop items taken out of bidding without signals, e.g. marked ``deleting``."""
+    if _index.built_at is None:
+        return
+    for item_id in item_ids:
+        _index.remove(item_id)
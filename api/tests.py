@@ -1,3 +1,1080 @@
-from django.test import TestCase
+"""
+Tests for the auction API.
 
-# Create your tests here.
+Randomized tests use a fixed seed per test, so a failure always replays the
+same sequence.
+"""
+
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from typing import Optional
+from unittest import mock
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db import OperationalError
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from . import (
+    archive, bulk_import, caching, checks, deletion, export, feeds, lifecycle, memory, metrics, price_history,
+    profiling, ratelimit, serializers, suggest, tracing, view_counts,
+)
+from .bidding import BidRejected, ProxyState, place_bid, resolve_bid
+from .models import Answer, ArchivedItem, Bid, ImportJob, Item, Question, TrendingScore, User
+
+
+# ============================================================================
+# Proxy bidding
+# ============================================================================
+
+class NaiveAuction:
+    """Reference model: every bidder's maximum, re-ranked on each bid."""
+
+    def __init__(self, starting_price: Decimal, increment: Decimal) -> None:
+        self.starting_price = starting_price
+        self.price = starting_price
+        self.increment = increment
+        # bidder -> (maximum, sequence number of the bid that set it)
+        self.maxima: dict[int, tuple[Decimal, int]] = {}
+        self.sequence = 0
+
+    @property
+    def leader(self) -> Optional[int]:
+        ranking = self._ranking()
+        return ranking[0][0] if ranking else None
+
+    def _ranking(self) -> list[tuple[int, tuple[Decimal, int]]]:
+        # Highest maximum first, the earlier one on ties
+        return sorted(self.maxima.items(), key=lambda entry: (-entry[1][0], entry[1][1]))
+
+    def bid(self, bidder: int, amount: Decimal, proxy: bool) -> bool:
+        self.sequence += 1
+        if amount <= self.price:
+            return False
+        current = self.maxima.get(bidder)
+        if bidder == self.leader:
+            if proxy:
+                if amount <= current[0]:
+                    return False
+            else:
+                self.price = amount
+            if amount > current[0]:
+                self.maxima[bidder] = (amount, self.sequence)
+            return True
+        if current is None or amount > current[0]:
+            self.maxima[bidder] = (amount, self.sequence)
+
+        ranking = self._ranking()
+        top = ranking[0][1][0]
+        second = ranking[1][1][0] if len(ranking) > 1 else self.starting_price
+        floor = amount if not proxy else self.price
+        self.price = max(self.price, floor, min(top, second + self.increment))
+        return True
+
+
+def random_sequence(rng: random.Random, steps: int = 30, bidders: int = 4) -> dict:
+    # Half-increment amounts and small ranges make ties and caps common
+    starting_price = Decimal(rng.randint(1, 20))
+    increment = rng.choice([Decimal('0.50'), Decimal('1.00'), Decimal('2.50')])
+    bids = []
+    for _ in range(steps):
+        price_step = Decimal(rng.randint(1, 12)) * Decimal('0.50')
+        bids.append((rng.randint(1, bidders), price_step, rng.random() < 0.6))
+    return {'starting_price': starting_price, 'increment': increment, 'bids': bids}
+
+
+def bid_amount(price: Decimal, step: Decimal) -> Decimal:
+    # Mostly above the price, sometimes at or below it to hit rejections
+    return price + step - Decimal('1.00')
+
+
+class ResolveBidTests(TestCase):
+    """``resolve_bid`` keeps only the top two maxima and must match the reference."""
+
+    def test_random_sequences_match_reference(self) -> None:
+        rng = random.Random(43)
+        for number in range(1000):
+            sequence = random_sequence(rng)
+            increment = sequence['increment']
+            reference = NaiveAuction(sequence['starting_price'], increment)
+            state = ProxyState(sequence['starting_price'])
+            for step, (bidder, price_step, proxy) in enumerate(sequence['bids']):
+                amount = bid_amount(state.price, price_step)
+                where = f'sequence {number}, step {step}: {"proxy" if proxy else "plain"} {amount} by {bidder}'
+                expected = reference.bid(bidder, amount, proxy)
+                try:
+                    resolution = resolve_bid(state, bidder, amount, proxy, increment)
+                except BidRejected:
+                    self.assertFalse(expected, where)
+                    continue
+                self.assertTrue(expected, where)
+
+                previous, state = state.price, resolution.state
+                self.assertEqual((state.leader_id, state.price), (reference.leader, reference.price), where)
+                self.assertLessEqual(len(resolution.bids), 2, where)
+                amounts = [amount for _, amount, _ in resolution.bids]
+                self.assertEqual(amounts, sorted(amounts), where)
+                self.assertTrue(all(amount > previous for amount in amounts), where)
+                if resolution.bids:
+                    self.assertEqual(resolution.bids[-1][:2], (state.leader_id, state.price), where)
+                self.assertGreaterEqual(state.leader_max, state.price, where)
+
+
+class PlaceBidTests(TestCase):
+    """``place_bid`` persists the same outcome as the reference."""
+
+    def setUp(self) -> None:
+        self.owner = User.objects.create(username='owner', email='owner@example.com')
+        self.bidders = {
+            n: User.objects.create(username=f'bidder-{n}', email=f'bidder-{n}@example.com')
+            for n in range(1, 5)
+        }
+
+    def test_random_sequences_match_reference(self) -> None:
+        rng = random.Random(4302)
+        for number in range(20):
+            sequence = random_sequence(rng)
+            increment = sequence['increment']
+            item = Item.objects.create(
+                title=f'Item {number}', description='Proxy bidding test item',
+                starting_price=sequence['starting_price'], image='items/test.png',
+                end_datetime=timezone.now() + timedelta(days=1), owner=self.owner,
+            )
+            reference = NaiveAuction(sequence['starting_price'], increment)
+            with override_settings(BID_INCREMENT=increment):
+                for step, (bidder, price_step, proxy) in enumerate(sequence['bids']):
+                    amount = bid_amount(item.current_price, price_step)
+                    where = f'sequence {number}, step {step}'
+                    expected = reference.bid(bidder, amount, proxy)
+                    try:
+                        place_bid(item.id, self.bidders[bidder], amount, proxy=proxy)
+                        accepted = True
+                    except BidRejected:
+                        accepted = False
+                    self.assertEqual(accepted, expected, where)
+                    item.refresh_from_db()
+                    leader = next((n for n, u in self.bidders.items() if u.id == item.leader_id), None)
+                    self.assertEqual((leader, item.current_price), (reference.leader, reference.price), where)
+            self.assertEqual(item.bid_count, item.bids.count())
+
+
+@override_settings(RATE_LIMIT_ENABLED=False)
+class PlaceBidViewTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        owner = User.objects.create(username='owner', email='owner@example.com')
+        self.bidder = User.objects.create(username='bidder', email='bidder@example.com')
+        self.item = Item.objects.create(
+            title='Item', description='Bid validation test item',
+            starting_price=Decimal('10.00'), image='items/test.png',
+            end_datetime=timezone.now() + timedelta(days=1), owner=owner,
+        )
+        self.client.force_login(self.bidder)
+
+    def bid(self, payload: dict):
+        return self.client.post(f'/api/items/{self.item.id}/bids/', payload, content_type='application/json')
+
+    def test_rejects_amounts_the_column_cannot_hold(self) -> None:
+        for value in ['NaN', 'sNaN', 'Infinity', '-Infinity', '1e30', '12.345', '0', '-5', 'abc', None, [1]]:
+            for field in ('amount', 'max_amount'):
+                with self.subTest(field=field, value=value):
+                    self.assertEqual(self.bid({field: value}).status_code, 400)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.bid_count, 0)
+
+    def test_scheduled_item_is_open_once_started(self) -> None:
+        # The cron job has not opened it yet
+        Item.objects.filter(id=self.item.id).update(
+            status=Item.Status.SCHEDULED, start_datetime=timezone.now() - timedelta(minutes=1)
+        )
+        self.item.refresh_from_db()
+        self.assertTrue(self.item.is_active)
+        self.assertEqual(self.bid({'amount': '11'}).status_code, 201)
+
+        Item.objects.filter(id=self.item.id).update(
+            status=Item.Status.SCHEDULED, start_datetime=timezone.now() + timedelta(hours=1)
+        )
+        response = self.bid({'amount': '12'})
+        self.assertEqual((response.status_code, response.json()['error']), (400, 'This auction has not started yet'))
+
+    def test_live_reads_open_started_items(self) -> None:
+        Item.objects.filter(id=self.item.id).update(
+            status=Item.Status.SCHEDULED, start_datetime=timezone.now() - timedelta(minutes=1)
+        )
+        listed = [item['id'] for item in self.client.get('/api/items/').json()['items']]
+        self.assertEqual(listed, [self.item.id])
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.status, Item.Status.LIVE)
+        # Nothing left to open: a read only, no UPDATE
+        with self.assertNumQueries(2):
+            self.assertEqual(list(lifecycle.live_items()), [self.item])
+
+    def test_accepts_valid_amounts(self) -> None:
+        self.assertEqual(self.bid({'amount': 12.5}).status_code, 201)
+        response = self.bid({'max_amount': '99999999.99'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['max_amount'], '99999999.99')
+
+
+# ============================================================================
+# Bulk import
+# ============================================================================
+
+class ImportJobTests(TestCase):
+    """Uploads are queued and imported by the cron job, not in the request."""
+
+    def setUp(self) -> None:
+        self.import_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.import_dir)
+        settings_override = override_settings(IMPORT_DIR=self.import_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.seller = User.objects.create(username='seller', email='seller@example.com')
+        self.client.force_login(self.seller)
+
+    def upload(self, manifest: str):
+        return self.client.post('/api/items/import/', {
+            'manifest': SimpleUploadedFile('items.csv', manifest.encode()),
+        })
+
+    def test_import_runs_in_the_job(self) -> None:
+        end = (timezone.now() + timedelta(days=3)).isoformat()
+        response = self.upload(
+            'title,description,starting_price,end_datetime\n'
+            f'Lamp,Brass desk lamp,12.50,{end}\n'
+            f'Chair,Oak chair,not a price,{end}\n'
+        )
+        self.assertEqual(response.status_code, 202)
+        job = response.json()
+        self.assertEqual(job['status'], 'queued')
+        self.assertFalse(Item.objects.exists())
+
+        self.assertEqual(bulk_import.run_pending_jobs(), 1)
+        job = self.client.get(f"/api/items/import/{job['id']}/").json()
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['created'], 1)
+        self.assertEqual(job['errors'], [{'row': 3, 'error': 'Invalid starting_price: not a price'}])
+        self.assertEqual(Item.objects.get().title, 'Lamp')
+        # The uploaded files are removed once the job has finished
+        self.assertEqual(list(bulk_import.import_storage().listdir('')[0]), [])
+
+    def test_empty_manifest_fails_the_job(self) -> None:
+        job_id = self.upload('title,description,starting_price,end_datetime\n').json()['id']
+        bulk_import.run_pending_jobs()
+        job = ImportJob.objects.get(id=job_id)
+        self.assertEqual((job.status, job.message), (ImportJob.Status.FAILED, 'Manifest has no rows'))
+
+    def test_jobs_are_private(self) -> None:
+        job_id = self.upload('title,description,starting_price,end_datetime\n').json()['id']
+        self.client.force_login(User.objects.create(username='other', email='other@example.com'))
+        self.assertEqual(self.client.get(f'/api/items/import/{job_id}/').status_code, 404)
+
+
+# ============================================================================
+# Caching
+# ============================================================================
+
+class GetOrBuildTests(TestCase):
+    def test_concurrent_readers_coalesce_rebuilds(self) -> None:
+        # Many threads read one key across several expiries; each expiry
+        # should cost about one build, never one per reader
+        cache.clear()
+        builds = 0
+        builds_lock = threading.Lock()
+
+        def builder() -> float:
+            nonlocal builds
+            with builds_lock:
+                builds += 1
+            time.sleep(0.05)
+            return time.time()
+
+        ttl, duration, readers = 0.5, 2.0, 32
+        stop_at = time.monotonic() + duration
+
+        def reader() -> None:
+            while time.monotonic() < stop_at:
+                caching.get_or_build('coalescing-test', builder, ttl)
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        expiries = duration / ttl
+        # Early refreshes can add a build per window, but never one per reader
+        self.assertLessEqual(builds, 2 * expiries + 1)
+
+    def test_outdated_version_is_served_stale_while_rebuilt(self) -> None:
+        cache.clear()
+        self.assertEqual(caching.get_or_build('version-test', lambda: 'v1', 60, version=1), 'v1')
+        # Another worker is rebuilding the entry for version 2
+        cache.add('version-test:lock', 1, 10)
+        self.assertEqual(caching.get_or_build('version-test', lambda: 'v2', 60, version=2), 'v1')
+        cache.delete('version-test:lock')
+        self.assertEqual(caching.get_or_build('version-test', lambda: 'v2', 60, version=2), 'v2')
+        self.assertEqual(caching.get_or_build('version-test', lambda: 'v3', 60, version=2), 'v2')
+
+
+@override_settings(RATE_LIMIT_ENABLED=False)
+class CachedListingTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        owner = User.objects.create(username='owner', email='owner@example.com')
+        self.item = Item.objects.create(
+            title='Item', description='Cached listing test item',
+            starting_price=Decimal('10.00'), image='items/test.png',
+            end_datetime=timezone.now() + timedelta(days=1), owner=owner,
+        )
+        self.bidder = User.objects.create(username='bidder', email='bidder@example.com')
+        self.client.force_login(self.bidder)
+
+    def listed(self) -> dict:
+        return self.client.get('/api/items/?all=true').json()['items'][0]
+
+    def test_bid_refreshes_cached_listing(self) -> None:
+        self.assertEqual(self.listed()['current_price'], '10.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            place_bid(self.item.id, self.bidder, Decimal('15.00'))
+        self.assertEqual(self.listed()['current_price'], '15.00')
+
+    def test_admin_date_edit_reschedules_and_refreshes(self) -> None:
+        self.assertEqual(self.listed()['status'], Item.Status.LIVE)
+        model_admin = admin.site._registry[Item]
+        self.item.end_datetime = timezone.now() - timedelta(minutes=1)
+        model_admin.save_model(None, self.item, mock.Mock(changed_data=['end_datetime']), change=True)
+        self.assertEqual(self.item.status, Item.Status.ENDED)
+        self.assertEqual(self.listed()['status'], Item.Status.ENDED)
+
+    def test_is_active_is_recomputed_when_served(self) -> None:
+        self.assertTrue(self.listed()['is_active'])
+        self.assertTrue(self.client.get(f'/api/items/{self.item.id}/').json()['is_active'])
+        # Served from the cache after the auction has ended
+        after_end = self.item.end_datetime + timedelta(seconds=1)
+        with mock.patch('api.serializers.timezone.now', return_value=after_end):
+            self.assertFalse(self.listed()['is_active'])
+            self.assertFalse(self.client.get(f'/api/items/{self.item.id}/').json()['is_active'])
+
+
+@override_settings(RATE_LIMIT_ENABLED=False)
+class KeysetListingTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        owner = User.objects.create(username='owner', email='owner@example.com')
+        now = timezone.now()
+        for i in range(7):
+            Item.objects.create(
+                title=f'Item {i}', description='Keyset listing test item',
+                starting_price=Decimal('10.00'), image='items/test.png',
+                end_datetime=now + timedelta(days=1 + i % 3), owner=owner,
+            )
+        # Ties on the sort column are broken by id
+        Item.objects.update(created_at=now)
+        self.client.force_login(owner)
+
+    def pages(self, sort: str) -> list[list[int]]:
+        pages, cursor = [], ''
+        while cursor is not None:
+            response = self.client.get('/api/items/', {'sort': sort, 'limit': 3, 'cursor': cursor}).json()
+            pages.append([item['id'] for item in response['items']])
+            cursor = response['next_cursor']
+        return pages
+
+    def test_pages_cover_listing_once(self) -> None:
+        for sort in ('newest', 'ending_soon', 'price_asc'):
+            with self.subTest(sort=sort):
+                pages = self.pages(sort)
+                listing = [item['id'] for item in self.client.get('/api/items/', {'sort': sort}).json()['items']]
+                self.assertEqual([len(page) for page in pages], [3, 3, 1])
+                self.assertEqual(sum(pages, []), listing)
+
+    def test_malformed_cursor_reads_first_page(self) -> None:
+        first = self.client.get('/api/items/', {'sort': 'newest', 'limit': 3, 'cursor': ''}).json()
+        response = self.client.get('/api/items/', {'sort': 'newest', 'limit': 3, 'cursor': 'nope|x'}).json()
+        self.assertEqual(response['items'], first['items'])
+
+    def test_price_range_must_be_a_finite_amount(self) -> None:
+        for bound in ['NaN', 'sNaN', 'Infinity', '-Infinity', '1e999', '0.001', '-1', 'ten']:
+            for name in ('min_price', 'max_price'):
+                with self.subTest(**{name: bound}):
+                    response = self.client.get('/api/items/', {name: bound})
+                    self.assertEqual(response.status_code, 400)
+                    self.assertTrue(response.json()['error'].startswith('Invalid price range'))
+        response = self.client.get('/api/items/', {'min_price': '0', 'max_price': '1e1'})
+        self.assertEqual(response.json()['count'], 7)
+        self.assertEqual(self.client.get('/api/items/', {'min_price': '10.01'}).json()['count'], 0)
+
+
+# ============================================================================
+# Feeds
+# ============================================================================
+
+@override_settings(TRENDING_HALF_LIFE_SECONDS=3600)
+class FeedTests(TestCase):
+    def setUp(self) -> None:
+        self.now = timezone.now()
+        self.owner = User.objects.create(username='owner', email='owner@example.com')
+        self.bidder = User.objects.create(username='bidder', email='bidder@example.com')
+        end = self.now + timedelta(days=1)
+        # Pairs of items share an end time, so pages must break ties by id
+        self.items = [
+            Item.objects.create(
+                title=f'Item {i}', description='Feed test item', starting_price=Decimal('5.00'),
+                image='items/test.png', end_datetime=end + timedelta(hours=i // 2), owner=self.owner,
+            )
+            for i in range(7)
+        ]
+
+    def score(self, item: Item) -> float:
+        return TrendingScore.objects.get(item=item).score
+
+    def test_record_bid_adds_decayed_weights(self) -> None:
+        first, second, third = self.items[:3]
+        feeds.record_bid(first.id, self.now)
+        base = self.score(first)
+        self.assertAlmostEqual(base, feeds._log_weight(self.now))
+
+        # A second bid at the same moment doubles the weight
+        feeds.record_bid(first.id, self.now)
+        self.assertAlmostEqual(self.score(first), base + math.log(2))
+
+        # One bid now weighs as much as two bids a half-life ago
+        feeds.record_bid(second.id, self.now - timedelta(hours=1))
+        feeds.record_bid(second.id, self.now - timedelta(hours=1))
+        feeds.record_bid(third.id, self.now)
+        self.assertAlmostEqual(self.score(second), self.score(third))
+
+    def test_placed_bids_update_the_score(self) -> None:
+        item = self.items[0]
+        place_bid(item.id, self.bidder, Decimal('6.00'))
+        first = self.score(item)
+        place_bid(item.id, self.bidder, Decimal('7.00'))
+        self.assertGreater(self.score(item), first)
+        self.assertEqual(feeds.trending_page(10)[0], [item])
+
+    def read_feed(self, feed: str, limit: int) -> list[int]:
+        self.client.force_login(self.owner)
+        ids: list[int] = []
+        cursor = None
+        while True:
+            params = {'limit': limit} if cursor is None else {'limit': limit, 'cursor': cursor}
+            response = self.client.get(f'/api/feeds/{feed}/', params)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertLessEqual(len(page['items']), limit)
+            ids += [item['id'] for item in page['items']]
+            self.assertLessEqual(len(ids), len(self.items))
+            cursor = page['next_cursor']
+            if cursor is None:
+                return ids
+
+    def test_ending_soon_pages_cover_every_item_once(self) -> None:
+        expected = [item.id for item in self.items]
+        for limit in [1, 2, 3, 7, 20]:
+            self.assertEqual(self.read_feed('ending-soon', limit), expected)
+
+    def test_trending_pages_cover_every_item_once(self) -> None:
+        # Items 0-3 tie on one bid each, item 4 has an older one, item 6 two
+        # and item 5 none
+        for item in self.items[:4] + [self.items[6], self.items[6]]:
+            feeds.record_bid(item.id, self.now)
+        feeds.record_bid(self.items[4].id, self.now - timedelta(hours=2))
+        expected = [self.items[i].id for i in [6, 0, 1, 2, 3, 4]]
+        for limit in [1, 2, 4, 6, 20]:
+            self.assertEqual(self.read_feed('trending', limit), expected)
+
+    def test_malformed_cursor_reads_the_first_page(self) -> None:
+        self.client.force_login(self.owner)
+        first_page = self.client.get('/api/feeds/ending-soon/?limit=2').json()
+        for cursor in ['nonsense', 'x|y', 'not-a-date|3']:
+            response = self.client.get(f'/api/feeds/ending-soon/?limit=2&cursor={cursor}')
+            self.assertEqual(response.json(), first_page)
+
+
+# ============================================================================
+# Serialization
+# ============================================================================
+
+class ItemListSerializationTests(TestCase):
+    def setUp(self) -> None:
+        now = timezone.now()
+        self.owner = User.objects.create(
+            username='owner', email='owner@example.com', profile_image='profiles/the owner.png',
+        )
+        bidder = User.objects.create(username='bidder', email='bidder@example.com')
+
+        def create(title: str, **fields) -> Item:
+            return Item.objects.create(**{
+                'title': title, 'description': 'Serialization test item', 'starting_price': Decimal('5.00'),
+                'image': 'items/test image.png', 'end_datetime': now + timedelta(days=1), 'owner': self.owner,
+                **fields,
+            })
+
+        create('No bids')
+        self.with_bids = create('With bids')
+        place_bid(self.with_bids.id, bidder, Decimal('6.00'))
+        place_bid(self.with_bids.id, bidder, Decimal('9.00'), proxy=True)
+        create('Scheduled', status=Item.Status.SCHEDULED, start_datetime=now + timedelta(hours=1))
+        create('Started', status=Item.Status.SCHEDULED, start_datetime=now - timedelta(hours=1))
+        create('Ended', end_datetime=now - timedelta(hours=1))
+        create('No owner image', owner=User.objects.create(username='plain', email='plain@example.com'))
+
+    def test_rows_match_serialize_item(self) -> None:
+        items = Item.objects.order_by('id')
+        self.assertEqual(Item.objects.get(id=self.with_bids.id).leader.username, 'bidder')
+        expected = [serializers.serialize_item(item) for item in items.select_related('owner')]
+        self.assertEqual(serializers.serialize_items_queryset(items), expected)
+        self.assertEqual(len(expected), 6)
+        self.assertEqual(
+            {payload['title']: payload['is_active'] for payload in expected},
+            {'No bids': True, 'With bids': True, 'Scheduled': False, 'Started': True, 'Ended': False,
+             'No owner image': True},
+        )
+
+    def test_stream_parses_to_the_listing(self) -> None:
+        items = Item.objects.order_by('id')
+        expected = serializers.serialize_items_queryset(items)
+        for chunk_size in [1, 2, 6, 7]:
+            body = ''.join(serializers.stream_items_json(items, chunk_size))
+            self.assertEqual(json.loads(body), {'items': expected, 'count': 6})
+        self.assertEqual(json.loads(''.join(serializers.stream_items_json(items.none()))), {'items': [], 'count': 0})
+
+    @override_settings(RATE_LIMIT_ENABLED=False, LISTING_STREAM_CHUNK_SIZE=4)
+    def test_streamed_listing_matches_the_listing(self) -> None:
+        cache.clear()
+        self.client.force_login(self.owner)
+        for query in ['all=true', 'all=true&sort=price_desc', 'q=nothing-matches']:
+            response = self.client.get(f'/api/items/?{query}&stream=true')
+            self.assertIsInstance(response, StreamingHttpResponse)
+            streamed = json.loads(b''.join(response.streaming_content))
+            self.assertEqual(streamed, self.client.get(f'/api/items/?{query}').json())
+        self.assertEqual(streamed, {'items': [], 'count': 0})
+
+
+# ============================================================================
+# Suggestions
+# ============================================================================
+
+class PrefixIndexTests(TestCase):
+    def setUp(self) -> None:
+        self.index = suggest.PrefixIndex()
+        end = timezone.now() + timedelta(hours=1)
+        self.end = end.timestamp()
+        self.index.build([(1, 'Vintage camera lens', end), (2, 'Camera bag', end), (3, 'Canvas print', end)])
+
+    def ids(self, query: str, limit: int = 8, now: Optional[float] = None) -> list[int]:
+        return [result['id'] for result in self.index.lookup(query, limit, now=now)]
+
+    def test_prefix_lookup(self) -> None:
+        self.assertEqual(sorted(self.ids('cam')), [1, 2])
+        self.assertEqual(sorted(self.ids('ca')), [1, 2, 3])
+        self.assertEqual(self.ids('vintage cam'), [1])
+        self.assertEqual(len(self.ids('ca', limit=2)), 2)
+        self.assertEqual(self.ids('xyz'), [])
+        self.assertEqual(self.ids('  '), [])
+
+    def test_add_remove_and_retitle(self) -> None:
+        self.index.add(4, 'Camcorder', self.end)
+        self.assertIn(4, self.ids('camc'))
+        self.index.add(2, 'Leather satchel', self.end)
+        self.assertEqual(self.ids('camera'), [1])
+        self.assertEqual(self.ids('sat'), [2])
+        self.index.remove(1)
+        self.assertEqual(self.ids('camera'), [])
+        self.assertEqual(self.ids('vint'), [])
+
+    def test_ended_items_are_skipped(self) -> None:
+        self.assertEqual(self.ids('canvas', now=self.end + 1), [])
+
+
+class SuggestIndexUpdateTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        index = mock.patch.object(suggest, '_index', suggest.PrefixIndex())
+        index.start()
+        self.addCleanup(index.stop)
+        owner = User.objects.create(username='owner', email='owner@example.com')
+        self.item = Item.objects.create(
+            title='Brass telescope', description='Suggestion test item',
+            starting_price=Decimal('10.00'), image='items/test.png',
+            end_datetime=timezone.now() + timedelta(days=1), owner=owner,
+        )
+        suggest.rebuild()
+
+    def suggested(self) -> list[int]:
+        return [result['id'] for result in suggest.suggest('teles')]
+
+    def test_marked_deleting_leaves_suggestions(self) -> None:
+        self.assertEqual(self.suggested(), [self.item.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            deletion.mark_deleting([self.item.id])
+        self.assertEqual(self.suggested(), [])
+
+    def test_status_changes_update_suggestions(self) -> None:
+        self.item.start_datetime = timezone.now() + timedelta(hours=1)
+        self.item.save()
+        lifecycle.reschedule(self.item)
+        self.assertEqual(self.item.status, Item.Status.SCHEDULED)
+        self.assertEqual(self.suggested(), [])
+        Item.objects.filter(id=self.item.id).update(start_datetime=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(lifecycle.open_started(), 1)
+        self.assertEqual(self.suggested(), [self.item.id])
+
+
+# ============================================================================
+# Rate limits
+# ============================================================================
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS={'question': {'user': '3/m'}})
+class RateLimitTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.owner = User.objects.create(username='owner', email='owner@example.com')
+        self.item = Item.objects.create(
+            title='Item', description='Rate limit test item',
+            starting_price=Decimal('10.00'), image='items/test.png',
+            end_datetime=timezone.now() + timedelta(days=1), owner=self.owner,
+        )
+        self.client.force_login(User.objects.create(username='asker', email='asker@example.com'))
+
+    def test_window_allows_limit_then_refills(self) -> None:
+        start = 1_000_000 * 60.0
+        self.assertEqual([ratelimit.hit('test', 3, 60, now=start + i) for i in range(3)], [0.0] * 3)
+        wait = ratelimit.hit('test', 3, 60, now=start + 3)
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 60)
+        # Still full while the requests are inside the sliding period
+        self.assertGreater(ratelimit.hit('test', 3, 60, now=start + 59), 0)
+        # Once the earlier windows have slid out there is room again
+        self.assertEqual(ratelimit.hit('test', 3, 60, now=start + 180), 0.0)
+
+    def test_view_returns_429_with_retry_after(self) -> None:
+        def ask():
+            return self.client.post(
+                f'/api/items/{self.item.id}/questions/', {'text': 'Is it new?'}, content_type='application/json'
+            )
+        self.assertEqual([ask().status_code for _ in range(3)], [201] * 3)
+        response = ask()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(Question.objects.count(), 3)
+        # Reads are not counted
+        self.assertEqual(self.client.get(f'/api/items/{self.item.id}/questions/').status_code, 200)
+
+    def test_checks_reject_non_atomic_caches(self) -> None:
+        for backend in checks.NON_ATOMIC_CACHE_BACKENDS:
+            with self.subTest(backend=backend), \
+                    override_settings(CACHES={'default': {'BACKEND': backend, 'LOCATION': '/tmp/unused'}}):
+                self.assertEqual([error.id for error in checks.cache_errors()], ['api.E001'])
+                with override_settings(RATE_LIMIT_ENABLED=False):
+                    self.assertEqual(checks.cache_errors(), [])
+        self.assertEqual(checks.cache_errors(), [])
+
+
+# ============================================================================
+# Deletion
+# ============================================================================
+
+@override_settings(RATE_LIMIT_ENABLED=False)
+class DeleteItemsTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.owner = User.objects.create(username='owner', email='owner@example.com')
+        self.bidder = User.objects.create(username='bidder', email='bidder@example.com')
+        self.item = Item.objects.create(
+            title='Item', description='Deletion test item',
+            starting_price=Decimal('1.00'), image='items/test.png',
+            end_datetime=timezone.now() + timedelta(days=1), owner=self.owner,
+        )
+        for amount in range(2, 9):
+            place_bid(self.item.id, self.bidder, Decimal(amount))
+        for n in range(5):
+            question = Question.objects.create(item=self.item, asker=self.bidder, text=f'Question {n}')
+            Answer.objects.create(question=question, responder=self.owner, text=f'Answer {n}')
+
+    def test_deletes_history_in_batches(self) -> None:
+        counts = deletion.delete_items([self.item.id], batch_size=3)
+        self.assertEqual(counts['api.Bid'], 7)
+        self.assertEqual((counts['api.Question'], counts['api.Answer'], counts['api.Item']), (5, 5, 1))
+        self.assertFalse(Item.objects.exists())
+        self.assertFalse(Bid.objects.exists() or Question.objects.exists() or Answer.objects.exists())
+
+    def test_marked_item_leaves_bidding_and_listings(self) -> None:
+        deletion.mark_deleting([self.item.id])
+        with self.assertRaisesMessage(BidRejected, 'This item is being deleted'):
+            place_bid(self.item.id, self.bidder, Decimal('20.00'))
+        self.client.force_login(self.bidder)
+        self.assertEqual(self.client.get('/api/items/?all=true').json()['items'], [])
+        self.assertEqual(self.client.get(f'/api/items/{self.item.id}/').status_code, 404)
+        # Nothing can be added to or changed on it while its history is deleted
+        question = Question.objects.filter(item=self.item).first()
+        self.client.force_login(self.owner)
+        for method, url, payload in [
+            ('put', f'/api/items/{self.item.id}/', {'title': 'Renamed'}),
+            ('post', f'/api/items/{self.item.id}/questions/', {'text': 'Still there?'}),
+            ('post', f'/api/questions/{question.id}/answers/', {'text': 'Yes'}),
+        ]:
+            with self.subTest(url=url):
+                response = getattr(self.client, method)(url, payload, content_type='application/json')
+                self.assertEqual(response.status_code, 404)
+        self.client.force_login(self.bidder)
+        response = self.client.post(
+            f'/api/items/{self.item.id}/bids/', {'amount': '30'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Question.objects.count(), 5)
+        # An interrupted deletion is finished by the cleanup job
+        self.assertEqual(deletion.finish_interrupted(), 1)
+        self.assertFalse(Item.objects.exists())
+
+    def test_archive_commits_before_deleting(self) -> None:
+        Item.objects.filter(id=self.item.id).update(
+            status=Item.Status.SETTLED, end_datetime=timezone.now() - timedelta(days=365)
+        )
+        self.assertEqual(archive.archive_ended_auctions(pause=0), 1)
+        archived = ArchivedItem.objects.get()
+        self.assertEqual(archived.bid_count, 7)
+        self.assertEqual(len(archived.payload['bids']), 7)
+        self.assertEqual(archived.payload['highest_bidder']['username'], 'bidder')
+        self.assertEqual([len(q['answers']) for q in archived.payload['questions']], [1] * 5)
+        self.assertFalse(Item.objects.exists() or Bid.objects.exists())
+
+    def test_snapshot_queries_do_not_grow_with_history(self) -> None:
+        item = Item.objects.select_related('owner', 'leader').get(id=self.item.id)
+        # Bids, questions, answers and responders
+        with self.assertNumQueries(4):
+            archive.snapshot_item(item)
+
+
+# ============================================================================
+# Exports
+# ============================================================================
+
+class ExportTests(TestCase):
+    def setUp(self) -> None:
+        self.staff = User.objects.create(username='staff', email='staff@example.com', is_staff=True)
+        self.owner = User.objects.create(username='owner', email='owner@example.com')
+        bidder = User.objects.create(username='bidder', email='bidder@example.com')
+        self.item = Item.objects.create(
+            title='Lamp, brass', description='Export test item', starting_price=Decimal('5.00'),
+            image='items/test.png', end_datetime=timezone.now() + timedelta(days=1), owner=self.owner,
+        )
+        [self.bid] = place_bid(self.item.id, bidder, Decimal('7.50')).bids
+
+    def get(self, path: str) -> StreamingHttpResponse:
+        self.client.force_login(self.staff)
+        response = self.client.get(path)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return response
+
+    def test_requires_staff(self) -> None:
+        self.client.force_login(self.owner)
+        response = self.client.get('/admin/export/items/')
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/admin/login/', response['Location'])
+
+        request = RequestFactory().get('/admin/export/items/')
+        request.user = self.owner
+        self.assertEqual(export.export_view(request, 'items').status_code, 403)
+
+    def test_csv_has_a_header_and_one_row_per_item(self) -> None:
+        response = self.get('/admin/export/items/?format=csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="items.csv"')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], ','.join(export.DATASETS['items'][1]))
+        self.item.refresh_from_db()
+        self.assertEqual(lines[1:], [
+            f'{self.item.id},"Lamp, brass",owner,live,5.00,7.50,1,0,{self.item.created_at.isoformat()},,'
+            f'{self.item.end_datetime.isoformat()}',
+        ])
+
+    def test_jsonl_rows_and_date_bounds(self) -> None:
+        response = self.get('/admin/export/bids/?format=jsonl')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(rows, [{
+            'id': self.bid.id, 'item_id': self.item.id, 'item__title': 'Lamp, brass',
+            'bidder__username': 'bidder', 'amount': '7.50', 'auto': False,
+            'timestamp': self.bid.timestamp.isoformat(),
+        }])
+
+        tomorrow = (timezone.now() + timedelta(days=1)).date().isoformat()
+        response = self.get(f'/admin/export/bids/?format=jsonl&since={tomorrow}')
+        self.assertEqual(b''.join(response.streaming_content), b'')
+
+    def test_rejects_unknown_datasets_formats_and_dates(self) -> None:
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/admin/export/users/').status_code, 404)
+        self.assertEqual(self.client.get('/admin/export/items/?format=xml').status_code, 400)
+        self.assertEqual(self.client.get('/admin/export/items/?since=yesterday').status_code, 400)
+
+
+# ============================================================================
+# Tracing
+# ============================================================================
+
+class TracingTests(TestCase):
+    TRACEPARENT = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'traces.jsonl')
+
+    @override_settings(TRACING_ENABLED=True, TRACING_SAMPLE_RATE=0.0)
+    def test_sampled_flag_is_only_followed_when_trusted(self) -> None:
+        with tracing.start_trace('untrusted', self.TRACEPARENT) as root:
+            self.assertIsNone(root)
+        with override_settings(TRACING_TRUST_TRACEPARENT=True, TRACING_FILE=''):
+            with tracing.start_trace('trusted', self.TRACEPARENT) as root:
+                self.assertEqual(root.trace.trace_id, '4bf92f3577b34da6a3ce929d0e0e4736')
+
+    @override_settings(TRACING_ENABLED=True, TRACING_SAMPLE_RATE=1.0, TRACING_FILE='')
+    def test_untrusted_traceparent_keeps_trace_id(self) -> None:
+        with tracing.start_trace('untrusted', self.TRACEPARENT) as root:
+            self.assertEqual(root.trace.trace_id, '4bf92f3577b34da6a3ce929d0e0e4736')
+            self.assertEqual(root.parent_id, '00f067aa0ba902b7')
+
+    def test_trace_file_is_rotated(self) -> None:
+        with override_settings(TRACING_FILE_MAX_BYTES=1000):
+            for _ in range(25):
+                tracing._append(self.path, 'x' * 99 + '\n')
+        self.assertLess(os.path.getsize(self.path), 1000)
+        self.assertGreaterEqual(os.path.getsize(f'{self.path}.1'), 1000)
+
+
+# ============================================================================
+# Price history
+# ============================================================================
+
+class PriceHistoryTests(TestCase):
+    def test_buckets_bids_in_sql(self) -> None:
+        owner = User.objects.create(username='owner', email='owner@example.com')
+        bidder = User.objects.create(username='bidder', email='bidder@example.com')
+        created = timezone.now() - timedelta(hours=10)
+        item = Item.objects.create(
+            title='Item', description='Price history test item',
+            starting_price=Decimal('5.00'), image='items/test.png',
+            end_datetime=created + timedelta(hours=9), owner=owner,
+        )
+        Item.objects.filter(id=item.id).update(created_at=created)
+        item.refresh_from_db()
+        for hours, amount in [(1.5, '6.00'), (2.2, '9.00'), (2.7, '8.00'), (8.9, '20.00')]:
+            bid = Bid.objects.create(item=item, bidder=bidder, amount=Decimal(amount))
+            Bid.objects.filter(id=bid.id).update(timestamp=created + timedelta(hours=hours))
+
+        history = price_history.compute_price_history(item, 9)
+        self.assertEqual(history['bid_count'], 4)
+        self.assertEqual(history['bucket_seconds'], 3600)
+        self.assertEqual([point['bids'] for point in history['points']], [0, 1, 2, 0, 0, 0, 0, 0, 1])
+        self.assertEqual(
+            [point['price'] for point in history['points']],
+            ['5.00', '6.00', '9.00', '9.00', '9.00', '9.00', '9.00', '9.00', '20.00'],
+        )
+        self.assertEqual(price_history.compute_price_history(item, 1)['points'][0]['bids'], 4)
+
+
+# ============================================================================
+# View counts
+# ============================================================================
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=3600, VIEW_COUNT_MAX_PENDING=5)
+class ViewCountTests(TestCase):
+    def setUp(self) -> None:
+        # Leave out what the other tests recorded in this process
+        pending = mock.patch.object(view_counts, '_pending', view_counts._PendingViews())
+        pending.start()
+        self.addCleanup(pending.stop)
+        owner = User.objects.create(username='owner', email='owner@example.com')
+        self.items = [
+            Item.objects.create(
+                title=f'Item {i}', description='View count test item',
+                starting_price=Decimal('5.00'), image='items/test.png',
+                end_datetime=timezone.now() + timedelta(days=1), owner=owner,
+            )
+            for i in range(3)
+        ]
+
+    def views(self) -> list[int]:
+        return [Item.objects.get(id=item.id).views for item in self.items]
+
+    def test_views_are_written_once_the_cap_is_reached(self) -> None:
+        first, second, third = self.items
+        with self.assertNumQueries(0):
+            for item_id in [first.id, first.id, second.id, first.id]:
+                view_counts.record_view(item_id)
+        self.assertEqual(view_counts.pending_total(), 4)
+        self.assertEqual(self.views(), [0, 0, 0])
+
+        view_counts.record_view(third.id)
+        self.assertEqual(view_counts.pending_total(), 0)
+        self.assertEqual(self.views(), [3, 1, 1])
+
+    @override_settings(VIEW_COUNT_FLUSH_BATCH=2)
+    def test_flush_adds_each_items_total(self) -> None:
+        first, second, third = self.items
+        for item_id, n in [(first.id, 4), (second.id, 1), (third.id, 2)]:
+            view_counts._pending.counts[item_id] += n
+            view_counts._pending.total += n
+        self.assertEqual(view_counts.flush(), 7)
+        view_counts._pending.counts[first.id] += 1
+        self.assertEqual(view_counts.flush(), 1)
+        self.assertEqual(self.views(), [5, 1, 2])
+        self.assertEqual(view_counts.flush(), 0)
+
+    def test_failed_flush_puts_the_views_back(self) -> None:
+        first, second, _ = self.items
+        view_counts.record_view(first.id)
+        view_counts.record_view(second.id)
+        view_counts.record_view(first.id)
+        with mock.patch.object(view_counts.transaction, 'atomic', side_effect=OperationalError('locked')):
+            self.assertEqual(view_counts.flush(), 0)
+        self.assertEqual(view_counts.pending_total(), 3)
+        self.assertEqual(self.views(), [0, 0, 0])
+
+        self.assertEqual(view_counts.flush(), 3)
+        self.assertEqual(self.views(), [2, 1, 0])
+
+
+# ============================================================================
+# Metrics
+# ============================================================================
+
+class MetricsTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        settings_override = override_settings(METRICS_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Leave out what the other tests counted in this process
+        registry = mock.patch.object(metrics, '_registry', metrics._Registry())
+        registry.start()
+        self.addCleanup(registry.stop)
+
+    def write_exited_process(self) -> str:
+        process = subprocess.Popen([sys.executable, '-c', 'pass'])
+        process.wait()
+        path = os.path.join(self.directory, f'{process.pid}.json')
+        with open(path, 'w') as f:
+            json.dump({
+                'counters': {'auction_bids_placed_total': {'': 3.0}},
+                'gauges': {'auction_cron_last_duration_seconds': {'job="test"': 1.5}},
+                'histograms': {},
+            }, f)
+        return path
+
+    def test_exited_processes_are_folded_into_one_file(self) -> None:
+        path = self.write_exited_process()
+        body = metrics.render_metrics()
+        self.assertIn('auction_bids_placed_total 3', body)
+        self.assertNotIn('auction_cron_last_duration_seconds', body)
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, metrics.DEAD_FILE)))
+
+        # Counted once, and added to by the next exited process
+        self.assertIn('auction_bids_placed_total 3', metrics.render_metrics())
+        self.write_exited_process()
+        self.assertIn('auction_bids_placed_total 6', metrics.render_metrics())
+
+    def test_database_failure_reports_down(self) -> None:
+        with mock.patch.object(metrics, '_database_gauges', side_effect=OperationalError('gone')):
+            response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('auction_db_up 0', response.content.decode())
+        self.assertIn('auction_db_up 1', self.client.get('/metrics').content.decode())
+
+    def test_database_gauges_are_cached_between_scrapes(self) -> None:
+        self.assertIn('auction_live_items 0', metrics.render_metrics())
+        with mock.patch.object(metrics, '_database_gauges') as gauges:
+            self.assertIn('auction_live_items 0', metrics.render_metrics())
+        gauges.assert_not_called()
+        with override_settings(METRICS_DB_GAUGES_TTL=0), \
+                mock.patch.object(metrics, '_database_gauges', return_value={'auction_live_items': 2}):
+            self.assertIn('auction_live_items 2', metrics.render_metrics())
+
+    @override_settings(PRODUCTION=True, METRICS_TOKEN='')
+    def test_production_requires_a_token(self) -> None:
+        self.assertEqual([error.id for error in checks.metrics_errors()], ['api.E002'])
+        with override_settings(METRICS_TOKEN='secret'):
+            self.assertEqual(checks.metrics_errors(), [])
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+            self.assertEqual(response.status_code, 200)
+
+
+# ============================================================================
+# Profiling
+# ============================================================================
+
+class WantsProfileTests(TestCase):
+    def setUp(self) -> None:
+        self.factory = RequestFactory()
+        self.staff = User.objects.create(username='staff', email='staff@example.com', is_staff=True)
+
+    def wants(self, path: str, **headers: str) -> bool:
+        request = self.factory.get(path, **headers)
+        request.user = self.staff
+        return profiling._wants_profile(request)
+
+    def test_requires_a_truthy_value(self) -> None:
+        self.assertTrue(self.wants('/api/items/', HTTP_X_PROFILE='1'))
+        self.assertTrue(self.wants('/api/items/?__profile=true'))
+        self.assertFalse(self.wants('/api/items/', HTTP_X_PROFILE='0'))
+        self.assertFalse(self.wants('/api/items/?__profile=0'))
+        self.assertFalse(self.wants('/api/items/?__profile='))
+        self.assertFalse(self.wants('/api/items/?x__profile=1'))
+        self.assertFalse(self.wants('/api/items/?q=__profile'))
+
+    def test_requires_staff(self) -> None:
+        self.staff.is_staff = False
+        self.assertFalse(self.wants('/api/items/', HTTP_X_PROFILE='1'))
+
+
+# ============================================================================
+# Memory
+# ============================================================================
+
+class MemoryViewTests(TestCase):
+    def setUp(self) -> None:
+        self.admin = User.objects.create(
+            username='admin', email='admin@example.com', is_staff=True, is_superuser=True,
+        )
+        self.client.force_login(self.admin)
+
+    def start(self, **fields: str) -> HttpResponse:
+        return self.client.post('/admin/memory/', {'action': 'start', **fields})
+
+    def test_frames_must_be_in_range(self) -> None:
+        with mock.patch.object(memory, 'start_session') as start_session:
+            for fields in [{'frames': '0'}, {'frames': '101'}, {'frames': '1e9'}, {'requests': 'many'}]:
+                with self.subTest(**fields):
+                    self.assertEqual(self.start(**fields).status_code, 400)
+            start_session.assert_not_called()
+            response = self.start(requests='50', frames=str(memory.MAX_FRAMES))
+        self.assertRedirects(response, '/admin/memory/', fetch_redirect_response=False)
+        start_session.assert_called_once_with(50, memory.MAX_FRAMES)
+
+    def test_start_session_clamps_frames(self) -> None:
+        self.addCleanup(memory.stop_session)
+        with mock.patch.object(memory, 'tracemalloc') as tracemalloc:
+            tracemalloc.is_tracing.return_value = False
+            memory.start_session(10, frames=10_000)
+            memory.start_session(10, frames=-5)
+        self.assertEqual(tracemalloc.start.call_args_list, [mock.call(memory.MAX_FRAMES), mock.call(1)])
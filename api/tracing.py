@@ -0,0 +1,414 @@
+"""
+Lightweight request and job tracing with OTLP-compatible JSON export.
+
+A trace is started for each sampled request by ``TracingMiddleware`` and for
+each cron job decorated with ``traced_job``. Within it, ``span`` and the
+``traced`` decorator record nested, timed spans. The current span lives in a
+context variable, so spans nest per thread without being passed around.
+While a request is traced, every ORM query gets a ``db.query`` span through
+``connection.execute_wrapper``.
+
+An incoming W3C ``traceparent`` header continues the caller's trace. Its
+sampling flag is only followed with ``TRACING_TRUST_TRACEPARENT``, e.g. when
+a gateway that samples sets it, since any client could otherwise force
+every one of its requests to be traced. Otherwise ``TRACING_SAMPLE_RATE``
+(or ``TRACING_CRON_SAMPLE_RATE`` for cron jobs) decides. Unsampled requests only
+pay for one context variable lookup per instrumented call.
+
+A finished trace is exported as one line of OTLP/JSON (``resourceSpans``) to
+``TRACING_FILE``, which is rotated to ``<file>.1`` past
+``TRACING_FILE_MAX_BYTES``, and POSTed to ``TRACING_OTLP_ENDPOINT`` from a background
+thread when that is set, e.g. ``http://collector:4318/v1/traces``.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import queue
+import random
+import re
+import tempfile
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+from . import metrics
+
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+TRACEPARENT_HEADER = 'HTTP_TRACEPARENT'
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Longest SQL statement kept on a db.query span
+MAX_STATEMENT_LENGTH = 2000
+
+
+@dataclass
+class Span:
+    trace: '_Trace'
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    kind: int = KIND_INTERNAL
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_ns: int = 0
+    end_ns: int = 0
+    status: int = STATUS_OK
+    status_message: str = ''
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def fail(self, message: str) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    @property
+    def traceparent(self) -> str:
+        """W3C ``traceparent`` value for passing this span on to another service."""
+        return f'00-{self.trace.trace_id}-{self.span_id}-01'
+
+
+@dataclass
+class _Trace:
+    trace_id: str
+    spans: list[Span] = field(default_factory=list)
+    dropped: int = 0
+
+
+_current: ContextVar[Optional[Span]] = ContextVar('tracing_current_span', default=None)
+
+
+def _enabled() -> bool:
+    return getattr(settings, 'TRACING_ENABLED', False)
+
+
+def _new_id(length: int) -> str:
+    return f'{random.getrandbits(length * 4):0{length}x}'
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple[str, str, bool]]:
+    """``(trace_id, parent_span_id, sampled)`` from a W3C traceparent, or None."""
+    match = _TRACEPARENT.match((value or '').strip().lower())
+    if not match or match.group(1) == '0' * 32 or match.group(2) == '0' * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+# ============================================================================
+# Spans
+# ============================================================================
+
+@contextlib.contextmanager
+def _activate(span: Span) -> Iterator[Span]:
+    token = _current.set(span)
+    span.start_ns = time.time_ns()
+    try:
+        yield span
+    except BaseException as e:
+        span.fail(f'{type(e).__name__}: {e}')
+        raise
+    finally:
+        span.end_ns = time.time_ns()
+        _current.reset(token)
+        if span.trace.spans and span.trace.spans[0] is span:
+            _export(span.trace)
+
+
+@contextlib.contextmanager
+def start_trace(
+    name: str,
+    traceparent: Optional[str] = None,
+    kind: int = KIND_SERVER,
+    sample_rate: Optional[float] = None,
+    **attributes: Any,
+) -> Iterator[Optional[Span]]:
+    """
+    Start a trace with a root span, or continue the one in ``traceparent``.
+
+    Yields None when tracing is off or the trace is not sampled.
+    """
+    if not _enabled():
+        yield None
+        return
+    if sample_rate is None:
+        sample_rate = getattr(settings, 'TRACING_SAMPLE_RATE', 0.01)
+    parent = parse_traceparent(traceparent)
+    if parent is None:
+        trace_id, parent_id, sampled = _new_id(32), None, random.random() < sample_rate
+    else:
+        trace_id, parent_id, sampled = parent
+        if not getattr(settings, 'TRACING_TRUST_TRACEPARENT', False):
+            sampled = random.random() < sample_rate
+    if not sampled:
+        yield None
+        return
+
+    trace = _Trace(trace_id)
+    root = Span(trace, _new_id(16), parent_id, name, kind, dict(attributes))
+    trace.spans.append(root)
+    with _activate(root):
+        yield root
+
+
+@contextlib.contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Record a child of the current span; yields None outside a sampled trace.
+
+    Past ``TRACING_MAX_SPANS`` spans in one trace, further spans are only
+    counted, so a loop over thousands of rows cannot grow a trace without bound.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    trace = parent.trace
+    if len(trace.spans) >= getattr(settings, 'TRACING_MAX_SPANS', 1000):
+        trace.dropped += 1
+        yield None
+        return
+    child = Span(trace, _new_id(16), parent.span_id, name, kind, dict(attributes))
+    trace.spans.append(child)
+    with _activate(child):
+        yield child
+
+
+def traced(name: Optional[str] = None, kind: int = KIND_INTERNAL) -> Callable[[F], F]:
+    """Record each call of the decorated function as a span of the current trace."""
+    def decorator(func: F) -> F:
+        span_name = name or f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            # The common case, no trace, skips the context manager entirely
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def traced_job(name: str) -> Callable[[F], F]:
+    """Trace each run of a cron job, sampled with ``TRACING_CRON_SAMPLE_RATE``."""
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            rate = getattr(settings, 'TRACING_CRON_SAMPLE_RATE', 1.0)
+            with start_trace(f'cron {name}', kind=KIND_INTERNAL, sample_rate=rate, **{'cron.job': name}):
+                with _queries_traced():
+                    return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+# ============================================================================
+# ORM queries
+# ============================================================================
+
+def _query_span(execute: Callable, sql: str, params: Any, many: bool, context: dict) -> Any:
+    connection = context['connection']
+    with span('db.query', KIND_CLIENT, **{
+        'db.system': connection.vendor,
+        'db.name': connection.alias,
+        'db.statement': sql[:MAX_STATEMENT_LENGTH],
+        'db.executemany': many,
+    }):
+        return execute(sql, params, many, context)
+
+
+@contextlib.contextmanager
+def _queries_traced() -> Iterator[None]:
+    """Record ORM queries as spans while a sampled trace is active."""
+    if _current.get() is None:
+        yield
+        return
+    with contextlib.ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(_query_span))
+        yield
+
+
+# ============================================================================
+# Export
+# ============================================================================
+
+def _value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{'key': key, 'value': _value(value)} for key, value in attributes.items() if value is not None]
+
+
+def to_otlp(trace: _Trace) -> dict[str, Any]:
+    """The trace as an OTLP/JSON ``ExportTraceServiceRequest``."""
+    spans = []
+    for item in trace.spans:
+        payload: dict[str, Any] = {
+            'traceId': trace.trace_id,
+            'spanId': item.span_id,
+            'name': item.name,
+            'kind': item.kind,
+            'startTimeUnixNano': str(item.start_ns),
+            'endTimeUnixNano': str(item.end_ns),
+            'attributes': _attributes(item.attributes),
+            'status': {'code': item.status, 'message': item.status_message},
+        }
+        if item.parent_id:
+            payload['parentSpanId'] = item.parent_id
+        spans.append(payload)
+    if trace.dropped:
+        spans[0]['attributes'].append({'key': 'tracing.dropped_spans', 'value': _value(trace.dropped)})
+    return {'resourceSpans': [{
+        'resource': {'attributes': _attributes({
+            'service.name': getattr(settings, 'TRACING_SERVICE_NAME', 'auction'),
+            'process.pid': os.getpid(),
+        })},
+        'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}],
+    }]}
+
+
+_file_lock = threading.Lock()
+_outbox: 'queue.Queue[bytes]' = queue.Queue(maxsize=1000)
+_sender: Optional[threading.Thread] = None
+_sender_lock = threading.Lock()
+
+
+def _trace_file() -> str:
+    return getattr(settings, 'TRACING_FILE', os.path.join(tempfile.gettempdir(), 'auction-traces.jsonl'))
+
+
+def _send_forever(endpoint: str) -> None:
+    while True:
+        body = _outbox.get()
+        request = urllib.request.Request(
+            endpoint, data=body, method='POST', headers={'Content-Type': 'application/json'},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                response.read()
+        except OSError:
+            metrics.inc('auction_trace_export_errors_total', labels={'exporter': 'otlp'})
+
+
+def _post(body: bytes, endpoint: str) -> None:
+    global _sender
+    with _sender_lock:
+        if _sender is None or not _sender.is_alive():
+            _sender = threading.Thread(target=_send_forever, args=(endpoint,), name='trace-exporter', daemon=True)
+            _sender.start()
+    try:
+        _outbox.put_nowait(body)
+    except queue.Full:
+        # The collector is down or slow; drop rather than hold up requests
+        metrics.inc('auction_trace_export_errors_total', labels={'exporter': 'otlp'})
+
+
+def _append(path: str, line: str) -> None:
+    max_bytes = getattr(settings, 'TRACING_FILE_MAX_BYTES', 100 * 1024 * 1024)
+    with _file_lock:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            full = max_bytes and f.tell() >= max_bytes
+        if full:
+            # Keep one previous file; workers still appending to it finish there
+            os.replace(path, f'{path}.1')
+
+
+def _export(trace: _Trace) -> None:
+    body = json.dumps(to_otlp(trace), separators=(',', ':'))
+    path = _trace_file()
+    if path:
+        try:
+            _append(path, body + '\n')
+        except OSError:
+            metrics.inc('auction_trace_export_errors_total', labels={'exporter': 'file'})
+    endpoint = getattr(settings, 'TRACING_OTLP_ENDPOINT', '')
+    if endpoint:
+        _post(body.encode(), endpoint)
+    metrics.inc('auction_traces_exported_total')
+
+
+# ============================================================================
+# Request hook
+# ============================================================================
+
+class TracingMiddleware:
+    """
+    Trace sampled requests: a server span for the request, a span for the view
+    and a span for each ORM query.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not _enabled():
+            return self.get_response(request)
+
+        with start_trace(
+            f'{request.method} {request.path}',
+            request.META.get(TRACEPARENT_HEADER),
+            **{'http.method': request.method, 'http.target': request.path},
+        ) as root:
+            if root is None:
+                return self.get_response(request)
+            with _queries_traced():
+                response = self.get_response(request)
+            view = getattr(request, '_tracing_view', None)
+            if view is not None:
+                manager, view_span = view
+                if view_span is not None and response.status_code >= 500:
+                    view_span.fail(f'HTTP {response.status_code}')
+                manager.__exit__(None, None, None)
+
+            match = getattr(request, 'resolver_match', None)
+            if match is not None:
+                # Name by route, so traces of one endpoint group together
+                root.name = f'{request.method} {match.route or match.view_name}'
+                root.set('http.route', match.route)
+            root.set('http.status_code', response.status_code)
+            if response.status_code >= 500:
+                root.fail(f'HTTP {response.status_code}')
+            response['X-Trace-Id'] = root.trace.trace_id
+            return response
+
+    def process_view(self, request: HttpRequest, view_func: Callable, view_args: tuple, view_kwargs: dict) -> None:
+        if _current.get() is None:
+            return None
+        # Closed in __call__ once the response has come back through the
+        # middleware below this one
+        name = getattr(request.resolver_match, 'view_name', None) or view_func.__name__
+        manager = span(f'view {name}')
+        request._tracing_view = (manager, manager.__enter__())  # type: ignore[attr-defined]
+        return None
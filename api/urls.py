@@ -1,7 +1,7 @@
 """API URL Configuration"""
 
 from django.urls import path
-from . import views
+from . import bulk_import, views
 
 urlpatterns = [
     # Authentication views (Django templates)
@@ -21,10 +21,17 @@ urlpatterns = [
     
     # Items API
     path('api/items/', views.api_items, name='api_items'),
+    path('api/items/suggest/', views.api_item_suggestions, name='api_item_suggestions'),
+    path('api/items/import/', bulk_import.api_items_import, name='api_items_import'),
+    path('api/items/import/<int:job_id>/', bulk_import.api_import_job, name='api_import_job'),
     path('api/items/<int:item_id>/', views.api_item_detail, name='api_item_detail'),
     path('api/items/<int:item_id>/bids/', views.api_item_bids, name='api_item_bids'),
+    path('api/items/<int:item_id>/price-history/', views.api_item_price_history, name='api_item_price_history'),
     path('api/items/<int:item_id>/questions/', views.api_item_questions, name='api_item_questions'),
     
+    # Feeds API ("ending-soon", "trending")
+    path('api/feeds/<slug:feed>/', views.api_feed, name='api_feed'),
+    
     # Questions API
     path('api/questions/<int:question_id>/answers/', views.api_question_answer, name='api_question_answer'),
 ]
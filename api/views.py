@@ -1,20 +1,27 @@
-from django.http import HttpResponse, HttpRequest, JsonResponse
+from django.http import HttpResponse, HttpRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.db.models import Q
-from django.utils import timezone
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import DecimalValidator
+from django.db import transaction
+from django.db.models import Q, QuerySet
+import hashlib
 from decimal import Decimal, InvalidOperation
 import json
 from typing import Any
 
+from . import archive, caching, deletion, feeds, lifecycle, price_history, suggest, view_counts
+from .bidding import BidRejected, parse_amount, place_bid
+from .ratelimit import rate_limit
 from .models import User, Item, Bid, Question, Answer
 from .forms import SignupForm, LoginForm
 from .serializers import (
-    serialize_user, serialize_item, serialize_items_list,
-    serialize_bid, serialize_question, serialize_answer
+    serialize_user, serialize_item, serialize_items_list, serialize_items_queryset,
+    stream_items_json, serialize_bid, serialize_question, serialize_answer, refresh_active
 )
 
 
@@ -125,9 +132,86 @@ def api_profile(request: HttpRequest) -> JsonResponse:
     return JsonResponse(serialize_user(user))
 
 
+# Orderings for the item listing's ``sort`` parameter; each one is served by
+# an index on Item (see Item.Meta.indexes). Each ends with id, so pages can
+# also be read by keyset (``?cursor=``)
+ITEM_SORTS: dict[str, tuple[str, ...]] = {
+    'newest': ('-created_at', '-id'),
+    'ending_soon': ('end_datetime', 'id'),
+    'price_asc': ('current_price', 'id'),
+    'price_desc': ('-current_price', '-id'),
+    'most_bids': ('-bid_count', '-id'),
+    'most_viewed': ('-views', '-id'),
+}
+
+
+def parse_price_bound(value: str | None) -> Decimal | None:
+    """
+    Parse a ``min_price``/``max_price`` listing filter.
+
+    Raises ``ValueError`` unless it is a non-negative, finite amount that fits
+    the ``Item.current_price`` column.
+    """
+    if not value:
+        return None
+    field = Item._meta.get_field('current_price')
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f'{value!r} is not a number')
+    try:
+        # Also rejects NaN and Infinity
+        DecimalValidator(field.max_digits, field.decimal_places)(price)
+    except ValidationError:
+        raise ValueError(
+            f'prices have at most {field.decimal_places} decimal places '
+            f'and {field.max_digits - field.decimal_places} digits before the point'
+        )
+    if price < 0:
+        raise ValueError('prices cannot be negative')
+    return price
+
+
+def build_items_queryset(
+    search_query: str,
+    show_all: bool,
+    sort: str,
+    min_price: Decimal | None,
+    max_price: Decimal | None,
+    owner: User | None = None,
+) -> QuerySet:
+    """Build the item listing queryset from the parsed query parameters."""
+    items = open_items()
+    
+    # Filter by owner if requested
+    if owner is not None:
+        items = items.filter(owner=owner)
+    
+    # Filter live items only (unless show_all)
+    if not show_all:
+        lifecycle.open_started()
+        items = items.filter(lifecycle.live_filter())
+    
+    # Search by title or description
+    if search_query:
+        items = items.filter(
+            Q(title__icontains=search_query) |
+            Q(description__icontains=search_query)
+        )
+    
+    # Price range on the denormalized current price column
+    if min_price is not None:
+        items = items.filter(current_price__gte=min_price)
+    if max_price is not None:
+        items = items.filter(current_price__lte=max_price)
+    
+    return items.order_by(*ITEM_SORTS[sort])
+
+
 @login_required
 @require_http_methods(["GET", "POST"])
-def api_items(request: HttpRequest) -> JsonResponse:
+@rate_limit('search', methods=('GET',), when=lambda request: bool(request.GET.get('q', '').strip()))
+def api_items(request: HttpRequest) -> JsonResponse | StreamingHttpResponse:
     """List all active items or create a new item."""
     if request.method == 'GET':
         # Get query parameters
@@ -135,28 +219,74 @@ def api_items(request: HttpRequest) -> JsonResponse:
         show_all: bool = request.GET.get('all', 'false').lower() == 'true'
         my_items: bool = request.GET.get('my', 'false').lower() == 'true'
         
-        # Base queryset
-        items = Item.objects.select_related('owner').prefetch_related('bids')
-        
-        # Filter by owner if requested
-        if my_items:
-            items = items.filter(owner=request.user)
+        sort: str = request.GET.get('sort', 'newest')
+        if sort not in ITEM_SORTS:
+            return JsonResponse({'error': f'Invalid sort: {sort}'}, status=400)
+        try:
+            min_price = parse_price_bound(request.GET.get('min_price'))
+            max_price = parse_price_bound(request.GET.get('max_price'))
+        except ValueError as e:
+            return JsonResponse({'error': f'Invalid price range: {e}'}, status=400)
+        # Paging: ?limit=n&offset=m returns one page of the listing. With
+        # ?cursor= (empty for the first page) pages are read by keyset instead,
+        # which costs the same however deep the page is
+        cursor = request.GET.get('cursor')
+        try:
+            limit = int(request.GET['limit']) if request.GET.get('limit') else None
+            offset = int(request.GET.get('offset') or 0)
+        except ValueError:
+            return JsonResponse({'error': 'Invalid limit or offset'}, status=400)
+        if limit is not None:
+            limit = min(max(limit, 1), settings.ITEM_PAGE_MAX_SIZE)
+        offset = max(offset, 0)
         
-        # Filter active items only (unless show_all)
-        if not show_all:
-            items = items.filter(end_datetime__gt=timezone.now())
+        def items_queryset() -> QuerySet:
+            return build_items_queryset(
+                search_query, show_all, sort, min_price, max_price,
+                owner=request.user if my_items else None,
+            )
         
-        # Search by title or description
-        if search_query:
-            items = items.filter(
-                Q(title__icontains=search_query) |
-                Q(description__icontains=search_query)
+        # Large listings: encode and send the items chunk by chunk instead of
+        # building the whole response in memory (not cached)
+        if request.GET.get('stream', 'false').lower() == 'true':
+            return StreamingHttpResponse(
+                stream_items_json(items_queryset(), settings.LISTING_STREAM_CHUNK_SIZE),
+                content_type='application/json',
             )
         
-        return JsonResponse({
-            'items': serialize_items_list(list(items)),
-            'count': items.count()
-        })
+        def build_listing() -> dict[str, Any]:
+            if limit is None:
+                serialized = serialize_items_queryset(items_queryset())
+                return {'items': serialized, 'count': len(serialized)}
+            # One extra row tells whether another page follows, without a COUNT query
+            if cursor is not None:
+                items = feeds.keyset_filter(items_queryset(), ITEM_SORTS[sort], cursor)
+                serialized = serialize_items_queryset(items[:limit + 1])
+                more = len(serialized) > limit
+                serialized = serialized[:limit]
+                column = ITEM_SORTS[sort][0].lstrip('-')
+                next_cursor = (
+                    feeds.keyset_cursor(serialized[-1][column], serialized[-1]['id']) if more else None
+                )
+                return {'items': serialized, 'count': len(serialized), 'next_cursor': next_cursor}
+            serialized = serialize_items_queryset(items_queryset()[offset:offset + limit + 1])
+            next_offset = offset + limit if len(serialized) > limit else None
+            serialized = serialized[:limit]
+            return {'items': serialized, 'count': len(serialized), 'offset': offset, 'next_offset': next_offset}
+        
+        # Per-user listings are not shared, so only cache the public ones
+        if my_items:
+            return JsonResponse(build_listing())
+        # Bids and item changes bump the list version. The key stays the same,
+        # so while one caller rebuilds an outdated listing the others serve it
+        version = caching.list_version()
+        key = 'item-list:' + hashlib.md5(
+            f'{search_query}|{show_all}|{sort}|{min_price}|{max_price}|{limit}|{offset}|{cursor}'.encode()
+        ).hexdigest()
+        listing = caching.get_or_build(
+            key, build_listing, settings.ITEM_LIST_CACHE_TTL, name='item_list', version=version
+        )
+        return JsonResponse({**listing, 'items': refresh_active(listing['items'])})
     
     # POST - Create new item
     if request.content_type and 'multipart' in request.content_type:
@@ -180,31 +310,86 @@ def api_items(request: HttpRequest) -> JsonResponse:
             title=data['title'],
             description=data['description'],
             starting_price=Decimal(data['starting_price']),
-            end_datetime=data['end_datetime'],
+            start_datetime=lifecycle.parse_auction_datetime(data['start_datetime']) if data.get('start_datetime') else None,
+            end_datetime=lifecycle.parse_auction_datetime(data['end_datetime']),
             owner=request.user,
             image=image if image else None
         )
     except (InvalidOperation, ValueError) as e:
         return JsonResponse({'error': f'Invalid data: {e}'}, status=400)
+    caching.invalidate_lists()
     
     return JsonResponse(serialize_item(item), status=201)
 
 
+@login_required
+@require_http_methods(["GET"])
+def api_item_suggestions(request: HttpRequest) -> JsonResponse:
+    """Title suggestions for the search bar from the in-memory prefix index."""
+    try:
+        limit = min(max(int(request.GET.get('limit', '8')), 1), 20)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    
+    return JsonResponse({
+        'suggestions': suggest.suggest(request.GET.get('q', ''), limit)
+    })
+
+
+def open_items() -> QuerySet:
+    """Items that can be read and changed; items being deleted are left out."""
+    return Item.objects.exclude(status=Item.Status.DELETING)
+
+
+def lock_open_item(item_id: int) -> bool:
+    """
+    Lock the item row inside the current transaction; False if it is being deleted.
+
+    ``deletion.mark_deleting`` waits for the lock, so a question or answer
+    inserted under it is never left behind by the batched deletion.
+    """
+    return open_items().select_for_update().filter(id=item_id).exists()
+
+
+def item_detail_payload(item_id: int) -> dict[str, Any] | None:
+    """Detail payload of a live or archived item, or None if it does not exist."""
+    item = open_items().select_related('owner', 'leader').filter(id=item_id).first()
+    if item is not None:
+        return serialize_item(item, include_details=True)
+    # Settled auctions are moved to the archive after the retention period
+    payload = archive.get_archived_payload(item_id)
+    if payload is None:
+        return None
+    return {**payload, 'bids': payload['bids'][:10]}
+
+
 @login_required
 @require_http_methods(["GET", "PUT", "DELETE"])
 def api_item_detail(request: HttpRequest, item_id: int) -> JsonResponse:
     """Get, update, or delete a specific item."""
-    item = get_object_or_404(Item, id=item_id)
-    
     if request.method == 'GET':
-        return JsonResponse(serialize_item(item, include_details=True))
+        key = f'item-detail:{item_id}:v{caching.item_version(item_id)}'
+        payload = caching.get_or_build(
+            key, lambda: item_detail_payload(item_id),
+            settings.ITEM_DETAIL_CACHE_TTL, name='item_detail'
+        )
+        if payload is None:
+            return JsonResponse({'error': 'Item not found'}, status=404)
+        if not payload.get('archived'):
+            view_counts.record_view(item_id)
+        return JsonResponse(refresh_active([payload])[0])
+    
+    item = open_items().filter(id=item_id).first()
+    if item is None:
+        return JsonResponse({'error': 'Item not found'}, status=404)
     
     # Only owner can update/delete
     if item.owner != request.user:
         return JsonResponse({'error': 'Permission denied'}, status=403)
     
     if request.method == 'DELETE':
-        item.delete()
+        # Clears the bid and Q&A history in batches, then invalidates the cache
+        deletion.delete_item(item)
         return JsonResponse({'success': True})
     
     # PUT - Update item
@@ -223,20 +408,34 @@ def api_item_detail(request: HttpRequest, item_id: int) -> JsonResponse:
         item.title = data['title']
     if 'description' in data:
         item.description = data['description']
-    if 'starting_price' in data:
-        item.starting_price = Decimal(data['starting_price'])
-    if 'end_datetime' in data:
-        item.end_datetime = data['end_datetime']
+    try:
+        if 'starting_price' in data:
+            item.starting_price = Decimal(data['starting_price'])
+        if 'start_datetime' in data:
+            item.start_datetime = lifecycle.parse_auction_datetime(data['start_datetime']) if data['start_datetime'] else None
+        if 'end_datetime' in data:
+            item.end_datetime = lifecycle.parse_auction_datetime(data['end_datetime'])
+    except (InvalidOperation, ValueError) as e:
+        return JsonResponse({'error': f'Invalid data: {e}'}, status=400)
     
     item.save()
+    if 'start_datetime' in data or 'end_datetime' in data:
+        lifecycle.reschedule(item)
+    caching.invalidate_item(item.id)
     return JsonResponse(serialize_item(item, include_details=True))
 
 
 @login_required
 @require_http_methods(["GET", "POST"])
+@rate_limit('bid')
 def api_item_bids(request: HttpRequest, item_id: int) -> JsonResponse:
     """Get bids for an item or place a new bid."""
-    item = get_object_or_404(Item, id=item_id)
+    item = open_items().filter(id=item_id).first()
+    if item is None:
+        payload = archive.get_archived_payload(item_id) if request.method == 'GET' else None
+        if payload is None:
+            return JsonResponse({'error': 'Item not found'}, status=404)
+        return JsonResponse({'bids': payload['bids'], 'count': len(payload['bids'])})
     
     if request.method == 'GET':
         bids = item.bids.select_related('bidder').all()
@@ -246,9 +445,7 @@ def api_item_bids(request: HttpRequest, item_id: int) -> JsonResponse:
         })
     
     # POST - Place a bid
-    # Check if auction is still active
-    if not item.is_active:
-        return JsonResponse({'error': 'This auction has ended'}, status=400)
+    # Auction status is checked by place_bid, under the row lock
     
     # Can't bid on own item
     if item.owner == request.user:
@@ -259,35 +456,56 @@ def api_item_bids(request: HttpRequest, item_id: int) -> JsonResponse:
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
     
-    if 'amount' not in data:
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    
+    # A max_amount makes this a proxy bid: the system bids up to it for the user
+    proxy = 'max_amount' in data
+    field = 'max_amount' if proxy else 'amount'
+    if field not in data:
         return JsonResponse({'error': 'Missing amount'}, status=400)
     
+    # Re-checked under a row lock, together with the price
     try:
-        amount = Decimal(data['amount'])
-    except InvalidOperation:
-        return JsonResponse({'error': 'Invalid amount'}, status=400)
+        amount = parse_amount(data[field])
+        result = place_bid(item.id, request.user, amount, proxy=proxy)
+    except BidRejected as e:
+        return JsonResponse({'error': str(e)}, status=400)
     
-    # Validate bid is higher than current price
-    current_price = item.current_price
-    if amount <= current_price:
-        return JsonResponse({
-            'error': f'Bid must be higher than current price (£{current_price})'
-        }, status=400)
+    return JsonResponse({
+        'bids': [serialize_bid(b) for b in result.bids],
+        'leading': result.leading,
+        'current_price': str(result.current_price),
+        # Only ever shown to its owner
+        'max_amount': str(result.max_amount) if result.max_amount is not None else None,
+    }, status=201)
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_item_price_history(request: HttpRequest, item_id: int) -> JsonResponse:
+    """Get the item's bid curve downsampled to ``points`` buckets."""
+    item = get_object_or_404(open_items(), id=item_id)
     
-    bid = Bid.objects.create(
-        item=item,
-        bidder=request.user,
-        amount=amount
-    )
+    try:
+        points = int(request.GET.get('points', '100'))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid points'}, status=400)
     
-    return JsonResponse(serialize_bid(bid), status=201)
+    return JsonResponse(price_history.get_price_history(item, points))
 
 
 @login_required
 @require_http_methods(["GET", "POST"])
+@rate_limit('question')
 def api_item_questions(request: HttpRequest, item_id: int) -> JsonResponse:
     """Get questions for an item or ask a new question."""
-    item = get_object_or_404(Item, id=item_id)
+    item = open_items().filter(id=item_id).first()
+    if item is None:
+        payload = archive.get_archived_payload(item_id) if request.method == 'GET' else None
+        if payload is None:
+            return JsonResponse({'error': 'Item not found'}, status=404)
+        return JsonResponse({'questions': payload['questions'], 'count': len(payload['questions'])})
     
     if request.method == 'GET':
         questions = item.questions.select_related('asker').prefetch_related('answers', 'answers__responder').all()
@@ -305,11 +523,15 @@ def api_item_questions(request: HttpRequest, item_id: int) -> JsonResponse:
     if 'text' not in data or not data['text'].strip():
         return JsonResponse({'error': 'Question text is required'}, status=400)
     
-    question = Question.objects.create(
-        item=item,
-        asker=request.user,
-        text=data['text'].strip()
-    )
+    with transaction.atomic():
+        if not lock_open_item(item.id):
+            return JsonResponse({'error': 'Item not found'}, status=404)
+        question = Question.objects.create(
+            item=item,
+            asker=request.user,
+            text=data['text'].strip()
+        )
+    caching.invalidate_item(item.id)
     
     return JsonResponse(serialize_question(question), status=201)
 
@@ -318,7 +540,9 @@ def api_item_questions(request: HttpRequest, item_id: int) -> JsonResponse:
 @require_http_methods(["POST"])
 def api_question_answer(request: HttpRequest, question_id: int) -> JsonResponse:
     """Post an answer to a question (only item owner can answer)."""
-    question = get_object_or_404(Question, id=question_id)
+    question = get_object_or_404(
+        Question.objects.select_related('item').exclude(item__status=Item.Status.DELETING), id=question_id
+    )
     
     # Only item owner can answer
     if question.item.owner != request.user:
@@ -332,10 +556,38 @@ def api_question_answer(request: HttpRequest, question_id: int) -> JsonResponse:
     if 'text' not in data or not data['text'].strip():
         return JsonResponse({'error': 'Answer text is required'}, status=400)
     
-    answer = Answer.objects.create(
-        question=question,
-        responder=request.user,
-        text=data['text'].strip()
-    )
+    with transaction.atomic():
+        if not lock_open_item(question.item_id):
+            return JsonResponse({'error': 'Question not found'}, status=404)
+        answer = Answer.objects.create(
+            question=question,
+            responder=request.user,
+            text=data['text'].strip()
+        )
+    caching.invalidate_item(question.item_id)
     
     return JsonResponse(serialize_answer(answer), status=201)
+
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_feed(request: HttpRequest, feed: str) -> JsonResponse:
+    """Get one page of the "ending-soon" or "trending" feed."""
+    pages = {
+        'ending-soon': feeds.ending_soon_page,
+        'trending': feeds.trending_page,
+    }
+    if feed not in pages:
+        return JsonResponse({'error': f'Unknown feed: {feed}'}, status=404)
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', '20')), 1), 100)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    
+    items, next_cursor = pages[feed](limit, request.GET.get('cursor'))
+    return JsonResponse({
+        'items': serialize_items_list(items),
+        'next_cursor': next_cursor,
+    })
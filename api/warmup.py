@@ -0,0 +1,104 @@
+"""
+Worker warm-up, so the first request does not pay for lazy initialization.
+
+``warm_up`` resolves and reverses the URL patterns, compiles the templates
+into the cached loader and builds the search suggestion index. With
+``preload_app`` gunicorn runs it once in the master before forking, so every
+worker inherits the result. Database connections are per thread and must not
+be shared across a fork, so ``open_connections`` runs in each worker instead,
+once on every thread of its request pool.
+"""
+
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Callable, Optional
+
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import get_resolver, resolve, reverse, Resolver404
+
+from . import suggest
+
+
+# Paths resolved (not requested) to populate the resolver caches
+WARMUP_PATHS: tuple[str, ...] = (
+    '/', '/login/', '/api/items/', '/api/items/1/', '/api/items/1/bids/',
+    '/api/feeds/ending-soon/', '/health', '/ready', '/metrics', '/admin/',
+)
+
+WARMUP_TEMPLATES: tuple[str, ...] = (
+    'api/spa/index.html', 'api/auth/login.html', 'api/auth/signup.html',
+    'admin/index.html', 'admin/login.html', 'admin/change_list.html', 'admin/change_form.html',
+)
+
+
+def warm_urls() -> None:
+    resolver = get_resolver()
+    # Builds the reverse lookup dictionaries for every pattern
+    resolver.reverse_dict
+    for path in WARMUP_PATHS:
+        try:
+            resolve(path)
+        except Resolver404:
+            pass
+    reverse('ready')
+
+
+def warm_templates() -> None:
+    for name in WARMUP_TEMPLATES:
+        get_template(name)
+
+
+def open_connections() -> None:
+    """Open (or check) this thread's connection to every database."""
+    for connection in connections.all():
+        connection.ensure_connection()
+
+
+def warm_up(database: bool = False) -> dict[str, float]:
+    """Run the warm-up steps; returns the seconds each one took."""
+    steps: list[tuple[str, Callable[[], None]]] = [
+        ('urls', warm_urls),
+        ('templates', warm_templates),
+        ('suggest_index', suggest.rebuild),
+    ]
+    if database:
+        steps.append(('database', open_connections))
+
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - started
+    if not database:
+        # Building the index queried the database; do not hand that
+        # connection down to forked workers
+        connections.close_all()
+    return timings
+
+
+def warm_thread_pool(executor: Optional[Executor], threads: int, timeout: float = 10.0) -> float:
+    """
+    Open a database connection on each of the ``threads`` threads of a pool.
+
+    Every task waits at a barrier until all of them are running, which
+    forces the pool to start one thread per task. Returns the seconds taken.
+    """
+    started = time.perf_counter()
+    if executor is None or threads <= 1:
+        open_connections()
+        return time.perf_counter() - started
+
+    barrier = threading.Barrier(threads, timeout=timeout)
+
+    def task() -> None:
+        open_connections()
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            pass
+
+    for future in [executor.submit(task) for _ in range(threads)]:
+        future.result()
+    return time.perf_counter() - started
@@ -1,6 +1,6 @@
 /**
  * API service for making fetch requests to the Django backend.
- * Handles CSRF tokens and JSON parsing.
+ * Handles CSRF tokens and JSON parsing, and de-duplicates concurrent GETs.
  */
 
 import type { ApiError } from '@/types';
@@ -54,11 +54,92 @@ export async function apiRequest<T>(
   return response.json();
 }
 
+/**
+ * A GET that is currently on the network, shared by every caller asking
+ * for the same URL.
+ */
+interface InFlightRequest {
+  promise: Promise<unknown>;
+  controller: AbortController;
+  /** Callers still waiting for the response */
+  waiting: number;
+}
+
+const inFlight = new Map<string, InFlightRequest>();
+
+export interface GetOptions {
+  /** Aborting stops waiting; the request itself is cancelled once no caller waits for it */
+  signal?: AbortSignal;
+}
+
+function abortError(): DOMException {
+  return new DOMException('The request was aborted', 'AbortError');
+}
+
+/**
+ * Whether a request failed because it was aborted, as opposed to an API error.
+ */
+export function isAbortError(err: unknown): boolean {
+  return err instanceof DOMException && err.name === 'AbortError';
+}
+
+/**
+ * Stop waiting for a shared request; the last caller to leave cancels it.
+ */
+function release(url: string, request: InFlightRequest): void {
+  request.waiting -= 1;
+  if (request.waiting === 0) {
+    if (inFlight.get(url) === request) {
+      inFlight.delete(url);
+    }
+    request.controller.abort();
+  }
+}
+
 /**
  * GET request helper.
+ *
+ * Concurrent GETs for the same URL share one network request.
  */
-export async function get<T>(url: string): Promise<T> {
-  return apiRequest<T>(url, { method: 'GET' });
+export function get<T>(url: string, options: GetOptions = {}): Promise<T> {
+  const { signal } = options;
+  if (signal?.aborted) {
+    return Promise.reject(abortError());
+  }
+
+  let request = inFlight.get(url);
+  if (!request) {
+    const controller = new AbortController();
+    const created: InFlightRequest = {
+      controller,
+      waiting: 0,
+      promise: apiRequest<T>(url, { method: 'GET', signal: controller.signal }).finally(() => {
+        if (inFlight.get(url) === created) {
+          inFlight.delete(url);
+        }
+      }),
+    };
+    inFlight.set(url, created);
+    request = created;
+  }
+  request.waiting += 1;
+
+  const shared = request;
+  if (!signal) {
+    // This caller never leaves, so the request always runs to completion
+    return shared.promise as Promise<T>;
+  }
+  return new Promise<T>((resolve, reject) => {
+    const onAbort = (): void => {
+      release(url, shared);
+      reject(abortError());
+    };
+    signal.addEventListener('abort', onAbort, { once: true });
+    shared.promise.then(
+      value => resolve(value as T),
+      reject,
+    ).finally(() => signal.removeEventListener('abort', onAbort));
+  });
 }
 
 /**
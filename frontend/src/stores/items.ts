@@ -1,57 +1,215 @@
 /**
  * Pinia store for auction items state.
+ *
+ * Items are cached once, by ID, however many lists contain them. A list
+ * (the home page for a given sort and filters, a search, "my items") only
+ * keeps the IDs of its items. Lists and item details are refetched once
+ * they are older than their TTL, so moving between pages reuses what was
+ * already loaded. The home page and search results are fetched a page at a
+ * time by keyset cursor; ``fetchMore`` appends the next page.
  */
 
 import { defineStore } from 'pinia';
-import type { 
-  Item, 
-  ItemDetail, 
-  ItemsResponse, 
-  Bid, 
+import type {
+  Item,
+  ItemDetail,
+  ItemsResponse,
+  PlaceBidResponse,
   Question,
   CreateItemForm,
+  ItemQuery,
   PlaceBidForm,
-  QuestionForm 
+  QuestionForm
 } from '@/types';
-import { get, post, del } from '@/services/api';
+import { get, post, del, isAbortError } from '@/services/api';
+
+/** How long a fetched list of items is shown without refetching it */
+const LIST_TTL_MS = 30_000;
+/** How long an item's details (bids, questions) are shown without refetching them */
+const DETAIL_TTL_MS = 15_000;
+/** Items fetched per page of the home page and search results */
+const PAGE_SIZE = 48;
+
+/** The IDs of the items one list URL returned */
+interface CachedList {
+  ids: number[];
+  fetchedAt: number;
+  /** Cursor of the next page to fetch; null once the whole list is loaded */
+  nextCursor: string | null;
+}
 
 interface ItemsState {
-  items: Item[];
-  currentItem: ItemDetail | null;
-  searchResults: Item[];
-  myItems: Item[];
+  /** Every item loaded so far, by ID; details replace list entries */
+  entities: Record<number, Item | ItemDetail>;
+  /** When each item's details were fetched, by ID */
+  detailsFetchedAt: Record<number, number>;
+  /** Cached lists, by URL */
+  lists: Record<string, CachedList>;
+  listUrl: string;
+  searchUrl: string;
+  currentItemId: number | null;
   loading: boolean;
+  /** A further page of the home page or search results is loading */
+  loadingMore: boolean;
   error: string | null;
   searchQuery: string;
+  query: ItemQuery;
+}
+
+const MY_ITEMS_URL = '/api/items/?my=true&all=true';
+
+/**
+ * Build the query string for the items list (sorting and filtering happen server-side).
+ */
+function itemsQueryString(query: ItemQuery): string {
+  const params = new URLSearchParams();
+  if (query.sort) params.set('sort', query.sort);
+  if (query.min_price) params.set('min_price', query.min_price);
+  if (query.max_price) params.set('max_price', query.max_price);
+  const qs = params.toString();
+  return qs ? `?${qs}` : '';
+}
+
+/**
+ * The URL of one page of a list; the first page has an empty cursor.
+ */
+function pageUrl(url: string, cursor: string): string {
+  return `${url}${url.includes('?') ? '&' : '?'}limit=${PAGE_SIZE}&cursor=${encodeURIComponent(cursor)}`;
+}
+
+function isFresh(fetchedAt: number | undefined, ttl: number): boolean {
+  return fetchedAt !== undefined && Date.now() - fetchedAt < ttl;
 }
 
 export const useItemsStore = defineStore('items', {
   state: (): ItemsState => ({
-    items: [],
-    currentItem: null,
-    searchResults: [],
-    myItems: [],
+    entities: {},
+    detailsFetchedAt: {},
+    lists: {},
+    listUrl: `/api/items/${itemsQueryString({ sort: 'newest' })}`,
+    searchUrl: '',
+    currentItemId: null,
     loading: false,
+    loadingMore: false,
     error: null,
     searchQuery: '',
+    query: { sort: 'newest' },
   }),
 
   getters: {
-    activeItems: (state): Item[] => state.items.filter(item => item.is_active),
-    hasItems: (state): boolean => state.items.length > 0,
+    /**
+     * The items of a cached list, in the order the server returned them.
+     */
+    listItems: (state) => (url: string): Item[] => {
+      const list = state.lists[url];
+      if (!list) return [];
+      return list.ids
+        .map(id => state.entities[id])
+        .filter((item): item is Item => item !== undefined);
+    },
+    items(): Item[] {
+      return this.listItems(this.listUrl);
+    },
+    searchResults(): Item[] {
+      return this.searchUrl ? this.listItems(this.searchUrl) : [];
+    },
+    myItems(): Item[] {
+      return this.listItems(MY_ITEMS_URL);
+    },
+    currentItem: (state): ItemDetail | null => {
+      const id = state.currentItemId;
+      if (id === null || state.detailsFetchedAt[id] === undefined) return null;
+      return (state.entities[id] as ItemDetail | undefined) ?? null;
+    },
+    activeItems(): Item[] {
+      return this.items.filter(item => item.is_active);
+    },
+    hasItems(): boolean {
+      return this.items.length > 0;
+    },
     isSearching: (state): boolean => state.searchQuery.length > 0,
+    /** The list shown on the home page: search results while searching */
+    displayedUrl: (state): string => (state.searchQuery.length > 0 ? state.searchUrl : state.listUrl),
+    hasMore(): boolean {
+      const list = this.displayedUrl ? this.lists[this.displayedUrl] : undefined;
+      return list !== undefined && list.nextCursor !== null;
+    },
   },
 
   actions: {
     /**
-     * Fetch all active auction items.
+     * Cache the items of a list response under its URL.
+     */
+    storeItems(items: Item[]): void {
+      for (const item of items) {
+        // Keep the bids and questions of an item whose details are cached
+        this.entities[item.id] = { ...this.entities[item.id], ...item };
+      }
+    },
+
+    /**
+     * Fetch a list and cache it; paged lists only fetch their first page.
+     */
+    async loadList(url: string, options: { signal?: AbortSignal; paged?: boolean } = {}): Promise<void> {
+      const response = await get<ItemsResponse>(
+        options.paged ? pageUrl(url, '') : url, { signal: options.signal }
+      );
+      this.storeItems(response.items);
+      this.lists[url] = {
+        ids: response.items.map(item => item.id),
+        fetchedAt: Date.now(),
+        nextCursor: response.next_cursor ?? null,
+      };
+    },
+
+    /**
+     * Append the next page of the home page or search results.
+     */
+    async fetchMore(): Promise<void> {
+      const url = this.displayedUrl;
+      const list = url ? this.lists[url] : undefined;
+      if (!list || list.nextCursor === null || this.loadingMore) {
+        return;
+      }
+      this.loadingMore = true;
+      try {
+        const response = await get<ItemsResponse>(pageUrl(url, list.nextCursor));
+        // The list may have been refetched or dropped meanwhile
+        if (this.lists[url] !== list) return;
+        this.storeItems(response.items);
+        const known = new Set(list.ids);
+        list.ids.push(...response.items.map(item => item.id).filter(id => !known.has(id)));
+        list.nextCursor = response.next_cursor ?? null;
+      } catch (err) {
+        this.error = err instanceof Error ? err.message : 'Failed to fetch more items';
+      } finally {
+        this.loadingMore = false;
+      }
+    },
+
+    /**
+     * Drop every cached list, e.g. after an item was created; the items stay cached.
+     */
+    invalidateLists(): void {
+      this.lists = {};
+    },
+
+    /**
+     * Fetch all active auction items, optionally with new sorting/filters.
      */
-    async fetchItems(): Promise<void> {
+    async fetchItems(query?: ItemQuery, force = false): Promise<void> {
+      if (query) {
+        this.query = { ...this.query, ...query };
+      }
+      const url = `/api/items/${itemsQueryString(this.query)}`;
+      this.listUrl = url;
+      if (!force && isFresh(this.lists[url]?.fetchedAt, LIST_TTL_MS)) {
+        return;
+      }
       this.loading = true;
       this.error = null;
       try {
-        const response = await get<ItemsResponse>('/api/items/');
-        this.items = response.items;
+        await this.loadList(url, { paged: true });
       } catch (err) {
         this.error = err instanceof Error ? err.message : 'Failed to fetch items';
       } finally {
@@ -61,35 +219,49 @@ export const useItemsStore = defineStore('items', {
 
     /**
      * Search items by keyword.
+     *
+     * Pass the signal of an AbortController to cancel a search the user has
+     * typed past; an aborted search changes nothing.
      */
-    async searchItems(query: string): Promise<void> {
+    async searchItems(query: string, signal?: AbortSignal): Promise<void> {
       this.searchQuery = query;
       if (!query.trim()) {
-        this.searchResults = [];
+        this.searchUrl = '';
+        return;
+      }
+
+      const url = `/api/items/?q=${encodeURIComponent(query)}`;
+      this.searchUrl = url;
+      if (isFresh(this.lists[url]?.fetchedAt, LIST_TTL_MS)) {
         return;
       }
-      
       this.loading = true;
       this.error = null;
       try {
-        const response = await get<ItemsResponse>(`/api/items/?q=${encodeURIComponent(query)}`);
-        this.searchResults = response.items;
+        await this.loadList(url, { signal, paged: true });
       } catch (err) {
-        this.error = err instanceof Error ? err.message : 'Failed to search items';
+        if (!isAbortError(err)) {
+          this.error = err instanceof Error ? err.message : 'Failed to search items';
+        }
       } finally {
-        this.loading = false;
+        // A newer search is still loading
+        if (this.searchUrl === url) {
+          this.loading = false;
+        }
       }
     },
 
     /**
      * Fetch user's own auction items.
      */
-    async fetchMyItems(): Promise<void> {
+    async fetchMyItems(force = false): Promise<void> {
+      if (!force && isFresh(this.lists[MY_ITEMS_URL]?.fetchedAt, LIST_TTL_MS)) {
+        return;
+      }
       this.loading = true;
       this.error = null;
       try {
-        const response = await get<ItemsResponse>('/api/items/?my=true&all=true');
-        this.myItems = response.items;
+        await this.loadList(MY_ITEMS_URL);
       } catch (err) {
         this.error = err instanceof Error ? err.message : 'Failed to fetch your items';
       } finally {
@@ -98,13 +270,18 @@ export const useItemsStore = defineStore('items', {
     },
 
     /**
-     * Fetch a single item by ID.
+     * Fetch a single item by ID, unless its details were fetched recently.
      */
-    async fetchItem(itemId: number): Promise<void> {
+    async fetchItem(itemId: number, force = false): Promise<void> {
+      this.currentItemId = itemId;
+      if (!force && isFresh(this.detailsFetchedAt[itemId], DETAIL_TTL_MS)) {
+        return;
+      }
       this.loading = true;
       this.error = null;
       try {
-        this.currentItem = await get<ItemDetail>(`/api/items/${itemId}/`);
+        this.entities[itemId] = await get<ItemDetail>(`/api/items/${itemId}/`);
+        this.detailsFetchedAt[itemId] = Date.now();
       } catch (err) {
         this.error = err instanceof Error ? err.message : 'Failed to fetch item';
       } finally {
@@ -127,9 +304,11 @@ export const useItemsStore = defineStore('items', {
         if (data.image) {
           formData.append('image', data.image);
         }
-        
+
         const item = await post<Item>('/api/items/', formData);
-        this.items.unshift(item);
+        this.entities[item.id] = item;
+        // Where the item belongs in each list depends on its sort and filters
+        this.invalidateLists();
         return item;
       } catch (err) {
         this.error = err instanceof Error ? err.message : 'Failed to create item';
@@ -147,8 +326,11 @@ export const useItemsStore = defineStore('items', {
       this.error = null;
       try {
         await del<{ success: boolean }>(`/api/items/${itemId}/`);
-        this.items = this.items.filter(item => item.id !== itemId);
-        this.myItems = this.myItems.filter(item => item.id !== itemId);
+        for (const list of Object.values(this.lists)) {
+          list.ids = list.ids.filter(id => id !== itemId);
+        }
+        delete this.entities[itemId];
+        delete this.detailsFetchedAt[itemId];
       } catch (err) {
         this.error = err instanceof Error ? err.message : 'Failed to delete item';
         throw err;
@@ -160,14 +342,14 @@ export const useItemsStore = defineStore('items', {
     /**
      * Place a bid on an item.
      */
-    async placeBid(itemId: number, data: PlaceBidForm): Promise<Bid> {
+    async placeBid(itemId: number, data: PlaceBidForm): Promise<PlaceBidResponse> {
       this.loading = true;
       this.error = null;
       try {
-        const bid = await post<Bid>(`/api/items/${itemId}/bids/`, data);
+        const result = await post<PlaceBidResponse>(`/api/items/${itemId}/bids/`, data);
         // Refresh the item to get updated price
-        await this.fetchItem(itemId);
-        return bid;
+        await this.fetchItem(itemId, true);
+        return result;
       } catch (err) {
         this.error = err instanceof Error ? err.message : 'Failed to place bid';
         throw err;
@@ -185,7 +367,7 @@ export const useItemsStore = defineStore('items', {
       try {
         const question = await post<Question>(`/api/items/${itemId}/questions/`, data);
         // Refresh the item to get updated questions
-        await this.fetchItem(itemId);
+        await this.fetchItem(itemId, true);
         return question;
       } catch (err) {
         this.error = err instanceof Error ? err.message : 'Failed to ask question';
@@ -204,8 +386,8 @@ export const useItemsStore = defineStore('items', {
       try {
         await post<Question>(`/api/questions/${questionId}/answers/`, data);
         // Refresh the current item to get updated answers
-        if (this.currentItem) {
-          await this.fetchItem(this.currentItem.id);
+        if (this.currentItemId !== null) {
+          await this.fetchItem(this.currentItemId, true);
         }
       } catch (err) {
         this.error = err instanceof Error ? err.message : 'Failed to answer question';
@@ -219,7 +401,7 @@ export const useItemsStore = defineStore('items', {
      * Clear the current item.
      */
     clearCurrentItem(): void {
-      this.currentItem = null;
+      this.currentItemId = null;
     },
 
     /**
@@ -227,7 +409,7 @@ export const useItemsStore = defineStore('items', {
      */
     clearSearch(): void {
       this.searchQuery = '';
-      this.searchResults = [];
+      this.searchUrl = '';
     },
 
     /**
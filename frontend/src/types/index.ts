@@ -16,6 +16,9 @@ export interface User extends UserMinimal {
   date_of_birth: string | null;
 }
 
+/** Auction lifecycle status; 'deleting' while the item and its history are being deleted */
+export type ItemStatus = 'scheduled' | 'live' | 'ended' | 'settled' | 'deleting';
+
 /** Auction item */
 export interface Item {
   id: number;
@@ -24,9 +27,12 @@ export interface Item {
   starting_price: string;
   current_price: string;
   image: string | null;
+  start_datetime: string | null;
   end_datetime: string;
+  status: ItemStatus;
   owner: UserMinimal;
   bid_count: number;
+  views: number;
   is_active: boolean;
   created_at: string;
 }
@@ -44,6 +50,8 @@ export interface Bid {
   item_id: number;
   bidder: UserMinimal;
   amount: string;
+  /** Placed by proxy bidding on the bidder's behalf */
+  auto: boolean;
   timestamp: string;
 }
 
@@ -66,10 +74,37 @@ export interface Question {
   answers: Answer[];
 }
 
+/** Sort orders supported by the items list endpoint */
+export type ItemSort = 'newest' | 'ending_soon' | 'price_asc' | 'price_desc' | 'most_bids' | 'most_viewed';
+
+/** Sorting and price range filters for the items list */
+export interface ItemQuery {
+  sort?: ItemSort;
+  min_price?: string;
+  max_price?: string;
+}
+
 /** API response for items list */
 export interface ItemsResponse {
   items: Item[];
   count: number;
+  /** Set when a page was requested with ?limit=n&offset=m */
+  offset?: number;
+  /** Offset of the next page, or null on the last page */
+  next_offset?: number | null;
+  /** Set when a page was requested with ?limit=n&cursor=c: cursor of the next page, or null on the last page */
+  next_cursor?: string | null;
+}
+
+/** A search-bar title suggestion */
+export interface Suggestion {
+  id: number;
+  title: string;
+}
+
+/** API response for search suggestions */
+export interface SuggestionsResponse {
+  suggestions: Suggestion[];
 }
 
 /** API response for bids list */
@@ -78,6 +113,15 @@ export interface BidsResponse {
   count: number;
 }
 
+/** API response for placing a bid */
+export interface PlaceBidResponse {
+  bids: Bid[];
+  leading: boolean;
+  current_price: string;
+  /** Your maximum bid, only while you are leading */
+  max_amount: string | null;
+}
+
 /** API response for questions list */
 export interface QuestionsResponse {
   questions: Question[];
@@ -107,9 +151,10 @@ export interface UpdateProfileForm {
 }
 
 /** Form data for placing a bid */
-export interface PlaceBidForm {
-  amount: string;
-}
+export type PlaceBidForm =
+  | { amount: string }
+  /** Proxy bid: the system bids for you up to this maximum */
+  | { max_amount: string };
 
 /** Form data for asking/answering questions */
 export interface QuestionForm {
@@ -0,0 +1,71 @@
+"""
+Gunicorn configuration for production.
+
+Gunicorn reads ``gunicorn.conf.py`` from the working directory, so
+``gunicorn project.wsgi`` (what the OpenShift Python image runs) picks it up.
+Every setting can be overridden with the environment variables below.
+
+The app is preloaded and warmed up in the master, so workers fork with URLs,
+templates and the suggestion index ready. Each worker then opens a database
+connection on every request thread before it accepts connections.
+"""
+
+import multiprocessing
+import os
+import time
+
+# Running under gunicorn means production unless told otherwise
+os.environ.setdefault('DJANGO_PRODUCTION', 'true')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+
+wsgi_app = 'project.wsgi:application'
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '8080')}")
+
+# Threads share a worker's memory; requests mostly wait on the database
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', os.getenv('WEB_CONCURRENCY', str(min(multiprocessing.cpu_count() + 1, 8)))))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Recycle workers now and then to cap slow memory growth; the jitter keeps
+# them from all restarting at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+preload_app = True
+# An empty GUNICORN_ACCESS_LOG turns the access log off
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+
+_started = time.perf_counter()
+
+
+def _warmup_enabled() -> bool:
+    from django.conf import settings
+    return settings.WARMUP_ENABLED
+
+
+def when_ready(server) -> None:
+    """Warm up the preloaded app in the master, before the workers fork."""
+    if not _warmup_enabled():
+        return
+    from api import warmup
+    timings = warmup.warm_up(database=False)
+    server.log.info(
+        'Warm-up in master: %s; %.2fs since start',
+        ', '.join(f'{name} {seconds * 1000:.0f}ms' for name, seconds in timings.items()),
+        time.perf_counter() - _started,
+    )
+
+
+def post_worker_init(worker) -> None:
+    """Open the database connections of each request thread in a new worker."""
+    if not _warmup_enabled():
+        return
+    from api import warmup
+    # gthread workers create their thread pool before this hook runs
+    seconds = warmup.warm_thread_pool(getattr(worker, 'tpool', None), worker.cfg.threads)
+    worker.log.info('Worker %s opened database connections in %.0fms', worker.pid, seconds * 1000)
@@ -10,6 +10,33 @@ engines = {
 }
 
 
+def sqlite_options():
+    """
+    Connection options of the tuned SQLite mode (on unless SQLITE_TUNED=false).
+
+    WAL lets readers run alongside the single writer, and synchronous=NORMAL
+    is durable across application crashes in WAL mode. Write transactions
+    start with BEGIN IMMEDIATE and wait up to the busy timeout for the lock.
+    A deferred transaction that reads first and then tries to write fails
+    with "database is locked" at once instead.
+    """
+    if os.getenv('SQLITE_TUNED', 'True').lower() != 'true':
+        return {}
+    pragmas = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+        # Negative values are in KiB
+        'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE_KB', str(64 * 1024))),
+        'temp_store': 'MEMORY',
+    }
+    return {
+        'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in pragmas.items()),
+        'transaction_mode': 'IMMEDIATE',
+    }
+
+
 def config():
     # Check if OpenShift PostgreSQL environment variables are set
     if 'POSTGRESQL_DATABASE' in os.environ:
@@ -41,4 +68,5 @@ def config():
         'PASSWORD': os.getenv('DATABASE_PASSWORD'),
         'HOST': os.getenv('{}_SERVICE_HOST'.format(service_name)),
         'PORT': os.getenv('{}_SERVICE_PORT'.format(service_name)),
+        'OPTIONS': sqlite_options() if engine == engines['sqlite'] else {},
     }
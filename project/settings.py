@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/stable/ref/settings/
 
 from . import database
 import os
+import tempfile
+from decimal import Decimal
 from dotenv import load_dotenv
 
 from pathlib import Path
@@ -34,8 +36,12 @@ SECRET_KEY = os.getenv(
 )
 
 
+# Production profile, set by gunicorn.conf.py: debug off by default, cached
+# template loader, a cache shared by the workers and persistent DB connections
+PRODUCTION = os.getenv('DJANGO_PRODUCTION', 'False').lower() == 'true'
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = os.getenv('DJANGO_DEBUG', 'True').lower() == 'true'
+DEBUG = os.getenv('DJANGO_DEBUG', 'False' if PRODUCTION else 'True').lower() == 'true'
 
 ALLOWED_HOSTS = [
     '*',
@@ -60,12 +66,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.tracing.TracingMiddleware',
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.profiling.ProfilingMiddleware',
+    'api.memory.MemoryProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -89,6 +99,16 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCTION:
+    # Templates are compiled once per process (and warmed up by api/warmup.py)
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'project.wsgi.application'
 
 
@@ -99,6 +119,36 @@ WSGI_APPLICATION = 'project.wsgi.application'
 DATABASES = {
     'default': database.config()
 }
+# Keep connections open between requests in production; health checks replace
+# connections the server has closed
+DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DATABASE_CONN_MAX_AGE', '60' if PRODUCTION else '0'))
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+
+# Cache
+# 'locmem' is per process. 'redis' (needs the redis package) and 'memcached'
+# (needs pymemcache) are shared by every worker and host. 'file' is only fit
+# for a single process: its add() and incr() are not atomic, which breaks the
+# rate limits and cache locks, so api/checks.py rejects it while rate limiting
+# is enabled.
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'redis' if PRODUCTION else 'locmem')
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'auction'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache',
+             os.path.join(tempfile.gettempdir(), 'auction-cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://localhost:6379/0'),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache', '127.0.0.1:11211'),
+}
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.getenv('CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'TIMEOUT': 300,
+    }
+}
+if CACHE_BACKEND in ('locmem', 'file'):
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '10000'))}
 
 
 # Password validation
@@ -141,6 +191,15 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # Media files (user uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Serve uploads from Django when DEBUG is off. Production should put a file
+# server or the router in front of MEDIA_ROOT; set SERVE_MEDIA=true if it has none.
+SERVE_MEDIA = os.getenv('SERVE_MEDIA', 'False' if PRODUCTION else 'True').lower() == 'true'
+
+if PRODUCTION:
+    # Request bodies: the JSON API needs little, and uploaded files larger than
+    # FILE_UPLOAD_MAX_MEMORY_SIZE are spooled to a temporary file instead of memory
+    DATA_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv('DATA_UPLOAD_MAX_MEMORY_SIZE', str(1024 * 1024)))
+    FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv('FILE_UPLOAD_MAX_MEMORY_SIZE', str(1024 * 1024)))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/stable/ref/settings/#default-auto-field
@@ -184,7 +243,10 @@ DEFAULT_FROM_EMAIL = os.getenv('EMAIL_HOST_USER', 'your-auction-app@gmail.com')
 # Cron jobs for auction end notifications
 # Runs every 5 minutes to check for ended auctions
 CRONJOBS = [
-    ('*/5 * * * *', 'api.cron.check_ended_auctions')
+    ('*/5 * * * *', 'api.cron.check_ended_auctions'),
+    ('30 3 * * *', 'api.cron.archive_settled_auctions'),
+    ('15 4 * * *', 'api.cron.cleanup_stale_data'),
+    ('* * * * *', 'api.cron.run_import_jobs'),
 ]
 
 # CORS settings for Vue dev server
@@ -194,3 +256,130 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+
+# Metrics (Prometheus text format at /metrics)
+# Each process writes its counters to its own file in METRICS_DIR; the
+# directory must be shared by all gunicorn workers and the cron job.
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'auction-metrics'))
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '1.0'))
+# If set, scrapers must send "Authorization: Bearer <token>". Required in
+# production: every scrape runs COUNT queries (see api/checks.py)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+# The database gauges of /metrics are computed at most once per this many
+# seconds and shared by all workers through the cache; 0 computes them per scrape
+METRICS_DB_GAUGES_TTL = int(os.getenv('METRICS_DB_GAUGES_TTL', '15'))
+# /ready reports 503 when a database round trip takes longer than this (seconds)
+READINESS_DB_LATENCY_THRESHOLD = float(os.getenv('READINESS_DB_LATENCY_THRESHOLD', '1.0'))
+
+# Opt-in CPU profiling (staff: X-Profile: 1 header or ?__profile=1)
+# Dumps are kept in a ring buffer of PROFILE_MAX_FILES files, see /admin/profiles/
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'auction-profiles'))
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '50'))
+PROFILE_CRON = os.getenv('PROFILE_CRON', 'False').lower() == 'true'
+
+# tracemalloc reports written by sessions started from /admin/memory/
+MEMORY_REPORT_DIR = os.getenv('MEMORY_REPORT_DIR', os.path.join(tempfile.gettempdir(), 'auction-memory'))
+
+# Archival of settled auctions (see api/archive.py)
+ARCHIVE_RETENTION_DAYS = int(os.getenv('ARCHIVE_RETENTION_DAYS', '90'))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '100'))
+ARCHIVE_BATCH_PAUSE = float(os.getenv('ARCHIVE_BATCH_PAUSE', '0.1'))
+
+# Trending feed: weight of a bid halves every TRENDING_HALF_LIFE_SECONDS
+TRENDING_HALF_LIFE_SECONDS = int(os.getenv('TRENDING_HALF_LIFE_SECONDS', '3600'))
+
+# Price history responses are cached per item and latest bid id; while the auction
+# runs its time axis moves with the clock, so the entry expires sooner
+PRICE_HISTORY_CACHE_TTL = int(os.getenv('PRICE_HISTORY_CACHE_TTL', '3600'))
+PRICE_HISTORY_LIVE_CACHE_TTL = int(os.getenv('PRICE_HISTORY_LIVE_CACHE_TTL', '30'))
+
+# Search suggestions: each worker rebuilds its in-memory prefix index after this many seconds
+SUGGEST_INDEX_MAX_AGE = int(os.getenv('SUGGEST_INDEX_MAX_AGE', '300'))
+
+# Stampede-protected caching of the public item listing and item detail (api/caching.py)
+ITEM_LIST_CACHE_TTL = int(os.getenv('ITEM_LIST_CACHE_TTL', '5'))
+ITEM_DETAIL_CACHE_TTL = int(os.getenv('ITEM_DETAIL_CACHE_TTL', '10'))
+# Expired entries are kept this much longer and served while one worker refreshes them
+CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', '30'))
+CACHE_LOCK_TIMEOUT = int(os.getenv('CACHE_LOCK_TIMEOUT', '10'))
+
+# Item detail views are counted in memory and written out in batches (api/view_counts.py);
+# a crash loses at most one interval's worth, capped at VIEW_COUNT_MAX_PENDING
+VIEW_COUNT_FLUSH_INTERVAL = float(os.getenv('VIEW_COUNT_FLUSH_INTERVAL', '10'))
+VIEW_COUNT_MAX_PENDING = int(os.getenv('VIEW_COUNT_MAX_PENDING', '1000'))
+# Items per UPDATE statement of a flush
+VIEW_COUNT_FLUSH_BATCH = int(os.getenv('VIEW_COUNT_FLUSH_BATCH', '500'))
+
+# Rate limits per endpoint scope (api/ratelimit.py), as 'requests/period' with period s, m, h or d.
+# Counters live in the cache, so use a shared cache backend in production.
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+# Only enable behind a proxy that sets X-Forwarded-For, otherwise clients can spoof their IP
+RATE_LIMIT_TRUST_X_FORWARDED_FOR = os.getenv('RATE_LIMIT_TRUST_X_FORWARDED_FOR', 'False').lower() == 'true'
+RATE_LIMITS = {
+    'bid': {
+        'user': os.getenv('RATE_LIMIT_BID_USER', '20/m'),
+        'ip': os.getenv('RATE_LIMIT_BID_IP', '60/m'),
+    },
+    'search': {
+        'user': os.getenv('RATE_LIMIT_SEARCH_USER', '60/m'),
+        'ip': os.getenv('RATE_LIMIT_SEARCH_IP', '180/m'),
+    },
+    'question': {
+        'user': os.getenv('RATE_LIMIT_QUESTION_USER', '10/m'),
+        'ip': os.getenv('RATE_LIMIT_QUESTION_IP', '30/m'),
+    },
+}
+
+# Rows fetched per round trip by the streaming exports (api/export.py)
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Bulk item import (api/bulk_import.py): images are downscaled to fit this many pixels
+# per side by a pool of IMPORT_WORKERS processes (default: one per CPU)
+IMPORT_IMAGE_MAX_SIZE = int(os.getenv('IMPORT_IMAGE_MAX_SIZE', '1600'))
+IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', '0')) or None
+# Larger manifests must go through the import_items management command
+IMPORT_MAX_ROWS = int(os.getenv('IMPORT_MAX_ROWS', '1000'))
+# Uploads wait here for the run_import_jobs cron job; the directory must be
+# shared by the web pods and the cron job. A job still running after
+# IMPORT_JOB_TIMEOUT_MINUTES is assumed to have crashed and is failed.
+IMPORT_DIR = os.getenv('IMPORT_DIR', os.path.join(BASE_DIR, 'imports'))
+IMPORT_JOB_TIMEOUT_MINUTES = int(os.getenv('IMPORT_JOB_TIMEOUT_MINUTES', '60'))
+
+# Items fetched and encoded per chunk by the streaming item listing (?stream=true)
+LISTING_STREAM_CHUNK_SIZE = int(os.getenv('LISTING_STREAM_CHUNK_SIZE', '500'))
+
+# Proxy bids (api/bidding.py) outbid the competition by this amount, up to the bidder's maximum
+BID_INCREMENT = Decimal(os.getenv('BID_INCREMENT', '1.00'))
+
+# Item deletion (api/deletion.py) removes bids and Q&A in batches of this many rows,
+# pausing DELETE_BATCH_PAUSE seconds between batches
+DELETE_BATCH_SIZE = int(os.getenv('DELETE_BATCH_SIZE', '5000'))
+DELETE_BATCH_PAUSE = float(os.getenv('DELETE_BATCH_PAUSE', '0'))
+
+# Worker warm-up (api/warmup.py), run by the gunicorn hooks in gunicorn.conf.py
+WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'True').lower() == 'true'
+
+# Cleanup job (api/maintenance.py): expired sessions are deleted CLEANUP_BATCH_SIZE rows
+# per transaction, sleeping CLEANUP_BATCH_PAUSE seconds between batches. Uploaded images
+# nothing refers to are deleted once they are MEDIA_CLEANUP_GRACE_HOURS old.
+CLEANUP_BATCH_SIZE = int(os.getenv('CLEANUP_BATCH_SIZE', '1000'))
+CLEANUP_BATCH_PAUSE = float(os.getenv('CLEANUP_BATCH_PAUSE', '0.1'))
+MEDIA_CLEANUP_GRACE_HOURS = float(os.getenv('MEDIA_CLEANUP_GRACE_HOURS', '24'))
+
+# Largest page of the item listing (GET /api/items/?limit=n&offset=m)
+ITEM_PAGE_MAX_SIZE = int(os.getenv('ITEM_PAGE_MAX_SIZE', '100'))
+
+# Tracing (api/tracing.py): sampled requests and cron runs are exported as OTLP/JSON,
+# one trace per line, to TRACING_FILE ('' to disable) and to TRACING_OTLP_ENDPOINT if set.
+# Requests with a traceparent header continue the caller's trace, but only follow
+# its sampling flag with TRACING_TRUST_TRACEPARENT (set it behind a sampling gateway).
+# TRACING_FILE is moved to TRACING_FILE.1 once it reaches TRACING_FILE_MAX_BYTES.
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'False').lower() == 'true'
+TRACING_SAMPLE_RATE = float(os.getenv('TRACING_SAMPLE_RATE', '0.01'))
+TRACING_CRON_SAMPLE_RATE = float(os.getenv('TRACING_CRON_SAMPLE_RATE', '1.0'))
+TRACING_TRUST_TRACEPARENT = os.getenv('TRACING_TRUST_TRACEPARENT', 'False').lower() == 'true'
+TRACING_FILE = os.getenv('TRACING_FILE', os.path.join(tempfile.gettempdir(), 'auction-traces.jsonl'))
+TRACING_FILE_MAX_BYTES = int(os.getenv('TRACING_FILE_MAX_BYTES', str(100 * 1024 * 1024)))
+TRACING_OTLP_ENDPOINT = os.getenv('TRACING_OTLP_ENDPOINT', '')
+TRACING_MAX_SPANS = int(os.getenv('TRACING_MAX_SPANS', '1000'))
+TRACING_SERVICE_NAME = os.getenv('TRACING_SERVICE_NAME', 'auction')
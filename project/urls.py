@@ -13,19 +13,41 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.http import HttpResponse
+from django.views.static import serve
+
+from api import export, memory, metrics, profiling
 
 
 urlpatterns = [
     path('', include('api.urls')),
     path('health', lambda request: HttpResponse("OK")),
+    path('ready', metrics.readiness_view, name='ready'),
+    path('metrics', metrics.metrics_view, name='metrics'),
+    path('admin/profiles/', admin.site.admin_view(profiling.profile_list_view), name='admin_profiles'),
+    path(
+        'admin/profiles/<str:name>/download/',
+        admin.site.admin_view(profiling.profile_download_view),
+        name='admin_profile_download',
+    ),
+    path('admin/memory/', admin.site.admin_view(memory.memory_view), name='admin_memory'),
+    path('admin/export/<slug:dataset>/', admin.site.admin_view(export.export_view), name='admin_export'),
     path('admin/', admin.site.urls),
 ]
 
-# Serve media files in development
+# Serve media files in development, and with DEBUG off only if SERVE_MEDIA is on
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+elif settings.SERVE_MEDIA:
+    urlpatterns += [
+        re_path(
+            r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')),
+            serve, {'document_root': settings.MEDIA_ROOT},
+        ),
+    ]